@@ -0,0 +1,320 @@
+"""
+autoscaler.py contains the scaling policy of a product. The policy sizes the
+replicas of a product from a metric the wrapper of the product reports on
+/_stats: the request rate, the requests in flight or the p95 latency per
+replica. Like the horizontal pod autoscaler of Kubernetes, it scales by the
+ratio of the observed to the target value, ignores small deviations and only
+scales down to the highest replicas recommended within a delay, so a short dip
+in load does not remove replicas that are needed again a moment later. The
+policy does not talk to the cluster, so it can be run against a simulated load
+curve with simulate().
+
+Functions:
+--------
+percentile : function
+    Estimates a percentile from a latency histogram
+measure : function
+    Measures a metric per replica from two readings of the stats of a product
+simulate : function
+    Runs a policy against a simulated load curve
+"""
+
+# import libs
+import collections
+import math
+
+# define the metrics a product can be scaled on
+METRICS = {'rate': 'requests per second',
+           'in_flight': 'requests in flight',
+           'p95': 'p95 latency in seconds'}
+
+# setup the class of the scaling policy
+class policy:
+
+    # describe the class
+    def __init__(self, min_replicas, max_replicas, target, metric = 'rate', tolerance = 0.1, scale_down_delay = 300):
+
+        # check the metric
+        if metric not in METRICS:
+
+            # raise Exception
+            raise Exception(str('metric arg should be one of: ' + ', '.join(METRICS)))
+
+        # check the replicas
+        if int(min_replicas) < 1 or int(max_replicas) < int(min_replicas):
+
+            # raise Exception
+            raise Exception('The replicas need 1 <= min_replicas <= max_replicas.')
+
+        # check the target
+        if target is None or float(target) <= 0:
+
+            # raise Exception
+            raise Exception('The target needs to be a positive value of the metric per replica.')
+
+        # store the bounds of the replicas
+        self.min_replicas = int(min_replicas)
+        self.max_replicas = int(max_replicas)
+
+        # store the target per replica
+        self.target = float(target)
+        self.metric = metric
+
+        # store the deviation from the target that is ignored
+        self.tolerance = tolerance
+
+        # store the seconds the replicas are kept before scaling down
+        self.scale_down_delay = scale_down_delay
+
+        # store the recent recommendations as (time, replicas)
+        self.recommendations = collections.deque()
+
+    # main method to decide the replicas
+    def decide(self, replicas, observed, now):
+
+        """
+        Main method to decide the replicas of the product.
+
+        Parameters
+        ----------
+        replicas : int
+            Number of replicas running now
+        observed : float
+            Observed value of the metric per replica, None if it is not known
+            yet
+        now : float
+            Current time in seconds
+
+        Returns
+        -------
+        int
+            Number of replicas the product should run
+        """
+
+        # check if the metric is known
+        if observed is None:
+
+            # keep the replicas within the bounds
+            return min(max(replicas, self.min_replicas), self.max_replicas)
+
+        # get the ratio of the observed to the target value
+        ratio = observed / self.target
+
+        # check if the deviation is small
+        if abs(ratio - 1) <= self.tolerance:
+
+            # keep replicas
+            desired = replicas
+
+        # if the deviation is large
+        else:
+
+            # scale by the ratio
+            desired = math.ceil(max(replicas, 1) * ratio)
+
+        # keep the replicas within the bounds
+        desired = min(max(desired, self.min_replicas), self.max_replicas)
+
+        # record the recommendation
+        self.recommendations.append((now, desired))
+
+        # forget the recommendations outside of the delay
+        while self.recommendations[0][0] < now - self.scale_down_delay:
+
+            # drop recommendation
+            self.recommendations.popleft()
+
+        # check if the product scales up
+        if desired >= replicas:
+
+            # scale up right away
+            return desired
+
+        # scale down to the highest recommendation within the delay
+        return min(replicas, max(recommended for _, recommended in self.recommendations))
+
+# helper function to estimate a percentile
+def percentile(bounds, buckets, q = 0.95):
+
+    """
+    Helper function to estimate a percentile from a latency histogram.
+
+    The percentile is interpolated linearly within its bucket. Latencies above
+    the last bound are reported as the last bound.
+
+    Parameters
+    ----------
+    bounds : list
+        List with the upper bounds of the buckets, without the open last one
+    buckets : list
+        List with the number of requests per bucket
+    q : float
+        The percentile as a fraction
+
+    Returns
+    -------
+    float
+        The estimated percentile in seconds, 0.0 if there are no requests
+    """
+
+    # get the number of requests
+    total = sum(buckets)
+
+    # check if there are requests
+    if total == 0:
+
+        # return zero
+        return 0.0
+
+    # get the rank of the percentile
+    rank = q * total
+
+    # initialize the requests below the bucket
+    below = 0
+
+    # loop over buckets
+    for index, count in enumerate(buckets):
+
+        # check if the percentile is in the bucket
+        if count and below + count >= rank:
+
+            # check if the bucket is open
+            if index >= len(bounds):
+
+                # return last bound
+                return bounds[-1]
+
+            # get the lower bound of the bucket
+            lower = bounds[index - 1] if index > 0 else 0.0
+
+            # interpolate within the bucket
+            return lower + (bounds[index] - lower) * (rank - below) / count
+
+        # add the bucket
+        below += count
+
+    # return last bound
+    return bounds[-1]
+
+# helper function to measure a metric
+def measure(previous, current, metric):
+
+    """
+    Helper function to measure a metric per replica from two readings of the
+    stats of a product.
+
+    Counters are compared per host, so a replica is only compared with itself
+    and a replica that restarted in between is skipped.
+
+    Parameters
+    ----------
+    previous : dict
+        Dict with the stats of the previous reading by host
+    current : dict
+        Dict with the stats of the current reading by host
+    metric : string
+        String with the metric, one of "rate", "in_flight" or "p95"
+
+    Returns
+    -------
+    float
+        The metric per replica, None if it can not be measured yet
+    """
+
+    # check if the requests in flight are measured
+    if metric == 'in_flight':
+
+        # return the mean of the replicas read now
+        return sum(stats['in_flight'] for stats in current.values()) / len(current) if current else None
+
+    # get the replicas read twice since their start
+    pairs = [(previous[host], stats) for host, stats in current.items()
+             if host in previous and previous[host]['started'] == stats['started'] and stats['time'] > previous[host]['time']]
+
+    # check if there are any
+    if not pairs:
+
+        # return None
+        return None
+
+    # check if the request rate is measured
+    if metric == 'rate':
+
+        # return the mean rate of the replicas
+        return sum((after['requests'] - before['requests']) / (after['time'] - before['time']) for before, after in pairs) / len(pairs)
+
+    # sum up the latencies of the interval over the replicas
+    buckets = [sum(after['latency_buckets'][index] - before['latency_buckets'][index] for before, after in pairs)
+               for index in range(len(pairs[0][1]['latency_buckets']))]
+
+    # return the p95 latency
+    return percentile(pairs[0][1]['latency_bounds'], buckets)
+
+# helper function to simulate a policy
+def simulate(scaling_policy, load, interval = 15, replicas = None, observe = None):
+
+    """
+    Helper function to run a policy against a simulated load curve.
+
+    Every value of the load curve is the load of one interval. By default it
+    is split evenly across the replicas, which fits the request rate and the
+    requests in flight. For the p95 latency, pass a function modelling the
+    latency of the product under load.
+
+    Parameters
+    ----------
+    scaling_policy : policy
+        The policy to simulate
+    load : list
+        List with the total load per interval
+    interval : float
+        Seconds between two decisions
+    replicas : int
+        Number of replicas at the start, default is min_replicas
+    observe : function
+        Function of the load and the replicas returning the observed value of
+        the metric per replica
+
+    Returns
+    -------
+    list
+        List with a dict per interval holding the time, the load, the replicas,
+        the observed value and the replicas decided
+    """
+
+    # check if the observation was given
+    if observe is None:
+
+        # split the load evenly across the replicas
+        observe = lambda value, count: value / count
+
+    # check if the replicas were given
+    if replicas is None:
+
+        # start at the minimum
+        replicas = scaling_policy.min_replicas
+
+    # initialize the steps
+    steps = []
+
+    # loop over the load curve
+    for index, value in enumerate(load):
+
+        # observe the metric
+        observed = observe(value, replicas)
+
+        # decide the replicas
+        decided = scaling_policy.decide(replicas, observed, index * interval)
+
+        # store step
+        steps.append({'time': index * interval,
+                      'load': value,
+                      'replicas': replicas,
+                      'observed': observed,
+                      'decided': decided})
+
+        # scale
+        replicas = decided
+
+    # return steps
+    return steps
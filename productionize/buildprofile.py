@@ -0,0 +1,229 @@
+"""
+buildprofile.py contains the helpers to profile the build of a product image.
+The image is built with BuildKit and its plain progress output, which names
+every step of the build and reports if it was cached, how long it took and how
+many bytes it transferred. The output is parsed into one record per step and
+summarized, so it shows which steps of the Dockerfile dominate the build and
+how many of them were served from the cache. The output of the classic builder
+is parsed as well, it only tells which steps were cached.
+
+Functions:
+--------
+read_size : function
+    Reads a size like "1.2MB" into bytes
+read_progress : function
+    Reads the steps of a build from its plain progress output
+summarize : function
+    Summarizes the steps of a build into a profile
+"""
+
+# import libs
+import re
+
+# define the bytes per unit of a size
+UNITS = {'B': 1, 'kB': 1000, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4,
+         'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4}
+
+# define the patterns of the plain progress output
+VERTEX = re.compile(r'^#(\d+) (.*)$')
+DONE = re.compile(r'^DONE (\d+(?:\.\d+)?)s$')
+TRANSFER = re.compile(r'^(transferring \w+): (\d+(?:\.\d+)?\s?[kKMGT]?i?B)')
+DOWNLOAD = re.compile(r'^(sha256:[0-9a-f]+) (\d+(?:\.\d+)?\s?[kKMGT]?i?B) / ')
+STEP = re.compile(r'^\[(?:[\w.-]+ )?\d+/\d+\]')
+
+# define the patterns of the classic builder
+CLASSIC_STEP = re.compile(r'^Step (\d+/\d+) : (.*)$')
+
+# helper function to read a size
+def read_size(text):
+
+    """
+    Helper function to read a size like "1.2MB" into bytes.
+
+    Parameters
+    ----------
+    text : string
+        String with the size and its unit
+
+    Returns
+    -------
+    int
+        Size in bytes, 0 if the size can not be read
+    """
+
+    # split the value from the unit
+    match = re.match(r'^(\d+(?:\.\d+)?)\s?([kKMGT]?i?B)$', text.strip())
+
+    # check if it is a size
+    if match is None or match.group(2) not in UNITS:
+
+        # return zero
+        return 0
+
+    # return bytes
+    return int(float(match.group(1)) * UNITS[match.group(2)])
+
+# helper function to read the steps of a build
+def read_progress(text):
+
+    """
+    Helper function to read the steps of a build from its plain progress
+    output.
+
+    BuildKit reports the lines of a step behind its number, "#5", and may
+    interleave the lines of steps running in parallel. The first line of a
+    step names it, the last one tells if it was cached, done or failed.
+    Transfers report their progress repeatedly, so the largest value per
+    transfer counts.
+
+    Parameters
+    ----------
+    text : string
+        String with the progress output of the build
+
+    Returns
+    -------
+    list
+        List with a dict per step holding its name, if it is a step of the
+        Dockerfile, if it was cached, its duration in seconds, the bytes it
+        transferred and the error it failed with, in the order they started
+    """
+
+    # initialize the steps by number
+    steps = {}
+
+    # initialize the transfers by step
+    transfers = {}
+
+    # initialize the current step of the classic builder
+    classic = None
+
+    # loop over the lines
+    for line in text.splitlines():
+
+        # strip the line
+        line = line.strip()
+
+        # check if it is a line of BuildKit
+        match = VERTEX.match(line)
+
+        # check if it is a line of the classic builder
+        if match is None:
+
+            # check if a step of the classic builder starts
+            classic_match = CLASSIC_STEP.match(line)
+
+            # check if it does
+            if classic_match is not None:
+
+                # store the step
+                classic = str('classic-' + classic_match.group(1))
+                steps[classic] = {'name': str('[' + classic_match.group(1) + '] ' + classic_match.group(2)),
+                                  'dockerfile': True, 'cached': False, 'duration': None, 'bytes': 0, 'error': None}
+
+            # check if the step of the classic builder was cached
+            elif classic is not None and line == '---> Using cache':
+
+                # mark step as cached
+                steps[classic]['cached'] = True
+
+            # skip line
+            continue
+
+        # get the number and the message of the step
+        number, message = match.groups()
+
+        # check if the step is new
+        if number not in steps:
+
+            # store the step, named by its first line
+            steps[number] = {'name': message, 'dockerfile': bool(STEP.match(message)),
+                             'cached': False, 'duration': None, 'bytes': 0, 'error': None}
+            transfers[number] = {}
+
+            # continue with the next line
+            continue
+
+        # check if the step was cached
+        if message == 'CACHED':
+
+            # mark step as cached
+            steps[number]['cached'] = True
+
+            # continue with the next line
+            continue
+
+        # check if the step failed
+        if message.startswith('ERROR'):
+
+            # store the error
+            steps[number]['error'] = message[len('ERROR'):].lstrip(': ')
+
+            # continue with the next line
+            continue
+
+        # check if the step is done
+        done = DONE.match(message)
+
+        # check if it is
+        if done is not None:
+
+            # store the duration
+            steps[number]['duration'] = float(done.group(1))
+
+            # continue with the next line
+            continue
+
+        # check if the step transfers data
+        transfer = TRANSFER.match(message) or DOWNLOAD.match(message)
+
+        # check if it does
+        if transfer is not None:
+
+            # keep the largest progress of the transfer
+            transfers[number][transfer.group(1)] = max(transfers[number].get(transfer.group(1), 0), read_size(transfer.group(2)))
+
+    # loop over the transfers
+    for number, progress in transfers.items():
+
+        # sum up the bytes of the step
+        steps[number]['bytes'] = sum(progress.values())
+
+    # return the steps in the order they started
+    return list(steps.values())
+
+# helper function to summarize a build
+def summarize(steps, top = 5):
+
+    """
+    Helper function to summarize the steps of a build into a profile.
+
+    Parameters
+    ----------
+    steps : list
+        List with the steps of the build, as read by read_progress()
+    top : int
+        Number of the slowest steps of the Dockerfile to list
+
+    Returns
+    -------
+    dict
+        Dict with the steps, the number of steps of the Dockerfile and how
+        many of them were cached, the cache hit ratio, the bytes transferred,
+        the seconds the steps took and the slowest steps of the Dockerfile
+    """
+
+    # get the steps of the Dockerfile
+    dockerfile = [step for step in steps if step['dockerfile']]
+
+    # count the cached steps
+    cached = sum(1 for step in dockerfile if step['cached'])
+
+    # return profile
+    return {'steps': steps,
+            'dockerfile_steps': len(dockerfile),
+            'cached_steps': cached,
+            'cache_hit_ratio': cached / len(dockerfile) if dockerfile else None,
+            'bytes': sum(step['bytes'] for step in steps),
+            'step_seconds': sum(step['duration'] or 0.0 for step in steps),
+            'slowest': sorted([step for step in dockerfile if step['duration']], key=lambda step: step['duration'], reverse=True)[:top]}
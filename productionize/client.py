@@ -0,0 +1,335 @@
+"""
+client.py contains the class client(), which calls the API of a deployed
+product. The client keeps a pool of keep-alive HTTP connections to the product,
+so consecutive calls do not pay for a new TCP connection each time. Payloads
+are serialized as JSON by default, MessagePack and Arrow can be used if they are
+installed. The formats are defined in wrapper.py, so the client and the wrapper
+in the image speak the same formats.
+
+Slots:
+--------
+base_url : string
+    Stores the url of the product without route
+host : string
+    Stores the host of the product
+port : int
+    Stores the port of the product
+prefix : string
+    Stores the path the routes are prefixed with
+timeout : float
+    Stores the timeout of a single call in seconds
+"""
+
+# import libs
+import http.client
+import urllib.parse
+import socket
+import threading
+import queue
+import time
+
+# the formats are shared with the wrapper serving the product
+from productionize.wrapper import CONTENT_TYPES, encode, decode
+
+# setup the class
+class client:
+
+    # describe the class
+    def __init__(self, base_url, pool_size = 8, timeout = 60):
+
+        # make sure there is a scheme
+        if '://' not in base_url:
+
+            # add scheme
+            base_url = str('http://' + base_url)
+
+        # parse the url
+        parsed = urllib.parse.urlparse(base_url)
+
+        # store the url
+        self.base_url = base_url.rstrip('/')
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+
+        # store the path all routes are prefixed with, e.g. of a product in a pack
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+
+        # store the idle connections
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+
+    # helper method to get a connection
+    def __acquire(self):
+
+        """
+        Private method to take an idle connection or open a new one.
+        """
+
+        # try to take an idle connection
+        try:
+
+            # return idle connection
+            return self.pool.get_nowait()
+
+        # if there is none
+        except queue.Empty:
+
+            # open a new connection
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            connection.connect()
+
+            # send small requests right away instead of waiting for acks
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            # return new connection
+            return connection
+
+    # helper method to return a connection
+    def __release(self, connection):
+
+        """
+        Private method to put a connection back into the pool.
+
+        Parameters
+        ----------
+        connection : http.client.HTTPConnection
+            The connection to keep alive
+        """
+
+        # try to keep the connection
+        try:
+
+            # put connection back
+            self.pool.put_nowait(connection)
+
+        # if the pool is full
+        except queue.Full:
+
+            # close the connection
+            connection.close()
+
+    # main method to call the product
+    def request(self, method, route, body = None, headers = None):
+
+        """
+        Main method to call the product over a pooled connection.
+
+        A connection the product closed in the meantime is reopened once.
+
+        Parameters
+        ----------
+        method : string
+            HTTP method, e.g. "GET" or "POST"
+        route : string
+            Route of the API, e.g. "/predict"
+        body : bytes
+            Body of the request
+        headers : dict
+            Headers of the request
+
+        Returns
+        -------
+        tuple
+            Tuple with the status, the headers, the body and the latency in
+            seconds
+        """
+
+        # make sure the route starts with a slash
+        if not route.startswith('/'):
+
+            # add slash
+            route = str('/' + route)
+
+        # add the prefix
+        route = str(self.prefix + route)
+
+        # loop over two attempts
+        for attempt in range(2):
+
+            # get a connection
+            connection = self.__acquire()
+
+            # store start time
+            start = time.perf_counter()
+
+            # try to call the product
+            try:
+
+                # send request
+                connection.request(method, route, body=body, headers=headers or {})
+
+                # read response
+                response = connection.getresponse()
+                content = response.read()
+
+            # handle a connection that went stale
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.CannotSendRequest):
+
+                # close the connection
+                connection.close()
+
+                # check if there is another attempt
+                if attempt == 0:
+
+                    # retry with a new connection
+                    continue
+
+                # raise exception
+                raise
+
+            # handle any other exception
+            except:
+
+                # close the connection
+                connection.close()
+
+                # raise exception
+                raise
+
+            # store latency
+            latency = time.perf_counter() - start
+
+            # check if the product wants to close the connection
+            if response.getheader('Connection', '').lower() == 'close':
+
+                # close the connection
+                connection.close()
+
+            # if the connection can be kept
+            else:
+
+                # put the connection back
+                self.__release(connection)
+
+            # return response with lower case headers
+            return response.status, {key.lower(): value for key, value in response.getheaders()}, content, latency
+
+    # main method to stream a body to the product
+    def stream(self, method, route, chunks, headers = None):
+
+        """
+        Main method to stream a body to the product and read the answer line
+        by line while the body is still being sent.
+
+        The body is sent in chunks by a background thread on a connection of
+        its own, so a product streaming its answer back never waits for the
+        caller to finish sending.
+
+        Parameters
+        ----------
+        method : string
+            HTTP method, e.g. "POST"
+        route : string
+            Route of the API, e.g. "/_bulk"
+        chunks : iterable
+            Iterable with the bytes of the body
+        headers : dict
+            Headers of the request
+
+        Yields
+        ------
+        bytes
+            The lines of the answer
+        """
+
+        # open a connection of its own
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        connection.connect()
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # send the headers
+        connection.putrequest(method, str(self.prefix + (route if route.startswith('/') else str('/' + route))))
+
+        # loop over the headers
+        for name, value in (headers or {}).items():
+
+            # send header
+            connection.putheader(name, value)
+
+        # the body is sent in chunks
+        connection.putheader('Transfer-Encoding', 'chunked')
+        connection.endheaders()
+
+        # store the errors of the sender
+        errors = []
+
+        # helper to send the body
+        def send():
+
+            # try to send the body
+            try:
+
+                # loop over chunks
+                for chunk in chunks:
+
+                    # send non empty chunks
+                    if chunk:
+                        connection.send(b'%x\r\n' % len(chunk) + chunk + b'\r\n')
+
+                # send the last chunk
+                connection.send(b'0\r\n\r\n')
+
+            # handle exception
+            except Exception as error:
+
+                # store error
+                errors.append(error)
+
+        # send the body in the background
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+
+        # try to read the answer
+        try:
+
+            # read the answer
+            response = connection.getresponse()
+
+            # check if the call worked
+            if response.status >= 400:
+
+                # raise Exception
+                raise Exception(str('Your product answered with status ' + str(response.status) + ': ' + response.read(200).decode('utf-8', errors='replace')))
+
+            # loop over the lines of the answer
+            for line in response:
+
+                # yield line
+                yield line
+
+            # wait for the sender
+            sender.join()
+
+            # check if sending failed
+            if errors:
+
+                # raise the error of the sender
+                raise errors[0]
+
+        # clean up
+        finally:
+
+            # close the connection
+            connection.close()
+
+    # main method to close all connections
+    def close(self):
+
+        """
+        Main method to close all idle connections.
+        """
+
+        # loop until the pool is empty
+        while True:
+
+            # try to take an idle connection
+            try:
+
+                # close connection
+                self.pool.get_nowait().close()
+
+            # if there is none left
+            except queue.Empty:
+
+                # stop loop
+                break
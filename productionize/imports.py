@@ -0,0 +1,496 @@
+"""
+imports.py contains the helpers to find the requirements an API script never
+uses. The imports reachable from the API script are found statically, the
+script and the local modules it imports are parsed, not run. The imported
+modules are mapped to the distributions providing them, using the metadata of
+the distributions installed locally. Requirements whose modules are unknown,
+as they are not installed locally, can not be verified and are never dropped.
+Neither are the requirements of a script that loads code by other means than
+an import, e.g. by unpickling a model or by naming a database driver in a url,
+as the modules it needs are not known before it runs.
+
+Functions:
+--------
+scan_script : function
+    Finds the top level modules and the dynamic loads reachable from an API
+    script
+find_imports : function
+    Finds the top level modules reachable from an API script
+distribution_modules : function
+    Finds the top level modules a distribution provides
+dependency_closure : function
+    Finds the distributions a set of distributions installs
+installed_size : function
+    Measures the size of an installed distribution
+find_unused : function
+    Splits the requirements of an API script into used, unused and unverified
+"""
+
+# import libs
+import importlib.metadata
+import ast
+import re
+import sys
+import os
+from productionize.model import DISTRIBUTIONS
+
+# define the modules the wrapper imports if they are installed
+WRAPPER_MODULES = {'numpy', 'msgpack', 'pyarrow'}
+
+# define the modules whose load functions unpickle objects
+PICKLERS = {'pickle', 'cPickle', '_pickle', 'joblib', 'dill', 'cloudpickle', 'torch', 'shelve'}
+
+# define the functions of the picklers that import modules while loading
+PICKLE_LOADS = {'load', 'loads', 'Unpickler', 'open'}
+
+# define the functions that import modules named in their arguments, like drivers and engines
+DYNAMIC_LOADS = {'read_pickle', 'create_engine', 'create_async_engine', 'read_excel', 'to_excel', 'ExcelWriter',
+                 'read_sql', 'read_sql_table', 'read_sql_query', 'to_sql', 'read_parquet', 'to_parquet',
+                 'read_feather', 'to_feather', 'read_orc', 'read_hdf', 'to_hdf', 'load_model'}
+
+# helper function to normalize the name of a distribution
+def normalize(name):
+
+    """
+    Helper function to normalize the name of a distribution.
+
+    Parameters
+    ----------
+    name : string
+        String with the name of the distribution
+
+    Returns
+    -------
+    string
+        String with the lower case name, with runs of "-", "_" and "." as "-"
+    """
+
+    # return normalized name
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+# helper function to scan an API script
+def scan_script(path):
+
+    """
+    Helper function to find the top level modules and the dynamic loads
+    reachable from an API script.
+
+    Local modules next to the script are followed, so their imports count as
+    well. Modules imported with importlib.import_module() or __import__() are
+    found if their name is a literal string. Calls that import modules which
+    are only known when the script runs, like pickle.load(), joblib.load() or
+    create_engine(), are collected as dynamic loads.
+
+    Parameters
+    ----------
+    path : string
+        String with the path of the API script
+
+    Returns
+    -------
+    dict
+        Dict with the set of top level modules outside the standard library
+        and the folder of the script, and the set of dynamic loads
+    """
+
+    # store the folder of the script
+    folder = os.path.dirname(os.path.abspath(path))
+
+    # get the modules of the standard library
+    stdlib = set(getattr(sys, 'stdlib_module_names', ())) | set(sys.builtin_module_names)
+
+    # initialize the modules, the dynamic loads and the files to parse
+    modules = set()
+    loads = set()
+    parsed = set()
+    pending = [os.path.abspath(path)]
+
+    # loop until all local files are parsed
+    while pending:
+
+        # get the next file
+        current = pending.pop()
+
+        # check if the file was parsed
+        if current in parsed:
+
+            # skip file
+            continue
+
+        # store file
+        parsed.add(current)
+
+        # try to parse the file
+        try:
+
+            # parse file
+            with open(current) as file:
+                tree = ast.parse(file.read())
+
+        # if the file can not be parsed
+        except (OSError, SyntaxError, UnicodeDecodeError):
+
+            # skip file
+            continue
+
+        # get the modules imported under another name, like "import pickle as pk"
+        aliases = {alias.asname: alias.name.split('.')[0] for node in ast.walk(tree) if isinstance(node, ast.Import)
+                   for alias in node.names if alias.asname}
+
+        # loop over the nodes
+        for node in ast.walk(tree):
+
+            # initialize the names of the node
+            names = []
+
+            # check if it is an import
+            if isinstance(node, ast.Import):
+
+                # add names
+                names = [alias.name for alias in node.names]
+
+            # check if it is an absolute import from a module
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+
+                # add name
+                names = [node.module]
+
+                # check if a load function of a pickler is imported
+                if node.module.split('.')[0] in PICKLERS and any(alias.name in PICKLE_LOADS for alias in node.names):
+
+                    # add dynamic load
+                    loads.add(str(node.module + '.' + ', '.join(alias.name for alias in node.names if alias.name in PICKLE_LOADS)))
+
+            # check if it is a relative import
+            elif isinstance(node, ast.ImportFrom):
+
+                # follow the module in the folder of the script
+                names = [str('.' + (node.module or alias.name)) for alias in node.names]
+
+            # check if it is a call loading modules that are only known when the script runs
+            if isinstance(node, ast.Call):
+
+                # get the name of the function
+                function = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, 'id', None)
+
+                # get the name of the object the function is called on
+                owner = getattr(node.func.value, 'id', None) if isinstance(node.func, ast.Attribute) else None
+                owner = aliases.get(owner, owner)
+
+                # check if it unpickles or loads a driver or engine
+                if function in DYNAMIC_LOADS or (function in PICKLE_LOADS and owner in PICKLERS):
+
+                    # add dynamic load
+                    loads.add(str(owner + '.' + function) if owner else function)
+
+            # check if it is a dynamic import of a literal name
+            if isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+
+                # get the name of the function
+                function = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, 'id', None)
+
+                # check if it imports
+                if function in ['import_module', '__import__']:
+
+                    # add name
+                    names = [node.args[0].value]
+
+            # loop over names
+            for name in names:
+
+                # get the top level module
+                top = name.lstrip('.').split('.')[0]
+
+                # check if the module is a local file or package
+                local = [candidate for candidate in [os.path.join(folder, str(top + '.py')), os.path.join(folder, top, '__init__.py')]
+                         if os.path.exists(candidate)]
+
+                # check if it is local
+                if local:
+
+                    # parse the local module
+                    pending.extend(local)
+
+                    # check if it is a local package
+                    if local[0].endswith('__init__.py'):
+
+                        # parse the files of the package
+                        pending.extend(os.path.join(folder, top, file) for file in os.listdir(os.path.join(folder, top)) if file.endswith('.py'))
+
+                # check if it is a third party module
+                elif top and not name.startswith('.') and top not in stdlib and not top.startswith('_'):
+
+                    # add module
+                    modules.add(top)
+
+    # return modules and dynamic loads
+    return {'modules': modules, 'loads': loads}
+
+# helper function to find the imports of an API script
+def find_imports(path):
+
+    """
+    Helper function to find the top level modules reachable from an API script.
+
+    Parameters
+    ----------
+    path : string
+        String with the path of the API script
+
+    Returns
+    -------
+    set
+        Set with the top level modules outside the standard library and the
+        folder of the script
+    """
+
+    # return modules
+    return scan_script(path)['modules']
+
+# helper function to find the modules of a distribution
+def distribution_modules(name):
+
+    """
+    Helper function to find the top level modules a distribution provides.
+
+    Parameters
+    ----------
+    name : string
+        String with the name of the distribution
+
+    Returns
+    -------
+    set
+        Set with the top level modules, None if the distribution is not
+        installed locally and its modules are not known
+    """
+
+    # try to read the metadata of the installed distribution
+    try:
+
+        # get distribution
+        distribution = importlib.metadata.distribution(name)
+
+    # if it is not installed
+    except importlib.metadata.PackageNotFoundError:
+
+        # get the known modules of the distribution
+        known = {module for module, provider in DISTRIBUTIONS.items() if normalize(provider) == normalize(name)}
+
+        # return known modules
+        return known or None
+
+    # try to read the declared top level modules
+    top_level = distribution.read_text('top_level.txt')
+
+    # check if they are declared
+    if top_level:
+
+        # return modules
+        return {line.strip() for line in top_level.splitlines() if line.strip()}
+
+    # initialize the modules
+    modules = set()
+
+    # loop over the files of the distribution
+    for file in distribution.files or []:
+
+        # get the first part of the path
+        top = file.parts[0]
+
+        # check if it is a module or a package
+        if top.endswith('.py') or (len(file.parts) > 1 and not top.endswith(('.dist-info', '.egg-info', '.data')) and top != '..'):
+
+            # add module
+            modules.add(top[:-3] if top.endswith('.py') else top)
+
+    # return modules
+    return modules
+
+# helper function to find the dependencies of distributions
+def dependency_closure(names):
+
+    """
+    Helper function to find the distributions a set of distributions installs.
+
+    The dependencies are read from the metadata of the distributions installed
+    locally. Optional dependencies behind an extra are left out, other
+    environment markers are ignored, so the closure rather contains too many
+    distributions than too few.
+
+    Parameters
+    ----------
+    names : iterable
+        Iterable with the names of the distributions
+
+    Returns
+    -------
+    set
+        Set with the normalized names of the distributions and their
+        dependencies
+    """
+
+    # initialize the closure and the names to visit
+    closure = set()
+    pending = [normalize(name) for name in names]
+
+    # loop until all names are visited
+    while pending:
+
+        # get the next name
+        name = pending.pop()
+
+        # check if it was visited
+        if name in closure:
+
+            # skip name
+            continue
+
+        # store name
+        closure.add(name)
+
+        # try to read the dependencies
+        try:
+
+            # get dependencies
+            requires = importlib.metadata.requires(name) or []
+
+        # if it is not installed
+        except importlib.metadata.PackageNotFoundError:
+
+            # skip dependencies
+            continue
+
+        # loop over dependencies
+        for requirement in requires:
+
+            # skip optional dependencies, which are behind an extra
+            if re.search(r'extra\s*==', requirement):
+
+                # skip dependency
+                continue
+
+            # add dependency
+            pending.append(normalize(re.split(r'[<>=!~;\[ (]', requirement.strip())[0]))
+
+    # return closure
+    return closure
+
+# helper function to measure an installed distribution
+def installed_size(name):
+
+    """
+    Helper function to measure the size of an installed distribution.
+
+    Parameters
+    ----------
+    name : string
+        String with the name of the distribution
+
+    Returns
+    -------
+    int
+        Size in bytes, 0 if the distribution is not installed locally
+    """
+
+    # try to read the files of the distribution
+    try:
+
+        # get files
+        files = importlib.metadata.files(name) or []
+
+    # if it is not installed
+    except importlib.metadata.PackageNotFoundError:
+
+        # return zero
+        return 0
+
+    # initialize the size
+    size = 0
+
+    # loop over files
+    for file in files:
+
+        # try to measure the file
+        try:
+
+            # add size
+            size += os.path.getsize(file.locate())
+
+        # if the file is gone
+        except OSError:
+
+            # skip file
+            continue
+
+    # return size
+    return size
+
+# helper function to find the unused requirements
+def find_unused(paths, requirements, wrapped = False):
+
+    """
+    Helper function to split the requirements of API scripts into used, unused
+    and unverified ones.
+
+    If the scripts load modules dynamically, e.g. by unpickling a model, the
+    requirements they do not import are unverified rather than unused, as the
+    loaded objects may need them.
+
+    Parameters
+    ----------
+    paths : list
+        List with the paths of the API scripts
+    requirements : dict
+        Dict with the requirement lines by normalized name of the distribution
+    wrapped : boolean
+        If True, the modules the wrapper imports if they are installed count as
+        used
+
+    Returns
+    -------
+    dict
+        Dict with the lists of used, unused and unverified normalized names,
+        the modules imported by the scripts and their dynamic loads
+    """
+
+    # find the imports and dynamic loads of the scripts
+    modules = set()
+    loads = set()
+
+    # loop over the scripts
+    for path in paths:
+
+        # scan script
+        scanned = scan_script(path)
+
+        # add imports and dynamic loads
+        modules |= scanned['modules']
+        loads |= scanned['loads']
+
+    # initialize the used modules, the wrapper may use some if installed
+    used_modules = modules | WRAPPER_MODULES if wrapped else modules
+
+    # initialize the split
+    split = {'used': [], 'unused': [], 'unverified': [], 'modules': sorted(modules), 'loads': sorted(loads)}
+
+    # loop over requirements
+    for name in requirements:
+
+        # get the modules of the distribution
+        provided = distribution_modules(name)
+
+        # check if the modules are known
+        if provided is None:
+
+            # a module named like the distribution counts as used, else it can not be verified
+            split['used' if normalize(name).replace('-', '_') in used_modules or name in used_modules else 'unverified'].append(name)
+
+        # if they are known
+        else:
+
+            # store if the script imports any of them, requirements not imported can not be verified if the script loads modules dynamically
+            split['used' if provided & used_modules else 'unverified' if loads else 'unused'].append(name)
+
+    # return split
+    return split
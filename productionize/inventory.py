@@ -0,0 +1,466 @@
+"""
+inventory.py contains the class inventory(), which keeps an in-memory view of
+the projects and products on the workbench. The inventory is seeded by a single
+listing of the cluster and then kept current by streaming watches on the
+namespaces, deployments, pods and services of the cluster. A product exists as
+long as its deployment does, even if it is scaled to zero and has no pods. That way, the workbench can
+answer which projects and products exist without calling the cluster.
+
+Slots:
+--------
+projects : dict
+    Stores the products, deployments and services per project
+watching : boolean
+    Stores if the watches are currently streaming
+"""
+
+# import libs
+import subprocess
+import threading
+import json
+
+# namespaces that are not considered to be projects
+SYSTEM_NAMESPACES = ['default', 'kube-system', 'kube-public', 'kube-node-lease', 'kubernetes-dashboard']
+
+# setup the class
+class inventory:
+
+    # describe the class
+    def __init__(self):
+
+        # store the projects
+        self.projects = {}
+
+        # store if the watches are streaming
+        self.watching = False
+
+        # store the lock to guard the projects
+        self.lock = threading.Lock()
+
+        # store the watch processes and threads
+        self.processes = []
+        self.threads = []
+
+    # helper method to get a project
+    def __get_project(self, name):
+
+        """
+        Private method to get a project and add it if it is new.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        """
+
+        # add project if it is new
+        if name not in self.projects:
+
+            # add empty project
+            self.projects[name] = {'products': {}, 'deployments': set(), 'services': set()}
+
+        # return project
+        return self.projects[name]
+
+    # helper method to apply a single item
+    def __apply(self, event_type, item):
+
+        """
+        Private method to apply a single item to the inventory.
+
+        This function has to be called while holding the lock.
+
+        Parameters
+        ----------
+        event_type : string
+            String with the type of the event: ADDED, MODIFIED or DELETED
+        item : dict
+            Dict with the Kubernetes object
+        """
+
+        # get kind and metadata
+        kind = item.get('kind')
+        metadata = item.get('metadata', {})
+
+        # check if item is a namespace
+        if kind == 'Namespace':
+
+            # get name
+            name = metadata.get('name')
+
+            # skip system namespaces
+            if name in SYSTEM_NAMESPACES:
+
+                # stop function
+                return
+
+            # check if namespace is gone or going
+            if event_type == 'DELETED' or item.get('status', {}).get('phase') == 'Terminating':
+
+                # remove project
+                self.projects.pop(name, None)
+
+            # if namespace exists
+            else:
+
+                # add project
+                self.__get_project(name)
+
+            # stop function
+            return
+
+        # get namespace
+        namespace = metadata.get('namespace')
+
+        # skip system namespaces
+        if namespace in SYSTEM_NAMESPACES:
+
+            # stop function
+            return
+
+        # check if item is a deployment
+        if kind == 'Deployment':
+
+            # check if deployment is gone
+            if event_type == 'DELETED':
+
+                # check if project is known
+                if namespace in self.projects:
+
+                    # remove deployment
+                    self.projects[namespace]['deployments'].discard(metadata.get('name'))
+
+            # if deployment exists
+            else:
+
+                # add deployment
+                self.__get_project(namespace)['deployments'].add(metadata.get('name'))
+
+        # check if item is a pod, the pods pre-pulling an image are not products
+        elif kind == 'Pod' and 'prepull' not in metadata.get('labels', {}):
+
+            # the product is named by the run label
+            product_name = metadata.get('labels', {}).get('run', metadata.get('name'))
+
+            # check if pod is gone
+            if event_type == 'DELETED':
+
+                # check if project is known
+                if namespace in self.projects:
+
+                    # get the pods of the product
+                    pods = self.projects[namespace]['products'].get(product_name, {})
+
+                    # remove pod
+                    pods.pop(metadata.get('name'), None)
+
+                    # remove product if it has no pods left
+                    if not pods:
+
+                        # remove product
+                        self.projects[namespace]['products'].pop(product_name, None)
+
+            # if pod exists
+            else:
+
+                # add the pod to the product
+                pods = self.__get_project(namespace)['products'].setdefault(product_name, {})
+                pods[metadata.get('name')] = item.get('status', {}).get('phase')
+
+        # check if item is a service
+        elif kind == 'Service':
+
+            # check if service is gone
+            if event_type == 'DELETED':
+
+                # check if project is known
+                if namespace in self.projects:
+
+                    # remove service
+                    self.projects[namespace]['services'].discard(metadata.get('name'))
+
+            # if service exists
+            else:
+
+                # add service
+                self.__get_project(namespace)['services'].add(metadata.get('name'))
+
+    # main method to seed the inventory
+    def seed(self, listing):
+
+        """
+        Main method to seed the inventory from a listing of the cluster.
+
+        Parameters
+        ----------
+        listing : dict
+            Dict with the output of kubectl get -o json
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # reset the projects
+            self.projects = {}
+
+            # loop over items
+            for item in listing.get('items', []):
+
+                # apply the item
+                self.__apply('ADDED', item)
+
+    # helper method to follow a single watch
+    def __follow(self, process):
+
+        """
+        Private method to follow the output of a single watch.
+
+        kubectl streams the watch events as a sequence of JSON objects,
+        which are decoded and applied to the inventory as they arrive.
+
+        Parameters
+        ----------
+        process : subprocess.Popen
+            The running kubectl watch
+        """
+
+        # initialize the decoder and buffer
+        decoder = json.JSONDecoder()
+        buffer = ''
+
+        # loop over the output of the watch
+        for line in process.stdout:
+
+            # add line to buffer
+            buffer = buffer + line
+
+            # decode all complete events in the buffer
+            while True:
+
+                # strip leading whitespace
+                buffer = buffer.lstrip()
+
+                # try to decode an event
+                try:
+
+                    # decode event
+                    event, end = decoder.raw_decode(buffer)
+
+                # if the event is not complete yet
+                except ValueError:
+
+                    # wait for more output
+                    break
+
+                # drop the event from the buffer
+                buffer = buffer[end:]
+
+                # apply the event
+                with self.lock:
+
+                    # apply the event
+                    self.__apply(event.get('type'), event.get('object', {}))
+
+        # the watch ended
+        self.watching = False
+
+    # main method to start the watches
+    def start(self):
+
+        """
+        Main method to start streaming watches on the cluster.
+
+        This function starts one kubectl watch on namespaces, deployments,
+        pods and services each. The watches replay the current objects first, so
+        nothing is missed between seeding and watching.
+        """
+
+        # check if already watching
+        if self.watching:
+
+            # stop function
+            return
+
+        # clean up watches that ended on their own
+        self.stop()
+
+        # try to start the watches
+        try:
+
+            # loop over the resources
+            for resource in ['namespaces', 'deployments', 'pods', 'services']:
+
+                # start the watch
+                command = str('kubectl get ' + resource + ' --all-namespaces --watch --output-watch-events -o json')
+                process = subprocess.Popen(command.split(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+                # follow the watch in the background
+                thread = threading.Thread(target=self.__follow, args=(process,), daemon=True)
+                thread.start()
+
+                # store process and thread
+                self.processes.append(process)
+                self.threads.append(thread)
+
+            # update status
+            self.watching = True
+
+        # handle exception
+        except:
+
+            # stop the watches that were started
+            self.stop()
+
+            # raise exception
+            raise Exception('I could not start watching the workbench cluster')
+
+    # main method to stop the watches
+    def stop(self):
+
+        """
+        Main method to stop the streaming watches.
+        """
+
+        # loop over processes
+        for process in self.processes:
+
+            # terminate the watch
+            process.terminate()
+
+        # loop over threads
+        for thread in self.threads:
+
+            # wait for the thread to finish
+            thread.join(timeout=5)
+
+        # reset processes and threads
+        self.processes = []
+        self.threads = []
+
+        # update status
+        self.watching = False
+
+    # main method to add a project
+    def add_project(self, name):
+
+        """
+        Main method to add a project right away, before the watch reports it.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # add project
+            self.__get_project(name)
+
+    # main method to remove a project
+    def remove_project(self, name):
+
+        """
+        Main method to remove a project right away, before the watch reports it.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # remove project
+            self.projects.pop(name, None)
+
+    # main method to list projects
+    def list_projects(self):
+
+        """
+        Main method to list all projects in the inventory.
+
+        Returns
+        -------
+        list
+            List with the names of the projects
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # return projects
+            return sorted(self.projects)
+
+    # main method to list products
+    def list_products(self, project):
+
+        """
+        Main method to list all products of a project in the inventory.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+
+        Returns
+        -------
+        list
+            List with the names of the products, with pods or with a
+            deployment scaled to zero
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # get the project
+            content = self.projects.get(project, {})
+
+            # return products
+            return sorted(set(content.get('products', {})) | content.get('deployments', set()))
+
+    # main method to check if a product exists
+    def has_product(self, project, product):
+
+        """
+        Main method to check if a product has pods or a deployment in a
+        project, so a product scaled to zero exists as well.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # get the project
+            content = self.projects.get(project, {})
+
+            # return if product exists
+            return product in content.get('products', {}) or product in content.get('deployments', set())
+
+    # main method to check if a service exists
+    def has_service(self, project, product):
+
+        """
+        Main method to check if a product has a service in a project.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+        """
+
+        # lock the inventory
+        with self.lock:
+
+            # return if service exists
+            return product in self.projects.get(project, {}).get('services', set())
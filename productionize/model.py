@@ -0,0 +1,331 @@
+"""
+model.py contains the helpers to turn a trained model into a product. The model
+is saved next to a generated API script, which loads it once and predicts whole
+batches as NumPy arrays. Models saved with joblib are loaded memory-mapped, so
+the workers of the product share the pages of the model arrays. The
+requirements of the script are derived from the modules the model is made of
+and pinned to the versions installed locally, so the container unpickles the
+model with the same libraries it was trained with.
+
+Functions:
+--------
+save_model : function
+    Saves a model object or copies a saved model
+find_modules : function
+    Finds the top level modules the classes of a model come from
+model_requirements : function
+    Builds the pinned requirements of a model
+write_api : function
+    Writes the vectorized API script serving a model
+"""
+
+# import libs
+import importlib.metadata
+import shutil
+import pickle
+import json
+import sys
+import os
+
+# define the distributions of modules that are named differently
+DISTRIBUTIONS = {'sklearn': 'scikit-learn',
+                 'skimage': 'scikit-image',
+                 'cv2': 'opencv-python',
+                 'yaml': 'PyYAML',
+                 'PIL': 'Pillow'}
+
+# define the template of the API script
+API_TEMPLATE = '''\
+"""
+API script generated by productionize, serving {model_file}.
+
+The model is loaded once. predict() takes a whole batch of records and runs the
+model over it at once, the wrapper of the product serves it on /predict,
+/_predict and the streaming bulk endpoint /_bulk.
+"""
+
+# import libs
+import os
+import numpy
+{loader_import}
+
+# define the features the model expects, in order
+FEATURES = {features}
+
+# define the dtype of the features
+DTYPE = {dtype!r}
+
+# load the model once, before the wrapper forks its workers
+model = {loader}(os.path.join(os.path.dirname(os.path.abspath(__file__)), {model_file!r}))
+
+# helper function to turn a batch into a matrix
+def to_matrix(records):
+
+    # check if the records are dicts of features
+    if isinstance(records, (list, tuple)) and records and isinstance(records[0], dict):
+
+        # order the features
+        records = [[record[feature] for feature in FEATURES] for record in records]
+
+    # turn the batch into a matrix without copying NumPy input
+    matrix = numpy.asarray(records, dtype=DTYPE)
+
+    # a single record becomes a batch of one
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    # check the number of features
+    if matrix.shape[1] != len(FEATURES):
+        raise ValueError('Expected ' + str(len(FEATURES)) + ' features per record, got ' + str(matrix.shape[1]))
+
+    # return matrix
+    return matrix
+
+# main function to predict a batch
+def predict(records):
+
+    # predict the whole batch at once
+    return model.{method}(to_matrix(records))
+'''
+
+# setup the class of a file that forgets what is written
+class discard:
+
+    # forget the bytes
+    def write(self, data):
+
+        # return number of bytes, large arrays are written as buffers
+        return memoryview(data).nbytes
+
+# setup the class of a pickler that records the modules of a model
+class recorder(pickle.Pickler):
+
+    # describe the class
+    def __init__(self):
+
+        # initialize the pickler without keeping the bytes
+        super().__init__(discard(), protocol=pickle.HIGHEST_PROTOCOL)
+
+        # store the modules
+        self.modules = set()
+
+    # record the module of every object
+    def reducer_override(self, obj):
+
+        # get the module of classes and functions or of the type of the object
+        module = getattr(obj, '__module__', None) if isinstance(obj, type) or callable(obj) else type(obj).__module__
+
+        # check if there is a module
+        if isinstance(module, str):
+
+            # record the top level module
+            self.modules.add(module.split('.')[0])
+
+        # pickle as usual
+        return NotImplemented
+
+# helper function to save a model
+def save_model(model, folder):
+
+    """
+    Helper function to save a model object or copy a saved model.
+
+    Model objects are saved with joblib if it is installed, as joblib stores
+    NumPy arrays as plain buffers, else they are pickled.
+
+    Parameters
+    ----------
+    model : object
+        Model object or path to a pickle or joblib file
+    folder : string
+        String with the folder to save the model to
+
+    Returns
+    -------
+    tuple
+        Tuple with the file name of the model and the loaded model object
+    """
+
+    # check if the model is a path
+    if isinstance(model, str):
+
+        # get the file name
+        extension = os.path.splitext(model)[1].lower()
+        model_file = str('model' + ('.joblib' if extension == '.joblib' else '.pkl'))
+
+        # copy the model
+        shutil.copyfile(model, os.path.join(folder, model_file))
+
+        # check if the model was saved with joblib
+        if extension == '.joblib':
+
+            # import joblib
+            import joblib
+
+            # load model
+            return model_file, joblib.load(model)
+
+        # load model
+        with open(model, 'rb') as file:
+            return model_file, pickle.load(file)
+
+    # try to save with joblib
+    try:
+
+        # import joblib
+        import joblib
+
+        # save model
+        joblib.dump(model, os.path.join(folder, 'model.joblib'))
+
+        # return file name
+        return 'model.joblib', model
+
+    # if joblib is not installed
+    except ImportError:
+
+        # pickle model
+        with open(os.path.join(folder, 'model.pkl'), 'wb') as file:
+            pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # return file name
+        return 'model.pkl', model
+
+# helper function to find the modules of a model
+def find_modules(model):
+
+    """
+    Helper function to find the top level modules a model is made of.
+
+    The model is walked like it would be pickled, without keeping the bytes,
+    so every class and function the container needs to unpickle it is found.
+
+    Parameters
+    ----------
+    model : object
+        The model object
+
+    Returns
+    -------
+    set
+        Set with the names of the top level modules outside the standard library
+    """
+
+    # walk the model
+    walker = recorder()
+    walker.dump(model)
+
+    # get the modules of the standard library
+    stdlib = set(getattr(sys, 'stdlib_module_names', ())) | set(sys.builtin_module_names)
+
+    # return modules outside the standard library
+    return {module for module in walker.modules if module not in stdlib and not module.startswith('_') and module != '__main__'}
+
+# helper function to build the requirements of a model
+def model_requirements(model, model_file):
+
+    """
+    Helper function to build the pinned requirements of a model.
+
+    Parameters
+    ----------
+    model : object
+        The model object
+    model_file : string
+        String with the file name of the saved model
+
+    Returns
+    -------
+    list
+        List with the requirements, pinned to the installed versions
+    """
+
+    # get the distributions of the modules
+    try:
+
+        # map modules to distributions
+        packages = importlib.metadata.packages_distributions()
+
+    # if the mapping is not available
+    except AttributeError:
+
+        # use the known names only
+        packages = {}
+
+    # the API script always needs numpy
+    modules = find_modules(model) | {'numpy'}
+
+    # check if the model was saved with joblib
+    if model_file.endswith('.joblib'):
+
+        # add joblib
+        modules.add('joblib')
+
+    # initialize the requirements
+    requirements = {}
+
+    # loop over modules
+    for module in sorted(modules):
+
+        # get the distribution
+        distribution = packages.get(module, [DISTRIBUTIONS.get(module, module)])[0]
+
+        # try to pin the installed version
+        try:
+
+            # pin version
+            requirements[distribution.lower()] = str(distribution + '==' + importlib.metadata.version(distribution))
+
+        # if the distribution is not installed
+        except importlib.metadata.PackageNotFoundError:
+
+            # leave it unpinned
+            requirements[distribution.lower()] = distribution
+
+    # return requirements
+    return [requirements[key] for key in sorted(requirements)]
+
+# helper function to write the API script
+def write_api(path, model_file, features, dtype, method):
+
+    """
+    Helper function to write the vectorized API script serving a model.
+
+    Parameters
+    ----------
+    path : string
+        String with the path of the API script
+    model_file : string
+        String with the file name of the saved model next to the script
+    features : list
+        List with the names of the features in order
+    dtype : string
+        String with the NumPy dtype of the features
+    method : string
+        String with the method of the model to call, e.g. "predict_proba"
+    """
+
+    # check if the model was saved with joblib
+    if model_file.endswith('.joblib'):
+
+        # load with joblib, mapping the arrays of the model read-only into memory
+        loader_import, loader = 'import joblib', "(lambda path: joblib.load(path, mmap_mode='r'))"
+
+    # if it was pickled
+    else:
+
+        # load with pickle, closing the file once it is read
+        loader_import, loader = str('import pickle\n\n'
+                                    + '# helper function to load the pickled model\n'
+                                    + 'def load(path):\n'
+                                    + '    with open(path, \'rb\') as file:\n'
+                                    + '        return pickle.load(file)'), 'load'
+
+    # write the script
+    with open(path, 'w') as file:
+        file.write(API_TEMPLATE.format(model_file = model_file,
+                                       loader_import = loader_import,
+                                       loader = loader,
+                                       features = json.dumps(list(features)),
+                                       dtype = dtype,
+                                       method = method))
@@ -20,24 +20,313 @@ api_file : string
     Contains the path to the api_file that should be used
 requirements_file : string
     Contains the path to the requirements_file that should be used
+model_file : string
+    Contains the path to the saved model, if the API was generated from a model
+lock_file : string
+    Contains the path to the hash-pinned lock of the requirements, None if the
+    requirements are installed unlocked
+precompile : boolean
+    If True, the bytecode of the API and its dependencies is compiled in the
+    image
+unused_requirements : list
+    Contains the requirements the API script never imports
 port : string
     Contains the port the API should be exposed to
 service_url : string
     Contains the url to reach your service
 local : boolean
     If True, the product will be deployed on localhost
+workbench : workbench
+    The workbench the product is deployed to, if given its inventory is used
+store : store
+    Stores the persistent state of the product
+build_hash : string
+    Contains the hash of the files the image was built from
+image_digest : string
+    Contains the digest of the image of the product
+build_profile : dict
+    Contains the steps, cache hits and bytes transferred of the latest build
+resources : dict
+    Contains the cpu and memory requests and limits and the number of workers
+replicas : int
+    Contains the number of replicas of the product
+spread : string
+    Contains how the replicas are spread over the nodes
+wrapped : boolean
+    If True, the API script is served by the wrapper injected into the image
+packed : list
+    Contains the names of the products packed into this product
+packed_in : string
+    Contains the name of the pack serving this product
+base_url : string
+    Contains the url of the product without route, resolved once per deployment
+latencies : deque
+    Contains the latencies of the latest calls to the product in seconds
+throughput : dict
+    Contains the rows, batches, duration and rows per second of the latest
+    bulk scoring
+autoscaling : threading.Event
+    Stores the event stopping the autoscaling, None if the product is not
+    autoscaled
 """
 
 # import libs
 import subprocess
+import hashlib
+import shutil
+import ast
+import re
+import json
+import time
+import collections
+import concurrent.futures
+import threading
+import itertools
+import calendar
+import uuid
+import tempfile
+import shlex
 import os
 import sys
+from productionize.store import store
+from productionize.model import save_model, model_requirements, write_api
+from productionize.client import client, encode, decode
+from productionize.autoscaler import policy, measure, simulate, METRICS
+from productionize.imports import find_unused, dependency_closure, installed_size
+from productionize.buildprofile import read_progress, summarize
+from productionize.resources import parse_cpu, parse_memory, thread_count
+
+# environment variables that size the thread pools of numerical libraries
+THREAD_VARIABLES = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                    'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS']
+
+# content types of the files the bulk endpoint takes, by extension
+BULK_CONTENT_TYPES = {'.csv': 'text/csv',
+                      '.jsonl': 'application/x-ndjson',
+                      '.ndjson': 'application/x-ndjson',
+                      '.arrow': 'application/vnd.apache.arrow.stream',
+                      '.arrows': 'application/vnd.apache.arrow.stream'}
+
+# resources a product can declare
+RESOURCE_KEYS = ['cpu_request', 'memory_request', 'cpu_limit', 'memory_limit', 'workers']
+
+# script measuring inside the container the seconds from its start to the first response
+FIRST_RESPONSE_SCRIPT = """
+import os, time, urllib.request, urllib.error
+start = int(open('/proc/1/stat').read().rsplit(')', 1)[1].split()[19]) / os.sysconf('SC_CLK_TCK')
+deadline = time.time() + {timeout}
+while time.time() < deadline:
+    try:
+        urllib.request.urlopen('http://127.0.0.1:{port}/', timeout=1)
+        break
+    except urllib.error.HTTPError:
+        break
+    except Exception:
+        time.sleep(0.01)
+else:
+    raise SystemExit(1)
+print(float(open('/proc/uptime').read().split()[0]) - start)
+"""
+
+# helper function to read the output of -X importtime
+def read_importtime(text):
+
+    """
+    Helper function to read the import times Python writes with -X importtime.
+
+    Parameters
+    ----------
+    text : string
+        String with the output of the interpreter
+
+    Returns
+    -------
+    list
+        List with a dict per import holding the module, its own and its
+        cumulative import time in seconds and its depth in the import tree
+    """
+
+    # initialize the imports
+    imports = []
+
+    # loop over lines
+    for line in text.splitlines():
+
+        # check if the line is an import time
+        if not line.startswith('import time:') or '[us]' in line:
+
+            # skip line
+            continue
+
+        # split the fields
+        own, cumulative, module = line[len('import time:'):].split('|', 2)
+
+        # store the import, the depth is the indentation of the module
+        imports.append({'module': module.strip(),
+                        'self': int(own) / 1e6,
+                        'cumulative': int(cumulative) / 1e6,
+                        'depth': (len(module) - len(module.lstrip()) - 1) // 2})
+
+    # return imports
+    return imports
+
+# helper function to read a requirements file
+def read_requirements(path):
+
+    """
+    Helper function to read the requirements of a requirements file.
+
+    Parameters
+    ----------
+    path : string
+        String with the path of the requirements file
+
+    Returns
+    -------
+    dict
+        Dict with the requirement lines by the normalized name of their
+        distribution, in the order of the file
+    """
+
+    # initialize the requirements
+    requirements = {}
+
+    # read the requirements
+    with open(path) as file:
+
+        # loop over lines
+        for line in file:
+
+            # strip comments and whitespace
+            line = line.split('#')[0].strip()
+
+            # skip empty lines
+            if not line:
+
+                # skip line
+                continue
+
+            # store requirement by the name of its distribution
+            requirements[re.split(r'[<>=!~;\[ ]', line)[0].lower().replace('_', '-')] = line
+
+    # return requirements
+    return requirements
+
+# helper function to lock requirements
+def lock_requirements(requirements, py_version, folder, docker_env = True):
+
+    """
+    Helper function to resolve requirements into a hash-pinned lock.
+
+    The requirements are resolved once by pip in the Python image, so the
+    lock fits the platform of the container. Locks are cached in a folder by
+    the hash of the Python version and the requirements, so the same
+    requirements always give the same lock, byte for byte.
+
+    Parameters
+    ----------
+    requirements : bytes
+        Bytes with the content of the requirements file
+    py_version : string
+        String with the Python version of the image
+    folder : string
+        String with the folder caching the locks
+    docker_env : boolean
+        If True, the docker daemon of minikube is tried as well
+
+    Returns
+    -------
+    string
+        String with the path of the cached lock, None if the requirements
+        could not be locked
+    """
+
+    # hash the Python version and the requirements
+    key = hashlib.sha256(py_version.encode('utf-8') + b'\n' + requirements).hexdigest()
+
+    # store the path of the cached lock
+    cache_file = os.path.join(folder, str(key + '.txt'))
+
+    # check if the requirements were locked before
+    if os.path.exists(cache_file):
+
+        # return the cached lock
+        return cache_file
+
+    # print message
+    print ('> Resolving your requirements into a lock, this is only done once')
+
+    # resolve the requirements with pip in the Python image, reading them from stdin
+    command = str('docker run --rm -i python:' + py_version
+                  + ' sh -c "cat > /tmp/requirements.txt && python -m pip install --quiet --dry-run --ignore-installed'
+                  + ' --disable-pip-version-check --report - -r /tmp/requirements.txt"')
+
+    # initialize the report
+    report = None
+
+    # loop over the local docker daemon and the one of minikube, if its runtime offers one
+    for prefix in [''] + (['eval $(minikube -p minikube docker-env) && '] if docker_env else []):
+
+        # try to resolve the requirements
+        try:
+
+            # read the report of pip
+            report = json.loads(subprocess.run(str(prefix + command), shell=True, input=requirements, check=True,
+                                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout)
+
+            # stop loop
+            break
+
+        # if this daemon can not resolve them
+        except:
+
+            # try the next one
+            continue
+
+    # check if the requirements were resolved
+    if report is None:
+
+        # print message
+        print ('> I could not resolve your requirements into a lock, they are installed unlocked')
+
+        # return None
+        return None
+
+    # initialize the lines of the lock
+    lines = []
+
+    # loop over the resolved distributions
+    for item in report['install']:
+
+        # get the hashes of the archive
+        hashes = item.get('download_info', {}).get('archive_info', {}).get('hashes', {})
+
+        # check if the archive has a hash, e.g. not for local folders or VCS urls
+        if 'sha256' not in hashes:
+
+            # print message
+            print (str('> I could not lock ' + item['metadata']['name'] + ', as it has no archive hash, your requirements are installed unlocked'))
+
+            # return None
+            return None
+
+        # pin the distribution to its version and archive
+        lines.append(str(item['metadata']['name'].lower() + '==' + item['metadata']['version'] + ' --hash=sha256:' + hashes['sha256']))
+
+    # write the lock in a stable order, atomically for concurrent preparations
+    os.makedirs(folder, exist_ok=True)
+    with open(str(cache_file + '.' + str(os.getpid())), 'w') as file:
+        file.write('\n'.join(sorted(lines)) + '\n')
+    os.replace(str(cache_file + '.' + str(os.getpid())), cache_file)
+
+    # return the cached lock
+    return cache_file
 
 # setup the class
 class product:
 
     # describe the class
-    def __init__(self, name = None, project = None):
+    def __init__(self, name = None, project = None, workbench = None, state_file = None):
 
         # store working directory
         self.wd = os.getcwd()
@@ -77,6 +366,18 @@ class product:
         # store path to requirements file
         self.requirements_file = None
 
+        # store path to the saved model
+        self.model_file = None
+
+        # store path to the lock of the requirements
+        self.lock_file = None
+
+        # store if the bytecode is compiled in the image
+        self.precompile = False
+
+        # store the requirements the API script never imports
+        self.unused_requirements = []
+
         # store port to deploy
         self.port = None
 
@@ -85,6 +386,93 @@ class product:
 
         # store if local deployment
         self.local = None
+
+        # store the workbench
+        self.workbench = workbench
+
+        # store path to Dockerfile
+        self.dk_file_path = None
+
+        # store build hash and image digest
+        self.build_hash = None
+        self.image_digest = None
+
+        # store the profile of the latest build
+        self.build_profile = None
+
+        # store resources
+        self.resources = {}
+
+        # store replicas and how they are spread
+        self.replicas = 1
+        self.spread = None
+
+        # store if the API is served by the wrapper
+        self.wrapped = False
+
+        # store the products packed into this product and the pack serving it
+        self.packed = None
+        self.packed_in = None
+
+        # store the base url and the client calling it
+        self.base_url = None
+        self.client = None
+
+        # store the latencies of the latest calls
+        self.latencies = collections.deque(maxlen=10000)
+
+        # store the throughput of the latest bulk scoring
+        self.throughput = None
+
+        # store the autoscaling
+        self.autoscaling = None
+
+        # check if the workbench brings its store
+        if workbench is not None:
+
+            # share the store of the workbench
+            self.store = workbench.store
+
+        # if there is no workbench
+        else:
+
+            # open the store
+            self.store = store(path = state_file)
+
+        # reattach to a product recorded by a previous session
+        recorded = self.store.get_product(project = self.project_name, name = self.product_name)
+
+        # check if the product was recorded
+        if recorded is not None:
+
+            # restore the slots
+            self.api_file = recorded['api_file']
+            self.requirements_file = recorded['requirements_file']
+            self.port = recorded['port']
+            self.dk_file_path = recorded['dk_file_path']
+            self.service_url = recorded['service_url']
+            self.local = recorded['local']
+            self.build_hash = recorded['build_hash']
+            self.image_digest = recorded['image_digest']
+            self.build_profile = next(iter(self.store.history(project = self.project_name, product = self.product_name)['builds']), {}).get('profile')
+            self.current_status = recorded['status'] or self.current_status
+            self.resources = {key: recorded['settings'].get(key) for key in RESOURCE_KEYS if recorded['settings'].get(key) is not None}
+            self.replicas = recorded['settings'].get('replicas', self.replicas)
+            self.spread = recorded['settings'].get('spread', self.spread)
+            self.base_url = recorded['settings'].get('base_url')
+            self.wrapped = recorded['settings'].get('wrapped', self.wrapped)
+            self.model_file = recorded['settings'].get('model_file')
+            self.lock_file = recorded['settings'].get('lock_file')
+            self.precompile = recorded['settings'].get('precompile', self.precompile)
+            self.unused_requirements = recorded['settings'].get('unused_requirements', self.unused_requirements)
+            self.packed = recorded['settings'].get('packed')
+            self.packed_in = recorded['settings'].get('packed_in')
+
+            # check if the recorded deployment is still there
+            if self.current_status in ['deployed and healthy', 'deployed and not ready', 'scaled to zero']:
+
+                # check the status on the cluster
+                self.__check_recorded()
     
         # build report
         report = """
@@ -127,6 +515,88 @@ class product:
         # print report
         print (report)
 
+    # helper method to check a reattached deployment
+    def __check_recorded(self):
+
+        """
+        Private method to check the status of a reattached deployment against
+        the cluster, or against docker for a local deployment. The store may
+        tell a product is deployed after its cluster was deleted or its
+        deployment removed outside of productionize. If the cluster can not
+        be reached, the recorded status is kept.
+        """
+
+        # check if the product runs locally
+        if self.local:
+
+            # check if the container exists
+            status = self.current_status if self.__check_container(product = self.product_name) else 'deleted'
+
+        # if it runs on the workbench
+        else:
+
+            # try to read the deployment, a packed product runs in the deployment of its pack
+            try:
+
+                # read deployment
+                command = str('kubectl get deployment ' + (self.packed_in or self.product_name) + ' -n ' + self.project_name + ' -o json')
+                result = subprocess.run(command.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+
+            # handle exception
+            except:
+
+                # keep the recorded status
+                result = None
+
+            # check if the deployment is gone
+            if result is not None and result.returncode != 0 and b'NotFound' in result.stderr:
+
+                # update status
+                status = 'deleted'
+
+            # check if the cluster could not be reached
+            elif result is None or result.returncode != 0:
+
+                # print message
+                print (str('> I could not reach the workbench to check ' + self.product_name + ', its status is the one recorded: ' + self.current_status))
+
+                # stop function
+                return None
+
+            # if the deployment exists
+            else:
+
+                # read the replicas
+                deployment = json.loads(result.stdout)
+                replicas = deployment.get('spec', {}).get('replicas', 1)
+                ready = deployment.get('status', {}).get('readyReplicas') or 0
+
+                # get the status from the replicas
+                status = 'scaled to zero' if replicas == 0 else 'deployed and healthy' if ready > 0 else 'deployed and not ready'
+
+        # check if the status changed
+        if status != self.current_status:
+
+            # print message
+            print (str('> ' + self.product_name + ' was recorded as ' + self.current_status + ', but is ' + status))
+
+            # update status
+            self.current_status = status
+
+            # check if the deployment is gone
+            if status == 'deleted':
+
+                # record that the product is no longer deployed
+                self.base_url = None
+                self.store.save_product(project = self.project_name, name = self.product_name,
+                                        service_url = None, status = status, settings = {'base_url': None})
+
+            # if it is still deployed
+            else:
+
+                # record status
+                self.store.save_product(project = self.project_name, name = self.product_name, status = status)
+
     # helper method to build Dockerfile
     def __build_dockerfile(self):
 
@@ -147,11 +617,12 @@ class product:
 
             # write content
             content = """\
-            FROM python:{version}
+            ARG BASE_IMAGE=python:{version}
+            FROM ${{BASE_IMAGE}}
             RUN mkdir -p /api
-            COPY {api_file} /api/api.py
             COPY {requirements_file} /api/requirements.txt
             RUN python -m pip install -r /api/requirements.txt
+            COPY {api_file} /api/api.py
             EXPOSE {port}
             ENTRYPOINT ["python", "api/api.py"]\
             """.format(version=self.py_version,
@@ -159,6 +630,51 @@ class product:
                     requirements_file = self.requirements_file,
                     port = int(self.port))
 
+            # check if the requirements are locked
+            if self.lock_file is not None:
+
+                # install the pinned distributions without resolving dependencies
+                content = content.replace(str('COPY ' + self.requirements_file + ' /api/requirements.txt'),
+                                          str('COPY ' + self.lock_file + ' /api/requirements.lock'))
+                content = content.replace('RUN python -m pip install -r /api/requirements.txt',
+                                          'RUN python -m pip install --no-deps --require-hashes -r /api/requirements.lock')
+
+            # check if the API serves a saved model
+            if self.model_file is not None:
+
+                # copy the model after the requirements, so a new model does not reinstall them
+                content = content.replace('EXPOSE', str('COPY ' + self.model_file + ' /api/' + os.path.basename(self.model_file) + '\n            EXPOSE'))
+
+            # check if the API packs several products
+            if self.packed:
+
+                # copy the products next to the API script
+                content = content.replace('EXPOSE', str('COPY ' + os.path.join('.productionize', self.product_name, 'products') + ' /api/products\n            EXPOSE'))
+
+            # check if the wrapper serves the API
+            if self.wrapped:
+
+                # copy the wrapper into the build context
+                os.makedirs(str(self.wd + '/.productionize'), exist_ok=True)
+                shutil.copyfile(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wrapper.py'),
+                                str(self.wd + '/.productionize/wrapper.py'))
+
+                # serve the API script through the wrapper
+                content = content.replace('EXPOSE', str('COPY .productionize/wrapper.py /api/wrapper.py\n            ENV PORT=' + str(int(self.port)) + '\n            EXPOSE'))
+                content = content.replace('"api/api.py"', '"api/wrapper.py"')
+
+            # check if the bytecode is compiled in the image
+            if self.precompile:
+
+                # compile the installed libraries right after installing them, so an edit of the API keeps this step cached
+                content = content.replace(str('COPY ' + self.api_file + ' /api/api.py'),
+                                          str('RUN python -m compileall -q -j 0 --invalidation-mode unchecked-hash'
+                                              + ' $(python -c "import sysconfig; print(sysconfig.get_paths()[\'purelib\'])")'
+                                              + '\n            COPY ' + self.api_file + ' /api/api.py'))
+
+                # compile the API in its own step after everything is copied, the interpreter trusts the bytecode without checking the sources
+                content = content.replace('EXPOSE', 'RUN python -m compileall -q -j 0 --invalidation-mode unchecked-hash /api\n            EXPOSE')
+
             # open Dockerfile
             file = open(dk_file_path, "w")
 
@@ -183,8 +699,207 @@ class product:
             # raise exception
             raise Exception(str('I could not create the Dockerfile in your current working directory: ' + self.wd))
 
+    # helper method to check if the API script can be wrapped
+    def __can_wrap(self):
+
+        """
+        Private method to check if the API script can be served by the wrapper.
+
+        The wrapper imports the API script, so the script has to define a
+        WSGI app, e.g. a Flask app, or a predict function at its top level.
+        A script that starts its server at the top level, outside of the
+        __main__ guard, would block the import, so it is not wrapped.
+        """
+
+        # try to parse the API script
+        try:
+
+            # parse the script
+            with open(self.api_file) as file:
+                tree = ast.parse(file.read())
+
+        # if it can not be parsed
+        except:
+
+            # run the script as it is
+            return False
+
+        # initialize the names
+        names = set()
+
+        # loop over the top level statements
+        for node in tree.body:
+
+            # check if it starts a server, like app.run()
+            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Attribute) and node.value.func.attr in ['run', 'serve_forever']:
+
+                # raise Exception
+                raise Exception(str('Your API script calls ' + ast.unparse(node.value.func) + '() at its top level, which would block the wrapper importing it. '
+                                    'Move the call into an if __name__ == "__main__": block or prepare the deployment with wrap = False.'))
+
+            # check if it is a function
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+
+                # add name
+                names.add(node.name)
+
+            # check if it is an assignment
+            elif isinstance(node, ast.Assign):
+
+                # add names
+                names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+
+        # return if there is an app, predict or a pack
+        return bool(names & {'app', 'predict', 'PRODUCTS'})
+
+    # helper method to prune the requirements
+    def __prune_requirements(self, prune):
+
+        """
+        Private method to find and drop the requirements the API script never
+        imports.
+
+        The imports are found statically in the API script and the local
+        modules it imports. Requirements that are not installed locally can
+        not be mapped to their modules, so they are kept and reported as
+        unverified. So are the requirements the script does not import if it
+        loads modules dynamically, e.g. by unpickling a model. The savings are measured on the local installations of
+        the dropped requirements and the dependencies only they need.
+
+        Parameters
+        ----------
+        prune : string
+            String with "flag" to report the unused requirements or "drop" to
+            leave them out of the image as well
+        """
+
+        # read the requirements
+        requirements = read_requirements(os.path.join(self.wd, self.requirements_file))
+
+        # split the requirements
+        split = find_unused(paths = [os.path.join(self.wd, self.api_file)],
+                            requirements = requirements,
+                            wrapped = self.wrapped)
+
+        # store the unused requirements
+        self.unused_requirements = split['unused']
+
+        # check if there is anything to report
+        if not split['unused'] and not split['unverified']:
+
+            # stop function
+            return
+
+        # find the distributions installed without the unused requirements
+        everything = dependency_closure(requirements)
+        kept = dependency_closure([name for name in requirements if name not in split['unused']])
+        saved = everything - kept
+
+        # measure the installations
+        total_size = sum(installed_size(name) for name in everything)
+        saved_size = sum(installed_size(name) for name in saved)
+
+        # get the latest build of the product
+        builds = self.store.history(project = self.project_name, product = self.product_name)['builds']
+
+        # get the duration of the latest build
+        install_time = builds[0]['duration'] if builds else None
+
+        # check if the latest build was profiled
+        if builds and builds[0].get('profile'):
+
+            # only count the steps installing the requirements
+            install_time = sum(step['duration'] or 0.0 for step in builds[0]['profile']['steps'] if 'pip install' in step['name']) or install_time
+
+        # estimate the install time saved from the share of the size in the latest build
+        saved_time = install_time * saved_size / total_size if install_time and total_size else None
+
+        # check if the unused requirements are dropped
+        if prune == 'drop' and split['unused']:
+
+            # write the requirements without the unused ones
+            folder = os.path.join('.productionize', self.product_name)
+            os.makedirs(os.path.join(self.wd, folder), exist_ok=True)
+            with open(os.path.join(self.wd, folder, 'requirements.pruned.txt'), 'w') as file:
+                file.write('\n'.join(line for name, line in requirements.items() if name not in split['unused']) + '\n')
+
+            # build the image from them
+            self.requirements_file = os.path.join(folder, 'requirements.pruned.txt')
+
+        # build report
+        report = """
+
+        Requirements Report:
+        --------------------
+
+        This is an automatically generated report on the requirements your API
+        script never imports. Requirements that are not installed locally can
+        not be checked and are kept, as are all requirements of a script that
+        loads modules dynamically.
+
+        Imported:       {modules}
+        Dynamic loads:  {loads}
+        Unused:         {unused}
+        Unverified:     {unverified}
+        Dropped:        {dropped}
+
+        Without the unused requirements the image installs {count} distribution(s)
+        less, which take {size:.1f} MB locally{time}.
+        """.format(modules = ', '.join(split['modules']) or 'None',
+                   loads = ', '.join(split['loads']) or 'None',
+                   unused = ', '.join(split['unused']) or 'None',
+                   unverified = ', '.join(split['unverified']) or 'None',
+                   dropped = prune == 'drop' and bool(split['unused']),
+                   count = len(saved),
+                   size = saved_size / 1024 ** 2,
+                   time = str(', about ' + str(round(saved_time, 1)) + ' s of the latest build') if saved_time else '')
+
+        # print report
+        print (report)
+
+    # helper method to lock the requirements
+    def __lock_requirements(self):
+
+        """
+        Private method to resolve the requirements into a hash-pinned lock.
+
+        The requirements are resolved once by lock_requirements() in the
+        Python image the product is built from. The lock is cached next to
+        the store and copied into the build context, so the same requirements
+        always give the same lock, byte for byte, and the same cached layer.
+
+        Returns
+        -------
+        string
+            String with the path of the lock in the build context, None if the
+            requirements could not be locked
+        """
+
+        # read the requirements
+        with open(os.path.join(self.wd, self.requirements_file), 'rb') as file:
+            requirements = file.read()
+
+        # resolve the requirements into a lock cached next to the store
+        cache_file = lock_requirements(requirements, self.py_version,
+                                       folder = os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'locks'),
+                                       docker_env = self.store.get_setting('docker_env', True))
+
+        # check if the requirements could not be locked
+        if cache_file is None:
+
+            # return None
+            return None
+
+        # copy the lock into the build context
+        lock_file = os.path.join('.productionize', 'locks', os.path.basename(cache_file))
+        os.makedirs(os.path.join(self.wd, '.productionize', 'locks'), exist_ok=True)
+        shutil.copyfile(cache_file, os.path.join(self.wd, lock_file))
+
+        # return the path of the lock
+        return lock_file
+
     # main function to deploy API
-    def prepare_deployment(self, api_file, requirements_file, port):
+    def prepare_deployment(self, api_file, requirements_file, port, wrap = False, lock = True, precompile = False, prune = 'flag'):
 
         """
         Main method to prepare the deployment.
@@ -202,8 +917,23 @@ class product:
             String with the path to the requirements file
         port : string
             String with the port number to expose
-        name : string
-            String with the name of your deployment
+        wrap : boolean
+            if True and the API script defines a WSGI app or a predict
+            function, the script is served by the wrapper, which adds the
+            streaming bulk endpoint /_bulk and the stats the autoscaling and
+            the idle watch read. If False the script is run as it is
+        lock : boolean
+            if True the requirements are resolved once into a hash-pinned lock,
+            which the image installs without resolving them again
+        precompile : boolean
+            if True the bytecode of the API and its dependencies is compiled
+            at build time, so the container does not compile or check it at
+            start. This makes the image larger
+        prune : string
+            "flag" reports the requirements the API script never imports,
+            "drop" leaves them out of the image as well, None skips the check.
+            The requirements of API scripts generated by prepare_model() and
+            prepare_pack() are not checked
         """
 
         # check the api file
@@ -268,12 +998,60 @@ class product:
             # raise exception
             raise Exception('port arg should be a string with the desired exposing port: e.g. port = "8000"')
         
+        # forget the saved model, if the API script was not generated with it
+        if self.model_file is not None and os.path.dirname(self.model_file) != os.path.dirname(self.api_file):
+
+            # forget model
+            self.model_file = None
+
+        # forget the packed products, if the API script is not the one of the pack
+        if self.packed and os.path.dirname(self.api_file) != os.path.join('.productionize', self.product_name):
+
+            # forget products
+            self.packed = None
+
+        # check if the wrapper serves the API
+        self.wrapped = bool(wrap) and self.__can_wrap()
+
+        # check if the prune arg is known
+        if prune not in [None, 'flag', 'drop']:
+
+            # raise Exception
+            raise Exception('prune arg should be either None, "flag" or "drop"')
+
+        # forget the unused requirements of a previous preparation
+        self.unused_requirements = []
+
+        # check if the requirements are written by hand
+        if prune is not None and self.model_file is None and not self.packed:
+
+            # find the unused requirements
+            self.__prune_requirements(prune = prune)
+
+        # lock the requirements
+        self.lock_file = self.__lock_requirements() if lock else None
+
+        # store if the bytecode is compiled in the image
+        self.precompile = bool(precompile)
+
         # build Dockerfile
         self.__build_dockerfile()
 
         # change status
         self.current_status = 'ready to deploy'
 
+        # record the product
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                api_file = self.api_file,
+                                requirements_file = self.requirements_file,
+                                port = self.port,
+                                dk_file_path = self.dk_file_path,
+                                status = self.current_status,
+                                settings = {'wrapped': self.wrapped, 'model_file': self.model_file, 'packed': self.packed,
+                                            'lock_file': self.lock_file, 'precompile': self.precompile,
+                                            'unused_requirements': self.unused_requirements})
+
         # build report
         report = """
 
@@ -308,6 +1086,8 @@ class product:
         Name:       {name}
         Project:    {project}
         Status:     {status}
+        Wrapped:    {wrapped}
+        Locked:     {locked}
 
         You can now deploy your product using the deploy() method.
 
@@ -319,566 +1099,3264 @@ class product:
                    dk_file_path = self.dk_file_path,
                    name = self.product_name,
                    project = self.project_name,
-                   status = self.current_status)
+                   status = self.current_status,
+                   wrapped = self.wrapped,
+                   locked = self.lock_file is not None)
     
         # print report
         print (report)
 
-    # helper method to create Dockerfile
-    def __build_image(self, local):
+    # main method to deploy a model
+    def prepare_model(self, model, input_schema, port = '8000', method = 'predict', dtype = None, requirements = None):
+
         """
-        Private method to build a Docker image.
+        Main method to prepare the deployment of a model object.
 
-        This function takes the Dockerfile and creates an image on the Minikube
-        internal registry.
+        This function saves the model and generates the API script, the
+        requirements and the Dockerfile, so there is no API to write by hand.
+        The generated predict() turns a whole batch into one NumPy matrix
+        and calls the model once per batch, the wrapper serves it on
+        /predict, /_predict and the bulk endpoint /_bulk. The requirements
+        are derived from the libraries the model is made of and pinned to
+        the versions installed in this session.
 
         Parameters
         ----------
-        local : boolean
-            If True, the image is build locally
+        model : object
+            Trained model with a predict method, or the path to a pickle or
+            joblib file of it
+        input_schema : list
+            List with the names of the features in order, a dict of feature
+            names and dtypes, or the number of features
+        port : string
+            String with the port number to expose
+        method : string
+            Method of the model to call, e.g. "predict_proba"
+        dtype : string
+            NumPy dtype of the features, by default taken from input_schema
+            or "float64"
+        requirements : list
+            List with additional requirements, e.g. ["pyarrow"] to accept
+            Arrow payloads
         """
 
-        # try to create the image on the minikube registry
-        try:
-        
-            # make sure this is run from wd
-            os.chdir(self.wd)
+        # check if the schema is the number of features
+        if isinstance(input_schema, int):
 
-            # check if local build
-            if not local:
-                
-                # build image from Dockerfile
-                command = str('eval $(minikube -p minikube docker-env) && docker build -t ' + self.product_name + '-image:latest .')
-                os.system(command)
+            # name the features
+            features = [str('f' + str(feature)) for feature in range(input_schema)]
 
-            # if local build
-            else:
+        # check if the schema names the features
+        elif isinstance(input_schema, (list, tuple, dict)) and len(input_schema) > 0:
 
-                # build image from Dockerfile
-                command = str('docker build -t ' + self.product_name + '-image:latest .')
-                os.system(command)
+            # store the features
+            features = [str(feature) for feature in input_schema]
 
-        # handle exception
-        except:
+        # if it is something else
+        else:
 
-            # raise exception
-            raise Exception('I could not build the Docker image from the Dockerfile. In case you edited the file, please check if that was correct.')
+            # raise Exception
+            raise Exception('input_schema arg should be a list with the names of the features: e.g. ["age", "income"]')
 
-    # helper method to run a deployment
-    def __run_deployment(self, local):
-        """
-        Private method to run a deployment.
+        # check if the dtype has to be taken from the schema
+        if dtype is None:
 
-        This function uses kubectl to run a deployment on minikube.
+            # use the dtype of the schema, if all features share it
+            dtypes = set(input_schema.values()) if isinstance(input_schema, dict) else set()
+            dtype = dtypes.pop() if len(dtypes) == 1 else 'float64'
 
-        Parameters
-        ----------
-        local : boolean
-            If True, the product is deployed locally instead of on the workbench
-        """
+            # name types like float or numpy.float32 by their name, not their representation
+            dtype = str(getattr(dtype, '__name__', dtype))
 
-        # try to run deployment
+        # store the folder of the generated files, relative to the build context
+        folder = os.path.join('.productionize', self.product_name)
+
+        # try to generate the files
         try:
-            
-            # check if local deployment
-            if not local:
 
-                # run deployment
-                command = str('kubectl run ' + self.product_name + ' --image=' + self.product_name + "-image:latest --image-pull-policy='Never' -n " + self.project_name)
-                os.system(command)
-            
-            # if local true
-            else:
+            # create folder
+            os.makedirs(os.path.join(self.wd, folder), exist_ok=True)
 
-                # run container
-                command = str('docker run -p ' + self.port + ':' + self.port + ' -d --name ' + self.product_name + ' ' + self.product_name + '-image')
-                os.system(command)
+            # save the model
+            model_file, model = save_model(model, os.path.join(self.wd, folder))
 
         # handle exception
         except:
 
-            # raise exception
-            raise Exception('I could not run the deployment from the Docker image, make sure the Dockerfile is working.')
+            # raise Exception
+            raise Exception('I could not save your model, make sure it can be pickled or the path is correct.')
 
-    # helper method to expose pod
-    def __expose_pod(self):
+        # check if the model has the method
+        if not callable(getattr(model, method, None)):
 
-        """
-        Private method to expose a deployment.
+            # raise Exception
+            raise Exception(str('Your model has no method ' + method + '()'))
 
-        This function exposes the pod that was just deployed.
-        """
+        # write the requirements
+        with open(os.path.join(self.wd, folder, 'requirements.txt'), 'w') as file:
+            file.write('\n'.join(model_requirements(model, model_file) + list(requirements or [])) + '\n')
 
-        # try to expose the pod
-        try:
+        # write the API script
+        write_api(path = os.path.join(self.wd, folder, 'api.py'),
+                  model_file = model_file,
+                  features = features,
+                  dtype = dtype,
+                  method = method)
 
-            # expose the pod
-            command = str('kubectl expose pod ' + self.product_name + ' --port=' + self.port + ' --type=NodePort -n ' + self.project_name)
-            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+        # store the saved model
+        self.model_file = os.path.join(folder, model_file)
 
-        # handle exception
-        except:
+        # prepare the deployment of the generated files
+        self.prepare_deployment(api_file = os.path.join(folder, 'api.py'),
+                                requirements_file = os.path.join(folder, 'requirements.txt'),
+                                port = port,
+                                wrap = True)
 
-            # raise exception
-            raise Exception('I could not expose the service, make sure your workbench is setup properly')
-
-    # helper method to get the url
-    def __get_url(self):
+    # main method to pack several products
+    def prepare_pack(self, products, port = '8000', memory_budget = None):
 
         """
-        Private method to get the url of a deployment.
+        Main method to prepare the deployment of several products in one
+        container.
 
-        This function exposes the service on a minikube level an retreives
-        the url.
+        Every product keeps its name and is served under /<name>/ by the
+        wrapper of the pack, so the products share one image, pod and Python
+        runtime. A product is loaded on its first request. Once the loaded
+        products exceed the memory budget, the least recently used ones are
+        dropped and loaded again when they are called. The products have to
+        be prepared and belong to the project of the pack. After the pack is
+        deployed, predict() of the packed products calls the pack.
+
+        Parameters
+        ----------
+        products : list
+            List with the prepared products to pack
+        port : string
+            String with the port number to expose
+        memory_budget : string
+            Memory the loaded products may take, e.g. "1Gi", None for no limit
         """
 
-        # try to expose service
-        try:
+        # check the products
+        if not isinstance(products, (list, tuple)) or not products:
 
-            # expose the service on minikube
-            command = str('minikube service ' + self.product_name + ' -n ' + self.project_name + ' --url')
-            service_url = subprocess.check_output(command.split())
+            # raise Exception
+            raise Exception('products arg should be a list with the products to pack: e.g. [churn_api, fraud_api]')
 
-            # decode url
-            service_url = str(service_url.decode("utf-8")).replace("\n", "")
-                
-            # add route warning
-            service_url = service_url + str('/<your_route>')
+        # loop over products
+        for member in products:
 
-            # write the url to self
-            self.service_url = service_url
+            # check if the product is prepared
+            if member.api_file is None or not member.wrapped:
+
+                # raise Exception
+                raise Exception(str('The product ' + member.product_name + ' has to be prepared with an API script defining app or predict.'))
+
+            # check if the product is in the project
+            if member.project_name != self.project_name:
+
+                # raise Exception
+                raise Exception(str('The product ' + member.product_name + ' does not belong to the project ' + self.project_name))
+
+        # initialize the requirements and conflicts
+        requirements = {}
+        conflicts = []
+
+        # loop over products
+        for member in products:
+
+            # loop over the requirements
+            for key, line in read_requirements(member.requirements_file).items():
+
+                # check if another product needs another version
+                if key in requirements and requirements[key] != line:
+
+                    # store conflict
+                    conflicts.append(str(requirements[key] + ' vs. ' + line))
+
+                # store requirement
+                requirements[key] = line
+
+        # check if there are conflicts, before anything is written
+        if conflicts:
+
+            # raise Exception
+            raise Exception(str('The products need different versions of the same requirements: ' + ', '.join(conflicts)))
+
+        # store the folder of the pack, relative to the build context
+        folder = os.path.join('.productionize', self.product_name)
+
+        # start with empty products
+        shutil.rmtree(os.path.join(self.wd, folder, 'products'), ignore_errors=True)
+
+        # loop over products
+        for member in products:
+
+            # create the folder of the product
+            target = os.path.join(self.wd, folder, 'products', member.product_name)
+            os.makedirs(target)
+
+            # copy the API script and the model
+            shutil.copyfile(member.api_file, os.path.join(target, 'api.py'))
+
+            # check if there is a model
+            if member.model_file is not None:
+
+                # copy model
+                shutil.copyfile(member.model_file, os.path.join(target, os.path.basename(member.model_file)))
+
+        # write the requirements
+        with open(os.path.join(self.wd, folder, 'requirements.txt'), 'w') as file:
+            file.write('\n'.join(requirements[key] for key in sorted(requirements)) + '\n')
+
+        # write the API script of the pack
+        with open(os.path.join(self.wd, folder, 'api.py'), 'w') as file:
+            file.write(str('# API script generated by productionize, packing several products\n\n'
+                           + '# products served under /<name>/\n'
+                           + 'PRODUCTS = ' + json.dumps([member.product_name for member in products]) + '\n\n'
+                           + '# bytes the loaded products may take\n'
+                           + 'MEMORY_BUDGET = ' + str(parse_memory(memory_budget) if memory_budget is not None else None) + '\n'))
+
+        # get the products of an earlier version of the pack
+        recorded = self.store.get_product(project = self.project_name, name = self.product_name)
+        previous = (recorded['settings'].get('packed') if recorded is not None else None) or self.packed or []
+
+        # store the packed products
+        self.packed = [member.product_name for member in products]
+        self.model_file = None
+
+        # try to prepare the deployment of the pack
+        try:
+
+            # prepare deployment
+            self.prepare_deployment(api_file = os.path.join(folder, 'api.py'),
+                                    requirements_file = os.path.join(folder, 'requirements.txt'),
+                                    port = port,
+                                    wrap = True)
 
         # handle exception
         except:
 
-            # raise exception
-            raise Exception('I could not expose the service to your host machine. Make sure the workbench is properly setup.')
+            # keep the products of the earlier version
+            self.packed = previous or None
 
-    # helper function to check if deployment exists
-    def __check_pods(self, product, project):
+            # raise the exception
+            raise
+
+        # loop over the products no longer in the pack
+        for name in [name for name in previous if name not in self.packed]:
+
+            # get the product
+            dropped = self.store.get_product(project = self.project_name, name = name)
+
+            # check if it is still served by this pack
+            if dropped is not None and dropped['settings'].get('packed_in') == self.product_name:
+
+                # the product is no longer served by the pack
+                self.store.save_product(project = self.project_name, name = name, settings = {'packed_in': None})
+
+        # loop over products
+        for member in products:
+
+            # the product is served by the pack
+            member.packed_in = self.product_name
+            self.store.save_product(project = member.project_name,
+                                    name = member.product_name,
+                                    settings = {'packed_in': self.product_name})
+
+    # helper method to hash the build inputs
+    def __hash_build(self, base_image = None):
 
         """
-        Private method to check if a pod exists.
+        Private method to hash the inputs of the image build.
 
-        This function checks, if a pod already exists on Minikube.
+        This function hashes the Dockerfile, the api file and the requirements
+        file, so an unchanged product does not need to be rebuilt.
 
         Parameters
         ----------
-        product : string
-            String with the name of the product
-        project : string
-            String with the name of the project
+        base_image : string
+            String with the shared base image the product is built from
         """
 
-        # try to check if service exists
-        try:
+        # initialize the hash with the base image
+        build_hash = hashlib.sha256(str(base_image or '').encode('utf-8'))
 
-            # check for service
-            command = str('kubectl get pod ' + product + ' -n' + project)
-            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        # get the build inputs
+        paths = [self.dk_file_path, self.api_file, self.requirements_file]
 
-            # check result
-            if exists == 0:
+        # check if the model is part of the build
+        if self.model_file is not None:
 
-                # return False
-                return True
-            
-            # if not 0, then False
-            else:
+            # add model
+            paths.append(self.model_file)
+
+        # check if the lock is part of the build
+        if self.lock_file is not None:
+
+            # add lock
+            paths.append(self.lock_file)
+
+        # check if the wrapper is part of the build
+        if self.wrapped:
+
+            # add wrapper
+            paths.append(str(self.wd + '/.productionize/wrapper.py'))
+
+        # check if products are packed
+        if self.packed:
+
+            # loop over the files of the products
+            for folder, _, files in sorted(os.walk(os.path.join(self.wd, '.productionize', self.product_name, 'products'))):
+
+                # add files
+                paths.extend(os.path.join(folder, file) for file in sorted(files))
+
+        # loop over the build inputs
+        for path in paths:
+
+            # try to read the file
+            try:
+
+                # read in file
+                with open(path, 'rb') as file:
+                    build_hash.update(file.read())
+
+            # handle exception
+            except:
+
+                # the build can not be hashed
+                return None
+
+        # return hash
+        return build_hash.hexdigest()
+
+    # helper method to get the digest of the image
+    def __get_image_digest(self, local, image = None):
+
+        """
+        Private method to get the digest of the image of the product.
+
+        Parameters
+        ----------
+        local : boolean
+            If True, the image is looked up locally
+        image : string
+            String with the image to look up, default is the image of the
+            product
+
+        Returns
+        -------
+        string
+            String with the digest or None if the image does not exist
+        """
+
+        # get the image
+        image = image or str(self.product_name + '-image:latest')
+
+        # check if the image is on a workbench without docker daemon
+        if not local and not self.store.get_setting('docker_env', True):
+
+            # try to list the images of minikube
+            try:
+
+                # list images
+                listing = json.loads(subprocess.check_output('minikube image ls --format json'.split(), stderr=subprocess.DEVNULL))
+
+            # if it breaks
+            except:
+
+                # return None
+                return None
+
+            # loop over the images
+            for item in listing:
+
+                # check if it is the image, the runtime may prefix the registry
+                if any(tag == image or tag.endswith(str('/' + image)) for tag in item.get('repoTags', [])):
+
+                    # return the digest
+                    return item['id'] if item['id'].startswith('sha256:') else str('sha256:' + item['id'])
+
+            # return None
+            return None
+
+        # build the command
+        command = str('docker image inspect --format "{{.Id}}" ' + image)
+
+        # check if the image is on the workbench
+        if not local:
+
+            # use the docker daemon of minikube
+            command = str('eval $(minikube -p minikube docker-env) && ' + command)
+
+        # try to get the digest
+        try:
+
+            # inspect the image
+            digest = subprocess.check_output(command, shell=True, stderr=subprocess.DEVNULL)
+
+            # return the digest
+            return digest.decode('utf-8').strip() or None
 
-                # return False
-                return False
-        
         # if it breaks, it doesn't exist
         except:
 
-            # return False
-            return False
+            # return None
+            return None
 
-    # helper function to check if service exists
-    def __check_svcs(self, product, project):
+    # helper method to find the shared base image
+    def __find_base_image(self, local):
 
         """
-        Private method to check if a svc exists.
+        Private method to find the shared base image the product can be built
+        from.
 
-        This function checks, if a svc already exists on Minikube.
+        A base image fits, if it was built for the Python version of this
+        session and all its libraries are requirements of the product. If the
+        requirements of the product are locked, all pinned distributions of
+        the base image have to be in its lock instead, so pip does not
+        install another version on top of the base image. Of the fitting base
+        images, the one with the most libraries is used.
 
         Parameters
         ----------
-        product : string
-            String with the name of the product
-        project : string
-            String with the name of the project
+        local : boolean
+            If True, the base image has to exist locally
+
+        Returns
+        -------
+        string
+            String with the base image or None if none fits
         """
 
-        # try to check if service exists
+        # try to read the requirements
         try:
 
-            # check for service
-            command = str('kubectl get services ' + product + ' -n' + project)
-            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
-
-            # check result
-            if exists == 0:
+            # read requirements
+            requirements = set(read_requirements(os.path.join(self.wd, self.requirements_file)).values())
 
-                # return False
-                return True
-            
-            # if not 0, then False
-            else:
+            # read the lock, if the requirements are locked
+            lock = set(read_requirements(os.path.join(self.wd, self.lock_file)).values()) if self.lock_file is not None else None
 
-                # return False
-                return False
-        
-        # if it breaks, it doesn't exist
+        # if they can not be read
         except:
 
-            # return False
-            return False
+            # return None
+            return None
 
-    # helper function to check if container exists
-    def __check_container(self, product):
+        # get the fitting base images, the largest first
+        candidates = sorted([base for base in self.store.get_setting('base_images', {}).values()
+                             if base['py_version'] == self.py_version
+                             and (set(base['libraries']) <= requirements if lock is None else set(base.get('lock') or [None]) <= lock)],
+                            key = lambda base: len(base['libraries']), reverse = True)
+
+        # loop over the fitting base images
+        for base in candidates:
 
+            # check if the base image exists where the product is built
+            if self.__get_image_digest(local = local, image = base['image']) is not None:
+
+                # return base image
+                return base['image']
+
+        # return None
+        return None
+
+    # helper method to create Dockerfile
+    def __build_image(self, local, quiet = False):
         """
-        Private method to check if a container exists.
+        Private method to build a Docker image.
 
-        This function checks, if a container already exists on localhost.
+        This function takes the Dockerfile and creates an image on the Minikube
+        internal registry. If the build inputs did not change since the last
+        recorded build and the image still exists, the build is skipped. The
+        image is built with BuildKit, from the shared base image of the
+        workbench if one fits the requirements of the product. The plain
+        progress output of BuildKit is parsed into a profile of the build,
+        which is recorded with it.
 
         Parameters
         ----------
-        product : string
-            String with the name of the product
+        local : boolean
+            If True, the image is build locally
+        quiet : boolean
+            If True, the build output is only printed if the build fails
+
+        Returns
+        -------
+        dict
+            Dict with the profile of the build, None if the build was skipped
         """
 
-        # try to check if container exists
+        # get the shared base image
+        base_image = self.__find_base_image(local = local)
+
+        # hash the build inputs
+        build_hash = self.__hash_build(base_image = base_image)
+
+        # check if the recorded image is still current
+        if build_hash is not None and build_hash == self.build_hash and self.image_digest is not None:
+
+            # check if the image still exists
+            if self.__get_image_digest(local = local) == self.image_digest:
+
+                # print message
+                print ('> The image of your product is up to date, skipping the build')
+
+                # stop function
+                return None
+
+        # store start time
+        build_start = time.perf_counter()
+
+        # build the options, the build context is the working directory of the product
+        options = str(' -t ' + self.product_name + '-image:latest -f ' + self.dk_file_path + ' ' + self.wd)
+
+        # check if there is a base image
+        if base_image is not None:
+
+            # print message
+            print (str('> Building ' + self.product_name + ' from the shared base image ' + base_image))
+
+        # check if the workbench runs several nodes or offers no docker daemon
+        if not local and (self.store.get_setting('nodes', 1) > 1 or not self.store.get_setting('docker_env', True)):
+
+            # build image with minikube, on all nodes
+            command = str('minikube image build' + (' --all' if self.store.get_setting('nodes', 1) > 1 else '') + ' --build-opt=progress=plain'
+                          + (' --build-opt=build-arg=BASE_IMAGE=' + base_image if base_image else '') + options)
+
+        # check if local build
+        elif not local:
+
+            # build image from Dockerfile with the docker daemon of minikube
+            command = str('eval $(minikube -p minikube docker-env) && docker build --progress=plain' + (' --build-arg BASE_IMAGE=' + base_image if base_image else '') + options)
+
+        # if local build
+        else:
+
+            # build image from Dockerfile
+            command = str('docker build --progress=plain' + (' --build-arg BASE_IMAGE=' + base_image if base_image else '') + options)
+
+        # initialize the output of the build
+        output = []
+
+        # try to create the image
         try:
 
-            # check for service
-            command = str('docker container inspect ' + product)
-            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+            # build the image with BuildKit, from the working directory of the product
+            process = subprocess.Popen(command, shell=True, cwd=self.wd,
+                                       env=dict(os.environ, DOCKER_BUILDKIT='1'),
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       text=True, errors='replace')
 
-            # check result
-            if exists == 0:
+            # loop over the lines of the progress
+            for line in process.stdout:
 
-                # return False
-                return True
-            
-            # if not 0, then False
-            else:
+                # store line
+                output.append(line)
 
-                # return False
-                return False
-        
-        # if it breaks, it doesn't exist
+                # check if the output is shown
+                if not quiet:
+
+                    # print line
+                    print (line, end='')
+
+            # wait for the build
+            process.wait()
+
+        # handle exception
         except:
 
-            # return False
-            return False
+            # raise exception
+            raise Exception('I could not run the Docker build, please check if Docker is installed and running.')
 
-    # helper function to delete pod
-    def __delete_pod(self, product, project):
+        # parse the progress into a profile
+        profile = summarize(read_progress(''.join(output)))
+        profile['duration'] = time.perf_counter() - build_start
+
+        # store the profile
+        self.build_profile = profile
+
+        # check if the build failed
+        if process.returncode != 0:
+
+            # check if the output was held back
+            if quiet:
+
+                # print the output of the build
+                print (''.join(output))
+
+            # get the failed steps
+            failed = [step for step in profile['steps'] if step['error']]
+
+            # raise exception
+            raise Exception(str('I could not build the Docker image of ' + self.product_name + ' from the Dockerfile' +
+                                (', the step ' + failed[0]['name'] + ' failed' if failed else '') +
+                                '. In case you edited the file, please check if that was correct.'))
+
+        # store the build hash and image digest
+        self.build_hash = build_hash
+        self.image_digest = self.__get_image_digest(local = local)
+
+        # record the build
+        self.store.record_build(project = self.project_name,
+                                product = self.product_name,
+                                build_hash = self.build_hash,
+                                image_digest = self.image_digest,
+                                duration = profile['duration'],
+                                profile = profile)
+
+        # record the image of the product
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                image = str(self.product_name + '-image:latest'),
+                                build_hash = self.build_hash,
+                                image_digest = self.image_digest)
+
+        # check if the output is shown
+        if not quiet and profile['dockerfile_steps']:
+
+            # print message
+            print (str('> Built the image in ' + str(round(profile['duration'], 1)) + ' s, ' + str(profile['cached_steps']) + ' of ' +
+                       str(profile['dockerfile_steps']) + ' steps of the Dockerfile were cached'))
+
+        # return profile
+        return profile
+
+    # main method to build the image
+    def build(self, local = False, quiet = False, report = True):
+
+        """
+        Main method to build the image of the product without deploying it.
+
+        deploy() builds the image as well, but skips the build if the image is
+        up to date, so building ahead of time, e.g. with build_products() of
+        the workbench, speeds up the deployment. The build is profiled from
+        the progress of BuildKit, the report shows which steps of the
+        Dockerfile dominate the build and how many were served from the cache.
+
+        Parameters
+        ----------
+        local : boolean
+            If True, the image is built locally instead of on the workbench
+        quiet : boolean
+            If True, the build output is only printed if the build fails
+        report : boolean
+            If True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the steps of the build, the steps of the Dockerfile and
+            how many of them were cached, the cache hit ratio, the bytes
+            transferred, the duration and the slowest steps, None if the image
+            was up to date
+        """
+
+        # check if product is already prepared
+        if self.dk_file_path is None:
+
+            # raise Exception
+            raise Exception('You first need to run prepare_deployment() before building your product.')
+
+        # build image
+        profile = self.__build_image(local = local, quiet = quiet)
+
+        # check if the report should be printed
+        if report and profile is not None:
+
+            # build the lines of the slowest steps
+            lines = [str((step['name'][:52] + '...' if len(step['name']) > 55 else step['name']).ljust(56) + '{:.1f} s'.format(step['duration']).rjust(10))
+                     for step in profile['slowest']]
+
+            # build report
+            report = """
+
+            Build Report:
+            -------------
+
+            This is an automatically generated report on the build of the
+            image of your product, read from the progress of BuildKit.
+
+            Duration:           {duration:.1f} s
+            Dockerfile steps:   {steps}
+            Cached steps:       {cached}
+            Cache hit ratio:    {ratio}
+            Transferred:        {transferred:.1f} MB
+
+            Slowest steps                                                 Duration
+            {lines}
+
+            """.format(duration = profile['duration'],
+                       steps = profile['dockerfile_steps'],
+                       cached = profile['cached_steps'],
+                       ratio = '{:.0%}'.format(profile['cache_hit_ratio']) if profile['cache_hit_ratio'] is not None else 'unknown',
+                       transferred = profile['bytes'] / 1e6,
+                       lines = '\n            '.join(lines) or 'None')
+
+            # print report
+            print (report)
+
+        # return profile
+        return profile
+
+    # helper method to build the environment of the container
+    def __build_env(self):
+
+        """
+        Private method to build the environment variables of the container.
+
+        This function pins the thread pools of the numerical libraries and the
+        number of API workers to the cpu resources of the product, so the
+        container does not spawn one thread per core of the node. The threads
+        are split between the workers, as every worker runs its own thread
+        pools.
+
+        Returns
+        -------
+        dict
+            Dict with the environment variables
+        """
+
+        # initialize the environment
+        env = {}
+
+        # derive the number of threads from the cpu resources
+        threads = thread_count(cpu_limit = self.resources.get('cpu_limit'),
+                               cpu_request = self.resources.get('cpu_request'))
+
+        # check if the number of workers was given
+        if self.resources.get('workers') is not None:
+
+            # use the given workers
+            workers = int(self.resources['workers'])
+
+        # if not, follow the threads
+        else:
+
+            # use one worker per thread
+            workers = threads
+
+        # check if the workers are known
+        if workers is not None:
+
+            # set workers
+            env['WEB_CONCURRENCY'] = str(workers)
+
+        # check if the threads should be pinned
+        if threads is not None:
+
+            # loop over the thread pools of the numerical libraries
+            for variable in THREAD_VARIABLES:
+
+                # pin the threads of each worker
+                env[variable] = str(max(1, threads // max(1, workers)))
+
+        # return environment
+        return env
+
+    # helper method to build the manifest of the deployment
+    def __build_manifest(self):
+
+        """
+        Private method to build the Kubernetes manifest of the product.
+
+        The product is deployed as a Deployment, so it can run several
+        replicas spread over the nodes of the workbench. The pods carry the
+        "run" label, so they are found by the workbench and the service.
+
+        Returns
+        -------
+        dict
+            Dict with the manifest of the deployment
+        """
+
+        # build the container
+        container = {'name': self.product_name,
+                     'image': str(self.product_name + '-image:latest'),
+                     'imagePullPolicy': 'Never',
+                     'ports': [{'containerPort': int(self.port)}],
+                     'env': [{'name': name, 'value': value} for name, value in self.__build_env().items()]}
+
+        # check if the wrapper serves the product
+        if self.wrapped:
+
+            # the product is ready once the wrapper loaded the API and listens
+            container['readinessProbe'] = {'tcpSocket': {'port': int(self.port)}, 'periodSeconds': 2}
+
+        # initialize the resources
+        requests = {}
+        limits = {}
+
+        # loop over the resources
+        for key, target, field in [('cpu_request', requests, 'cpu'), ('memory_request', requests, 'memory'),
+                                   ('cpu_limit', limits, 'cpu'), ('memory_limit', limits, 'memory')]:
+
+            # check if the resource was given
+            if self.resources.get(key) is not None:
+
+                # add resource
+                target[field] = str(self.resources[key])
+
+        # check if there are resources
+        if requests or limits:
+
+            # add resources
+            container['resources'] = {}
+
+            # check if there are requests
+            if requests:
+
+                # add requests
+                container['resources']['requests'] = requests
+
+            # check if there are limits
+            if limits:
+
+                # add limits
+                container['resources']['limits'] = limits
+
+        # build the pod template
+        template = {'metadata': {'labels': {'run': self.product_name}},
+                    'spec': {'containers': [container]}}
+
+        # get the selector of the product
+        selector = {'matchLabels': {'run': self.product_name}}
+
+        # check if the replicas should be spread with anti-affinity
+        if self.spread == 'anti-affinity':
+
+            # prefer nodes that do not run a replica yet
+            template['spec']['affinity'] = {'podAntiAffinity': {'preferredDuringSchedulingIgnoredDuringExecution': [
+                {'weight': 100, 'podAffinityTerm': {'labelSelector': selector, 'topologyKey': 'kubernetes.io/hostname'}}]}}
+
+        # check if the replicas should be spread evenly
+        elif self.spread == 'topology':
+
+            # keep the number of replicas per node even
+            template['spec']['topologySpreadConstraints'] = [{'maxSkew': 1,
+                                                              'topologyKey': 'kubernetes.io/hostname',
+                                                              'whenUnsatisfiable': 'ScheduleAnyway',
+                                                              'labelSelector': selector}]
+
+        # build the deployment
+        manifest = {'apiVersion': 'apps/v1',
+                    'kind': 'Deployment',
+                    'metadata': {'name': self.product_name,
+                                 'namespace': self.project_name,
+                                 'labels': {'run': self.product_name}},
+                    'spec': {'replicas': int(self.replicas),
+                             'selector': selector,
+                             'template': template}}
+
+        # return manifest
+        return manifest
+
+    # helper method to read the pre-pull of the image
+    def __read_prepull(self, run):
+
+        """
+        Private method to read on which nodes the image of the product is
+        ready, missing or failed.
+
+        Parameters
+        ----------
+        run : string
+            String with the label of the pre-pull, so pods of an earlier one
+            that are still terminating are not read
+
+        Returns
+        -------
+        dict
+            Dict with the state by node, the names of the pods by node and the
+            seconds by node the pod waited for the image and the image took to
+            warm up, as reported by the init container
+        """
+
+        # read the pods of the pre-pull
+        command = str('kubectl get pods -l prepull=' + self.product_name + ',prepull-run=' + run + ' -n ' + self.project_name + ' -o json')
+        pods = json.loads(subprocess.check_output(command.split(), stderr=subprocess.DEVNULL))['items']
+
+        # helper to read a time of kubernetes, which has seconds resolution
+        def read_time(value):
+
+            # return seconds since the epoch
+            return calendar.timegm(time.strptime(value, '%Y-%m-%dT%H:%M:%SZ'))
+
+        # initialize the states
+        states = {}
+        names = {}
+        times = {}
+
+        # loop over pods
+        for pod in pods:
+
+            # get the node
+            node = pod['spec'].get('nodeName')
+
+            # get the state of the init container
+            statuses = pod.get('status', {}).get('initContainerStatuses') or [{}]
+            state = statuses[0].get('state', {})
+
+            # check if the node is known
+            if node is None:
+
+                # skip pod
+                continue
+
+            # store the pod
+            names[node] = pod['metadata']['name']
+
+            # check if the image ran
+            if 'terminated' in state:
+
+                # store state
+                states[node] = 'ready' if state['terminated'].get('exitCode') == 0 else 'failed'
+
+                # try to read the times of the init container
+                try:
+
+                    # store the seconds from the creation of the pod to the start of the container and its run
+                    started = read_time(state['terminated']['startedAt'])
+                    times[node] = {'waited': started - read_time(pod['metadata']['creationTimestamp']),
+                                   'seconds': read_time(state['terminated']['finishedAt']) - started}
+
+                # if they are missing
+                except (KeyError, TypeError, ValueError):
+
+                    # store no times
+                    times[node] = {'waited': None, 'seconds': None}
+
+            # check if the image is missing
+            elif state.get('waiting', {}).get('reason') in ['ErrImageNeverPull', 'ErrImagePull', 'ImagePullBackOff']:
+
+                # store state
+                states[node] = 'missing'
+
+        # return states
+        return states, names, times
+
+    # helper method to pre-pull the image
+    def __prepull_image(self, timeout = 600):
+
+        """
+        Private method to make sure the image of the product is on every node
+        before the rollout.
+
+        A short-lived DaemonSet runs the image once on every node and reads
+        the files of the API, so the first replicas find the image and the
+        model in the page cache of their node. Nodes missing the image get it
+        from minikube. The DaemonSet is removed afterwards, and the removal is
+        waited for. Its pods carry a label of the run, so pods of an earlier
+        pre-pull are never read.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for all nodes
+
+        Returns
+        -------
+        dict
+            Dict with the state, the seconds the pod waited for the image and
+            the seconds the image took to warm up by node
+        """
+
+        # get the nodes that can run the product
+        nodes = json.loads(subprocess.check_output('kubectl get nodes -o json'.split(), stderr=subprocess.DEVNULL))['items']
+        nodes = [node['metadata']['name'] for node in nodes if not node['spec'].get('unschedulable')]
+
+        # build the container running the image once and reading the files of the API
+        prepull = {'name': 'prepull',
+                   'image': str(self.product_name + '-image:latest'),
+                   'imagePullPolicy': 'Never',
+                   'command': ['sh', '-c', 'find /api -type f -exec cat {} + > /dev/null; true'],
+                   'resources': {'requests': {'cpu': '1m', 'memory': '8Mi'}}}
+
+        # label the pods of this run, apart from the run label naming the products
+        run = uuid.uuid4().hex[:8]
+
+        # build the daemon set, which keeps a small container running on every node
+        manifest = {'apiVersion': 'apps/v1',
+                    'kind': 'DaemonSet',
+                    'metadata': {'name': str(self.product_name + '-prepull'), 'namespace': self.project_name},
+                    'spec': {'selector': {'matchLabels': {'prepull': self.product_name}},
+                             'template': {'metadata': {'labels': {'prepull': self.product_name, 'prepull-run': run}},
+                                          'spec': {'initContainers': [prepull],
+                                                   'containers': [dict(prepull, name = 'wait', command = ['sleep', '3600'])],
+                                                   'terminationGracePeriodSeconds': 0}}}}
+
+        # store start time
+        start = time.perf_counter()
+
+        # initialize the results and if the image was loaded
+        results = {}
+        loaded = False
+
+        # try to pre-pull the image
+        try:
+
+            # start the daemon set
+            subprocess.run('kubectl apply -f -'.split(), input=json.dumps(manifest).encode('utf-8'), stdout=subprocess.DEVNULL, check=True)
+
+            # loop until all nodes are done or the time is up
+            while time.perf_counter() - start < timeout:
+
+                # read the states
+                states, names, times = self.__read_prepull(run)
+
+                # loop over the nodes that are ready
+                for node in [node for node, state in states.items() if state == 'ready' and node not in results]:
+
+                    # store the times of the init container
+                    results[node] = dict(times[node], state = 'loaded' if loaded else 'present')
+
+                # get the nodes missing the image
+                missing = [node for node, state in states.items() if state == 'missing']
+
+                # check if the image has to be loaded
+                if missing and not loaded:
+
+                    # print message
+                    print (str('> The image of ' + self.product_name + ' is missing on ' + ', '.join(missing) + ', loading it'))
+
+                    # copy the image from minikube to all nodes
+                    with tempfile.TemporaryDirectory() as folder:
+                        subprocess.run(['minikube', 'image', 'save', str(self.product_name + '-image:latest'), os.path.join(folder, 'image.tar')], stdout=subprocess.DEVNULL, check=True)
+                        subprocess.run(['minikube', 'image', 'load', os.path.join(folder, 'image.tar')], stdout=subprocess.DEVNULL, check=True)
+
+                    # restart the pods of the missing nodes right away
+                    subprocess.run(['kubectl', 'delete', 'pod', '-n', self.project_name, '--wait=false'] + [names[node] for node in missing], stdout=subprocess.DEVNULL)
+                    loaded = True
+
+                # check if all nodes are done
+                if all(node in results or states.get(node) == 'failed' for node in nodes):
+
+                    # stop loop
+                    break
+
+                # wait
+                time.sleep(0.5)
+
+        # clean up
+        finally:
+
+            # remove the daemon set and wait for its pods, so the next pre-pull starts clean
+            subprocess.call(str('kubectl delete daemonset ' + self.product_name + '-prepull -n ' + self.project_name
+                                + ' --ignore-not-found --cascade=foreground --wait=true --timeout=60s').split(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # loop over nodes without the image
+        for node in [node for node in nodes if node not in results]:
+
+            # store failure
+            results[node] = {'state': 'failed', 'waited': None, 'seconds': None}
+
+        # return results
+        return results
+
+    # main method to pre-pull the image
+    def prepull(self, timeout = 600, report = True):
+
+        """
+        Main method to make the image of the product ready on every node.
+
+        deploy() calls this before the rollout if the workbench runs several
+        nodes, so no replica waits for its image. Per node, the seconds the
+        pod waited for the image and the seconds the image took to warm up
+        are reported, as the init container tells them, with a resolution of
+        a second. The seconds to warm up are recorded.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for all nodes
+        report : boolean
+            If True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the state, the seconds the pod waited for the image and
+            the seconds the image took to warm up by node
+        """
+
+        # check if the product runs on the workbench
+        if self.local:
+
+            # raise Exception
+            raise Exception('Only the images of products deployed to the workbench can be pre-pulled.')
+
+        # try to pre-pull the image
+        try:
+
+            # pre-pull image
+            results = self.__prepull_image(timeout = timeout)
+
+        # handle exception
+        except subprocess.CalledProcessError:
+
+            # raise Exception
+            raise Exception(str('I could not pre-pull the image of ' + self.product_name + ', make sure the workbench is running.'))
+
+        # record the seconds per node
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                settings = {'prepull': {node: result['seconds'] for node, result in results.items()}})
+
+        # check if the report should be printed
+        if report:
+
+            # helper to format seconds
+            def seconds(value):
+
+                # return seconds
+                return 'n/a' if value is None else '{:.0f} s'.format(value)
+
+            # build the lines of the nodes
+            lines = [str(node.ljust(24) + result['state'].ljust(10) + seconds(result['waited']).rjust(10) + seconds(result['seconds']).rjust(10))
+                     for node, result in sorted(results.items())]
+
+            # build report
+            report = """
+
+            Pre-pull Report:
+            ----------------
+
+            This is an automatically generated report on the image of your
+            product on the nodes of the workbench.
+
+            Node                    State         Waited   Warm-up
+            {lines}
+
+            """.format(lines = '\n            '.join(lines))
+
+            # print report
+            print (report)
+
+        # get the nodes where the image failed
+        failed = [node for node, result in results.items() if result['state'] == 'failed']
+
+        # check if there are any
+        if failed:
+
+            # raise Exception
+            raise Exception(str('The image of ' + self.product_name + ' is not ready on ' + ', '.join(failed) + ', the rollout would wait for it.'))
+
+        # return results
+        return results
+
+    # helper method to run a deployment
+    def __run_deployment(self, local):
+        """
+        Private method to run a deployment.
+
+        This function uses kubectl to run a deployment on minikube. The
+        deployment is created from a manifest carrying the resources, replicas
+        and spreading of the product.
+
+        Parameters
+        ----------
+        local : boolean
+            If True, the product is deployed locally instead of on the workbench
+        """
+
+        # try to run deployment
+        try:
+            
+            # check if local deployment
+            if not local:
+
+                # run deployment
+                manifest = json.dumps(self.__build_manifest())
+                subprocess.run('kubectl apply -f -'.split(), input=manifest.encode('utf-8'), stdout=subprocess.DEVNULL, check=True)
+            
+            # if local true
+            else:
+
+                # build the resource flags
+                flags = ''
+
+                # check if there is a cpu limit
+                if self.resources.get('cpu_limit') is not None:
+
+                    # limit cpus
+                    flags = str(flags + ' --cpus=' + str(parse_cpu(self.resources['cpu_limit'])))
+
+                # check if there is a memory limit
+                if self.resources.get('memory_limit') is not None:
+
+                    # limit memory
+                    flags = str(flags + ' --memory=' + str(parse_memory(self.resources['memory_limit'])) + 'b')
+
+                # loop over the environment
+                for name, value in self.__build_env().items():
+
+                    # add variable
+                    flags = str(flags + ' -e ' + name + '=' + value)
+
+                # run container
+                command = str('docker run -p ' + self.port + ':' + self.port + flags + ' -d --name ' + self.product_name + ' ' + self.product_name + '-image')
+                os.system(command)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not run the deployment from the Docker image, make sure the Dockerfile is working.')
+
+    # helper method to expose pod
+    def __expose_pod(self):
+
+        """
+        Private method to expose a deployment.
+
+        This function exposes the deployment that was just deployed.
+        """
+
+        # try to expose the deployment
+        try:
+
+            # expose the deployment
+            command = str('kubectl expose deployment ' + self.product_name + ' --port=' + self.port + ' --type=NodePort -n ' + self.project_name)
+            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not expose the service, make sure your workbench is setup properly')
+
+    # helper method to get the url
+    def __get_url(self):
+
+        """
+        Private method to get the url of a deployment.
+
+        This function exposes the service on a minikube level an retreives
+        the url.
+        """
+
+        # try to expose service
+        try:
+
+            # expose the service on minikube
+            command = str('minikube service ' + self.product_name + ' -n ' + self.project_name + ' --url')
+            service_url = subprocess.check_output(command.split())
+
+            # decode url
+            service_url = str(service_url.decode("utf-8")).replace("\n", "")
+
+            # cache the url without route
+            self.base_url = service_url
+                
+            # add route warning
+            service_url = service_url + str('/<your_route>')
+
+            # write the url to self
+            self.service_url = service_url
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not expose the service to your host machine. Make sure the workbench is properly setup.')
+
+    # helper function to check if deployment exists
+    def __check_pods(self, product, project, direct = False):
+
+        """
+        Private method to check if a deployment exists.
+
+        This function checks, if a deployment already exists on Minikube.
+
+        Parameters
+        ----------
+        product : string
+            String with the name of the product
+        project : string
+            String with the name of the project
+        direct : boolean
+            If True, the cluster is asked even if the inventory of the
+            workbench could answer, as the inventory may miss the latest events
+        """
+
+        # check if the inventory of the workbench can answer
+        if not direct and self.workbench is not None and self.workbench.inventory.watching:
+
+            # answer from memory
+            return self.workbench.inventory.has_product(project = project, product = product)
+
+        # try to check if service exists
+        try:
+
+            # check for service
+            command = str('kubectl get deployment ' + product + ' -n' + project)
+            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+            # check result
+            if exists == 0:
+
+                # return False
+                return True
+            
+            # if not 0, then False
+            else:
+
+                # return False
+                return False
+        
+        # if it breaks, it doesn't exist
+        except:
+
+            # return False
+            return False
+
+    # helper function to check if service exists
+    def __check_svcs(self, product, project, direct = False):
+
+        """
+        Private method to check if a svc exists.
+
+        This function checks, if a svc already exists on Minikube.
+
+        Parameters
+        ----------
+        product : string
+            String with the name of the product
+        project : string
+            String with the name of the project
+        direct : boolean
+            If True, the cluster is asked even if the inventory of the
+            workbench could answer, as the inventory may miss the latest events
+        """
+
+        # check if the inventory of the workbench can answer
+        if not direct and self.workbench is not None and self.workbench.inventory.watching:
+
+            # answer from memory
+            return self.workbench.inventory.has_service(project = project, product = product)
+
+        # try to check if service exists
+        try:
+
+            # check for service
+            command = str('kubectl get services ' + product + ' -n' + project)
+            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+            # check result
+            if exists == 0:
+
+                # return False
+                return True
+            
+            # if not 0, then False
+            else:
+
+                # return False
+                return False
+        
+        # if it breaks, it doesn't exist
+        except:
+
+            # return False
+            return False
+
+    # helper function to check if container exists
+    def __check_container(self, product):
+
+        """
+        Private method to check if a container exists.
+
+        This function checks, if a container already exists on localhost.
+
+        Parameters
+        ----------
+        product : string
+            String with the name of the product
+        """
+
+        # try to check if container exists
+        try:
+
+            # check for service
+            command = str('docker container inspect ' + product)
+            exists = subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+            # check result
+            if exists == 0:
+
+                # return False
+                return True
+            
+            # if not 0, then False
+            else:
+
+                # return False
+                return False
+        
+        # if it breaks, it doesn't exist
+        except:
+
+            # return False
+            return False
+
+    # helper function to delete pod
+    def __delete_pod(self, product, project):
+
+        """
+        Main method to delete the deployment.
+
+        This function deletes the deployment and the pods of specific
+        products and all Minikube artifacts with it.
+
+        Parameters
+        ----------
+        product : string
+            String that gives the name of the product deployment that should be deleted
+        project : string
+            String that gives the name of the project in which the product should be deleted
+        """
+
+        # try to delete pod
+        try:
+
+            # delete the deployment and a pod left by earlier versions
+            command = str('kubectl delete deployment/' + product + ' pod/' + product + ' --ignore-not-found -n ' + project)
+            subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not delete the pod for deployment: ' + product)
+
+    # helper function to delete service
+    def __delete_services(self, product, project):
+
+        """
+        Main method to delete services.
+
+        This function deletes the services of specific products and all
+        Minikube artifacts with it.
+
+        Parameters
+        ----------
+        product : string
+            String that gives the name of the product deployment that should be deleted
+        project : string
+            String that gives the name of the project in which the product should be deleted
+        """
+
+        # try to delete service
+        try:
+
+            # delete the service
+            command = str('kubectl delete service ' + product + ' -n ' + project)
+            subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not delete the service for deployment: ' + product)    
+
+    # helper function to delete docker container
+    def __delete_container(self, product):
+
+        """
+        Main method to delete container.
+
+        This function deletes the a locally running Docker container
+
+        Parameters
+        ----------
+        product : string
+            String that gives the name of the product deployment that should be deleted
+        """
+
+        # try to delete a container
+        try:
+
+            # stop the container
+            command = str('docker stop ' + product)
+            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+
+            # rm container
+            command = str('docker rm ' + product)
+            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception('I could not delete the container for deployment: ' + product)
+
+    # main method to delete products
+    def delete_deployment(self, product, project):
+
+        """
+        Main method to delete deployments.
+
+        This function deletes the deployment of specific products and all
+        Minikube artifacts with it.
+
+        Parameters
+        ----------
+        product : string
+            String that gives the name of the product deployment that should be deleted
+        project : string
+            String that gives the name of the project in which the product should be deleted
+        """
+
+        # try to delete the product deployment
+        try:
+
+            # check if local deployment
+            if not self.local:
+
+                # check if the deployment exists, asking the cluster, as the inventory does not know deployments it missed
+                if self.__check_pods(product = product, project = project, direct = True):
+
+                    # delete the pod
+                    self.__delete_pod(product = product, project = project)
+
+                # if it does not exist
+                else:
+
+                    # print message
+                    print ('There is no pod for your deployment: ' + product)
+
+                # check if service exists
+                if self.__check_svcs(product = product, project = project, direct = True):
+
+                    # delete the pod
+                    self.__delete_services(product = product, project = project)
+
+                # if it does not exist
+                else:
+
+                    # print message
+                    print ('There is no service for your deployment: ' + product)
+
+            # if local
+            else:
+
+                # check if the container exists
+                if self.__check_container(product = product):
+
+                    # delete the container
+                    self.__delete_container(product = product)
+
+                # if it does not exist
+                else:
+
+                    # print message
+                    print ('There is no container for your deployment: ' + product)
+
+        # handle exception
+        except:
+
+            # raise exception
+            raise Exception(str('I could not delete the deployment of your product: ' + product))
+
+        # record that the product is no longer deployed
+        self.store.save_product(project = project,
+                                name = product,
+                                service_url = None,
+                                status = 'deleted',
+                                settings = {'base_url': None})
+
+        # check if this product was deleted
+        if product == self.product_name and project == self.project_name:
+
+            # forget the url
+            self.base_url = None
+
+    # helper method to capture the manifests of the deployment
+    def __get_manifests(self):
+
+        """
+        Private method to capture the manifests of the deployment.
+
+        This function reads the deployment and the service of the product from the
+        workbench and strips everything the cluster added, so the manifests
+        can be applied again to restore the deployment.
+
+        Returns
+        -------
+        list
+            List with the manifests or None if they could not be read
+        """
+
+        # try to read the manifests
+        try:
+
+            # read deployment and service
+            command = str('kubectl get deployment/' + self.product_name + ' service/' + self.product_name + ' -n ' + self.project_name + ' -o json')
+            listing = json.loads(subprocess.check_output(command.split(), stderr=subprocess.DEVNULL))
+
+        # handle exception
+        except:
+
+            # return None
+            return None
+
+        # initialize the manifests
+        manifests = []
+
+        # loop over items
+        for item in listing.get('items', []):
+
+            # drop the status
+            item.pop('status', None)
+
+            # drop the metadata the cluster added
+            for field in ['uid', 'resourceVersion', 'creationTimestamp', 'managedFields', 'generation', 'selfLink']:
+
+                # drop field
+                item.get('metadata', {}).pop(field, None)
+
+            # drop the fields of the spec the cluster assigned
+            for field in ['nodeName', 'clusterIP', 'clusterIPs']:
+
+                # drop field
+                item.get('spec', {}).pop(field, None)
+
+            # add manifest
+            manifests.append(item)
+
+        # return manifests
+        return manifests
+
+    # helper method to record a deployment
+    def __record_deployment(self, duration):
+
+        """
+        Private method to record a deployment in the store.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the deployment in seconds
+        """
+
+        # check if the product runs on the workbench
+        if not self.local:
+
+            # capture the manifests to restore the deployment later on
+            manifests = self.__get_manifests()
+
+        # if the product runs locally
+        else:
+
+            # there is nothing to restore
+            manifests = None
+
+        # record the state of the product
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                service_url = self.service_url,
+                                local = self.local,
+                                status = self.current_status,
+                                manifest = manifests,
+                                settings = {'base_url': self.base_url})
+
+        # record the deployment
+        self.store.record_deployment(project = self.project_name,
+                                     product = self.product_name,
+                                     image_digest = self.image_digest,
+                                     service_url = self.service_url,
+                                     duration = duration)
+
+    # main method to deploy product
+    def deploy(self, local = False, cpu_request = None, memory_request = None, cpu_limit = None, memory_limit = None, workers = None,
+               replicas = None, spread = None, prepull = None):
+
+        """
+        Main method to deploy the product.
+
+        This function takes the Dockerfile and deploys it to the workbench. The
+        user can also choose to just run the container locally. The thread
+        pools of NumPy and BLAS as well as the number of API workers are set
+        to match the cpu resources, so products sharing a node do not
+        oversubscribe it.
+
+        Parameters
+        ----------
+        local : boolean
+            if set to True, the product is build locally and not deployed to
+            the workbench.
+        cpu_request : string
+            cores reserved for the product, e.g. "500m" or "1"
+        memory_request : string
+            memory reserved for the product, e.g. "256Mi"
+        cpu_limit : string
+            maximum cores the product can use, e.g. "2"
+        memory_limit : string
+            maximum memory the product can use, e.g. "1Gi"
+        workers : int
+            number of API workers, defaults to the number of threads derived
+            from the cpu resources
+        replicas : int
+            number of replicas of the product on the workbench
+        spread : string
+            how the replicas are spread over the nodes: "anti-affinity" prefers
+            nodes without a replica, "topology" keeps the replicas per node
+            even, the default None leaves it to the scheduler
+        prepull : boolean
+            if True the image is made ready on every node before the rollout
+            starts, the default None does so if the workbench runs several
+            nodes
+        """
+        # check if product is already prepared
+        if self.dk_file_path is None:
+
+            # raise Exception
+            raise Exception('You first need to run prepare_deployment() before deploying your product.')
+
+        # store local in self
+        self.local = local
+
+        # loop over the resources
+        for key, value in [('cpu_request', cpu_request), ('memory_request', memory_request),
+                           ('cpu_limit', cpu_limit), ('memory_limit', memory_limit), ('workers', workers)]:
+
+            # check if the resource was given
+            if value is not None:
+
+                # store resource
+                self.resources[key] = value
+
+        # check if replicas were given
+        if replicas is not None:
+
+            # store replicas
+            self.replicas = int(replicas)
+
+        # check if spread was given
+        if spread is not None:
+
+            # check if spread is known
+            if spread not in ['anti-affinity', 'topology']:
+
+                # raise Exception
+                raise Exception('spread arg should be either "anti-affinity" or "topology"')
+
+            # store spread
+            self.spread = spread
+
+        # a product deployed on its own is no longer served by a pack
+        self.packed_in = None
+
+        # record the resources
+        settings = dict(self.resources)
+        settings.update({'replicas': self.replicas, 'spread': self.spread, 'packed_in': None})
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                settings = settings)
+
+        # store start time
+        deploy_start = time.perf_counter()
+
+        # check if local build requested
+        if not self.local:
+
+            # build docker image on Minikube registry
+            self.__build_image(local = self.local)
+
+            # check if the image should be ready on every node before the rollout
+            if prepull or (prepull is None and self.store.get_setting('nodes', 1) > 1):
+
+                # pre-pull the image
+                self.prepull()
+
+            # check if already exists, asking the cluster, as a create fails on anything the inventory missed
+            pod_exists_already = self.__check_pods(product = self.product_name, project = self.project_name, direct = True)
+            svc_exists_already = self.__check_svcs(product = self.product_name, project = self.project_name, direct = True)
+
+            # if pod already exists delete it
+            if pod_exists_already:
+
+                # delete product 
+                self.__delete_pod(product = self.product_name,
+                                project = self.project_name)
+
+            # if service already exists delete it
+            if svc_exists_already:
+
+                # delete service
+                self.__delete_services(product = self.product_name,
+                                    project = self.project_name)
+
+            # run deployment
+            self.__run_deployment(local = local)
+
+            # expose deployment
+            self.__expose_pod()
+
+            # get url
+            self.__get_url()
+
+            # change the status
+            self.current_status = 'deployed and healthy'
+
+            # record the deployment
+            self.__record_deployment(duration = time.perf_counter() - deploy_start)
+
+            # build report
+            report = """
+
+            Deployment Report:
+            ------------------
+
+            This is an automatically generated report on the status of your deployed
+            product. Your API is now containerized and hosted on the workbench. You
+            can access the API using:
+
+            {service_url}
+
+            You can call the API in whatever way it is designed. If you want to get
+            rid of it, just use the delete_deployment() method. If you just want to
+            update the API, you can just use prepare_deployment() to create a new
+            Dockerfile and then deploy() again.
+
+                    Your Product
+            -----------------------
+            Name:       {name}
+            Project:    {project}
+            Status:     {status}
+            Access:     {service_url}
+
+            You are not forced to stay on your workbench though. You can use
+            the push_product() method to push the image of your product to any
+            registry you want.
+            """.format(service_url = self.service_url,
+                    name = self.product_name,
+                    project = self.project_name,
+                    status = self.current_status)
+
+            # print report
+            print (report)
+        
+        # if local build is requested
+        else:
+
+            # build the Docker image locally
+            self.__build_image(local = self.local)
+
+            # run the docker container locally
+            self.__run_deployment(local = self.local)
+
+            # change the status
+            self.current_status = 'deployed and healthy'
+
+            # construct the url
+            self.base_url = str('http://localhost:' + self.port)
+            self.service_url = str('localhost:' + self.port + '/<your_route>')
+
+            # record the deployment
+            self.__record_deployment(duration = time.perf_counter() - deploy_start)
+
+            # build report
+            report = """
+
+            Deployment Report:
+            ------------------
+
+            This is an automatically generated report on the status of your deployed
+            product. Your API is now containerized and hosted on your local machine.
+            You can access the API using:
+
+            {service_url}
+
+            You can call the API in whatever way it is designed. If you want to get
+            rid of it, just use the delete_deployment() method. If you just want to
+            update the API, you can just use prepare_deployment() to create a new
+            Dockerfile and then deploy() again.
+
+                    Your Product
+            -----------------------
+            Name:       {name}
+            Project:    {project}
+            Status:     {status}
+            Access:     {service_url}
+
+            You are not forced to stay on your local machine though. You can use
+            the push_product() method to push the image of your product to any
+            registry you want.
+            """.format(service_url = self.service_url,
+                    name = self.product_name,
+                    project = self.project_name,
+                    status = self.current_status)
+
+            # print report
+            print (report)
+
+    # main method to scale the product
+    def scale(self, replicas, prepull = False):
+
+        """
+        Main method to scale the product on the workbench.
+
+        Parameters
+        ----------
+        replicas : int
+            Number of replicas, 0 stops all replicas until the product is
+            called again
+        prepull : boolean
+            If True and the product scales up, the image is made ready on
+            every node first
+        """
+
+        # check if the product runs on the workbench
+        if self.local or self.packed_in is not None:
+
+            # raise Exception
+            raise Exception('Only products deployed to the workbench on their own can be scaled.')
+
+        # check if the image should be ready on every node first
+        if prepull and int(replicas) > (self.replicas if self.current_status == 'deployed and healthy' else 0):
+
+            # pre-pull the image
+            self.prepull()
+
+        # try to scale the deployment
+        try:
+
+            # scale deployment
+            command = str('kubectl scale deployment/' + self.product_name + ' --replicas=' + str(int(replicas)) + ' -n ' + self.project_name)
+            subprocess.run(command.split(), stdout=subprocess.DEVNULL, check=True)
+
+        # handle exception
+        except:
+
+            # raise Exception
+            raise Exception(str('I could not scale the product ' + self.product_name + ', make sure it is deployed.'))
+
+        # check if the product was scaled to zero
+        if int(replicas) == 0:
+
+            # update status
+            self.current_status = 'scaled to zero'
+
+        # if the product runs
+        else:
+
+            # store replicas
+            self.replicas = int(replicas)
+            self.current_status = 'deployed and healthy'
+
+        # record the product
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                status = self.current_status,
+                                settings = {'replicas': self.replicas})
+
+    # helper method to read the stats of the replicas
+    def __read_replicas(self, samples):
+
+        """
+        Private method to read the stats of as many replicas as possible.
+
+        Every reading opens a new connection, so the service spreads the
+        readings over the replicas.
+
+        Parameters
+        ----------
+        samples : int
+            Number of readings
+
+        Returns
+        -------
+        dict
+            Dict with the stats by host of the replica
+        """
+
+        # initialize the readings
+        readings = {}
+
+        # get the url of the product
+        base_url = self.__get_client().base_url
+
+        # loop over readings
+        for _ in range(samples):
+
+            # try to read the stats
+            try:
+
+                # read stats on a new connection
+                replica_client = client(base_url, pool_size = 1, timeout = 10)
+                status, headers, content, latency = replica_client.request('GET', '/_stats')
+                replica_client.close()
+                stats = json.loads(content)
+
+            # if the replica does not answer
+            except:
+
+                # skip reading
+                continue
+
+            # store stats
+            readings[stats['host']] = stats
+
+        # return readings
+        return readings
+
+    # main method to autoscale the product
+    def autoscale(self, min_replicas, max_replicas, target, metric = 'rate', interval = 15, scale_down_delay = 300, simulate_load = None, report = True):
+
+        """
+        Main method to scale the replicas of the product with its load.
+
+        This function reads the metric from the wrapper of every replica each
+        interval and scales the product to keep the metric per replica close
+        to the target. Scaling up happens right away, scaling down only to the
+        highest replicas needed within scale_down_delay seconds. Every scaling
+        event is recorded in the history of the product. The autoscaling runs
+        in the background as long as this Python session.
+
+        With simulate_load, the policy is run against the given load curve
+        instead, without touching the product.
+
+        Parameters
+        ----------
+        min_replicas : int
+            Lowest number of replicas
+        max_replicas : int
+            Highest number of replicas
+        target : float
+            Target value of the metric per replica
+        metric : string
+            String with the metric, "rate" for requests per second, "in_flight"
+            for requests in flight or "p95" for the p95 latency in seconds
+        interval : float
+            Seconds between two decisions
+        scale_down_delay : float
+            Seconds the replicas are kept before scaling down
+        simulate_load : list
+            List with the total load per interval to simulate, in units of the
+            metric, None to autoscale the product
+        report : boolean
+            If True a report of the simulation is printed
+
+        Returns
+        -------
+        list
+            List with the steps of the simulation, None if the product is
+            autoscaled
+        """
+
+        # build the policy
+        scaling_policy = policy(min_replicas = min_replicas,
+                                max_replicas = max_replicas,
+                                target = target,
+                                metric = metric,
+                                scale_down_delay = scale_down_delay)
+
+        # check if the policy is simulated
+        if simulate_load is not None:
+
+            # run the simulation
+            steps = simulate(scaling_policy, simulate_load, interval = interval)
+
+            # check if a report should be printed
+            if report:
+
+                # get the scaling events
+                events = [step for step in steps if step['decided'] != step['replicas']]
+
+                # build report
+                report = """
+
+                Autoscaling Report:
+                -------------------
+
+                This is an automatically generated report on the simulated
+                autoscaling of your product.
+
+                  Simulation
+                -----------------------
+                Metric:             {metric}
+                Target:             {target} per replica
+                Intervals:          {intervals} of {interval} s
+                Scaling events:     {events}
+                Replicas:           {lowest} to {highest}
+                Above target:       {above} intervals
+                Replica seconds:    {replica_seconds}
+                """.format(metric = METRICS[metric],
+                           target = target,
+                           intervals = len(steps),
+                           interval = interval,
+                           events = len(events),
+                           lowest = min(step['replicas'] for step in steps) if steps else min_replicas,
+                           highest = max(step['replicas'] for step in steps) if steps else min_replicas,
+                           above = sum(1 for step in steps if step['observed'] > target * (1 + scaling_policy.tolerance)),
+                           replica_seconds = sum(step['replicas'] for step in steps) * interval)
+
+                # print report
+                print (report)
+
+            # return steps
+            return steps
+
+        # check if the wrapper serves the product
+        if not self.wrapped:
+
+            # raise Exception
+            raise Exception('Autoscaling needs the wrapper, prepare_deployment() with an API script defining app or predict.')
+
+        # check if the product runs on the workbench
+        if self.local or self.packed_in is not None:
+
+            # raise Exception
+            raise Exception('Only products deployed to the workbench on their own can be autoscaled.')
+
+        # stop a previous autoscaling
+        self.stop_autoscale()
+
+        # record the autoscaling
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                settings = {'autoscale': {'min_replicas': int(min_replicas),
+                                                          'max_replicas': int(max_replicas),
+                                                          'target': target,
+                                                          'metric': metric}})
+
+        # store the event stopping the autoscaling
+        stop = threading.Event()
+        self.autoscaling = stop
+
+        # helper to scale the product each interval
+        def watch():
+
+            # store the previous readings
+            previous = {}
+
+            # loop until the autoscaling is stopped
+            while not stop.wait(interval):
+
+                # try to scale the product
+                try:
+
+                    # read the product
+                    recorded = self.store.get_product(project = self.project_name, name = self.product_name)
+
+                    # check if the product runs, a product scaled to zero is woken by the next call
+                    if recorded['status'] != 'deployed and healthy':
+
+                        # skip interval
+                        continue
+
+                    # get the replicas
+                    replicas = int(recorded['settings'].get('replicas') or 1)
+
+                    # read the replicas, twice as often as there are replicas
+                    current = self.__read_replicas(samples = min(2 * replicas, 32))
+
+                    # measure the metric
+                    observed = measure(previous, current, metric)
+                    previous.update(current)
+
+                    # decide the replicas
+                    decided = scaling_policy.decide(replicas, observed, time.time())
+
+                    # check if the replicas change
+                    if decided == replicas:
+
+                        # skip interval
+                        continue
+
+                    # scale the deployment
+                    command = str('kubectl scale deployment/' + self.product_name + ' --replicas=' + str(decided) + ' -n ' + self.project_name)
+                    subprocess.run(command.split(), stdout=subprocess.DEVNULL, check=True)
+
+                    # record the scaling event
+                    self.replicas = decided
+                    self.store.save_product(project = self.project_name,
+                                            name = self.product_name,
+                                            settings = {'replicas': decided})
+                    self.store.record_scaling(project = self.project_name,
+                                              product = self.product_name,
+                                              replicas_from = replicas,
+                                              replicas_to = decided,
+                                              metric = metric,
+                                              observed = observed,
+                                              target = target)
+
+                    # print message
+                    print (str('> Scaled ' + self.product_name + ' from ' + str(replicas) + ' to ' + str(decided) + ' replicas, ' +
+                               (metric + ' per replica was ' + str(round(observed, 3)) if observed is not None else 'to keep it within the bounds')))
+
+                # handle exception
+                except Exception as error:
+
+                    # print message
+                    print (str('> Autoscaling ' + self.product_name + ' failed, trying again: ' + str(error)))
+
+        # start the autoscaling in the background
+        threading.Thread(target=watch, daemon=True).start()
+
+        # print message
+        print (str('> Autoscaling ' + self.product_name + ' between ' + str(min_replicas) + ' and ' + str(max_replicas) + ' replicas on ' + METRICS[metric]))
+
+    # main method to stop the autoscaling
+    def stop_autoscale(self):
+
+        """
+        Main method to stop the autoscaling of the product.
+        """
+
+        # check if the product is autoscaled
+        if self.autoscaling is not None:
+
+            # stop autoscaling
+            self.autoscaling.set()
+            self.autoscaling = None
+
+    # helper method to wake a product
+    def __wake(self):
+
+        """
+        Private method to wake a product that was scaled to zero.
+
+        This function scales the product, or the pack serving it, back to its
+        replicas and waits until they are ready.
+
+        Returns
+        -------
+        boolean
+            True if the product was woken, False if it was not scaled to zero
+        """
+
+        # get the deployment serving the product
+        name = self.packed_in or self.product_name
+        recorded = self.store.get_product(project = self.project_name, name = name)
+
+        # check if the deployment was scaled to zero
+        if recorded is None or recorded['status'] != 'scaled to zero':
+
+            # return False
+            return False
+
+        # print message
+        print (str('> Waking up ' + name + ', it was scaled to zero'))
+
+        # get the replicas
+        replicas = str(recorded['settings'].get('replicas') or 1)
+
+        # try to scale the deployment
+        try:
+
+            # scale deployment and wait for the replicas
+            subprocess.run(str('kubectl scale deployment/' + name + ' --replicas=' + replicas + ' -n ' + self.project_name).split(), stdout=subprocess.DEVNULL, check=True)
+            subprocess.run(str('kubectl rollout status deployment/' + name + ' -n ' + self.project_name + ' --timeout=300s').split(), stdout=subprocess.DEVNULL, check=True)
+
+        # handle exception
+        except:
+
+            # raise Exception
+            raise Exception(str('I could not wake up ' + name + ', make sure the workbench is running.'))
+
+        # record the deployment as running
+        self.store.save_product(project = self.project_name, name = name, status = 'deployed and healthy')
+
+        # check if the product itself was woken
+        if name == self.product_name:
+
+            # update status
+            self.current_status = 'deployed and healthy'
+
+        # return True
+        return True
+
+    # main method to read the activity of the product
+    def stats(self):
+
+        """
+        Main method to read the activity of the product from its wrapper.
+
+        The stats of a packed product are the stats of its pack.
+
+        Returns
+        -------
+        dict
+            Dict with the requests, errors and requests in flight of all
+            workers, the time of the last request, the start and the current
+            time of the container
+        """
+
+        # check if the wrapper serves the product
+        if not self.wrapped:
+
+            # raise Exception
+            raise Exception('The stats need the wrapper, prepare_deployment() with an API script defining app or predict.')
+
+        # check if the product is served by a pack
+        if self.packed_in is not None:
+
+            # read the stats of the pack, which are the stats of its container
+            pack_client = client(self.__get_client().base_url.rsplit('/', 1)[0], pool_size = 1)
+            status, headers, content, latency = pack_client.request('GET', '/_stats')
+            pack_client.close()
+
+            # return stats
+            return decode(content, headers.get('content-type'))
+
+        # read the stats
+        return self.__read_wrapper('/_stats')
+
+    # helper method to read a route of the wrapper
+    def __read_wrapper(self, route):
+
+        """
+        Private method to read a route of the wrapper, e.g. its stats. The
+        call goes to the client directly, so it does not count as a latency
+        of the product and does not wake a product scaled to zero.
+
+        Parameters
+        ----------
+        route : string
+            String with the route of the wrapper
+
+        Returns
+        -------
+        object
+            Decoded answer of the wrapper
+        """
+
+        # call the wrapper
+        status, headers, content, latency = self.__get_client().request('GET', route)
+
+        # check if the call worked
+        if status >= 400:
+
+            # raise Exception
+            raise Exception(str('Your product answered with status ' + str(status) + ': ' + content[:200].decode('utf-8', errors='replace')))
+
+        # return the decoded answer
+        return decode(content, headers.get('content-type'))
+
+    # helper method to get the client
+    def __get_client(self, pool_size = 8):
+
+        """
+        Private method to get the client calling the product.
+
+        The url of the product is resolved once per deployment and cached, so
+        calls do not go through minikube again. The client keeps its
+        connections alive between calls.
+
+        Parameters
+        ----------
+        pool_size : int
+            Minimum number of connections the client keeps alive
+        """
+
+        # check if the product is served by a pack
+        if self.packed_in is not None:
+
+            # read the pack
+            pack = self.store.get_product(project = self.project_name, name = self.packed_in) or {'settings': {}}
+
+            # check if the pack is deployed
+            if pack['settings'].get('base_url') is None:
+
+                # raise Exception
+                raise Exception(str('You first need to deploy() the pack ' + self.packed_in + ' before calling this product.'))
+
+            # call the product under its prefix
+            self.base_url = str(pack['settings']['base_url'].rstrip('/') + '/' + self.product_name)
+
+        # check if the url is known
+        if self.base_url is None:
+
+            # check if the product is deployed
+            if self.current_status != 'deployed and healthy':
+
+                # raise Exception
+                raise Exception('You first need to deploy() your product before calling it.')
+
+            # check if the product runs locally
+            if self.local:
+
+                # build the url
+                self.base_url = str('http://localhost:' + self.port)
+
+            # if it runs on the workbench
+            else:
+
+                # resolve the url once
+                self.__get_url()
+
+            # cache the url
+            self.store.save_product(project = self.project_name,
+                                    name = self.product_name,
+                                    settings = {'base_url': self.base_url})
+
+        # check if the client has to be opened
+        if self.client is None or self.client.base_url != self.base_url.rstrip('/') or self.client.pool.maxsize < pool_size:
+
+            # close the previous client
+            if self.client is not None:
+
+                # close idle connections
+                self.client.close()
+
+            # open the client
+            self.client = client(self.base_url, pool_size = max(pool_size, 8))
+
+        # return client
+        return self.client
+
+    # helper method to call the product
+    def __call(self, product_client, route, payload, format, method):
+
+        """
+        Private method to send a single request to the product.
+
+        Parameters
+        ----------
+        product_client : client
+            The client calling the product
+        route : string
+            String with the route to call
+        payload : object
+            Payload to send
+        format : string
+            Format to encode the payload with
+        method : string
+            HTTP method to use
+
+        Returns
+        -------
+        object
+            Decoded answer of the product
+        """
+
+        # check if there is a payload
+        if payload is not None and method != 'GET':
+
+            # encode payload
+            body, content_type = encode(payload, format = format)
+            headers = {'Content-Type': content_type, 'Accept': content_type}
+
+        # if there is no payload
+        else:
+
+            # send no body
+            body, headers = None, {}
+
+        # try to call the product
+        try:
+
+            # call the product
+            status, response_headers, content, latency = product_client.request(method, route, body = body, headers = headers)
+
+        # handle a product that does not answer
+        except ConnectionError:
+
+            # check if the product was scaled to zero
+            if not self.__wake():
+
+                # raise exception
+                raise
+
+            # call the woken product
+            status, response_headers, content, latency = product_client.request(method, route, body = body, headers = headers)
+
+        # store the latency
+        self.latencies.append(latency)
+
+        # check if the call worked
+        if status >= 400:
+
+            # raise Exception
+            raise Exception(str('Your product answered with status ' + str(status) + ': ' + content[:200].decode('utf-8', errors='replace')))
+
+        # return the decoded answer
+        return decode(content, response_headers.get('content-type'))
+
+    # main method to call the product
+    def predict(self, route, payload = None, format = 'json', method = 'POST'):
+
+        """
+        Main method to call the API of the deployed product.
+
+        This function sends the payload to a route of the product over a
+        pooled keep-alive connection and decodes the answer by its content
+        type. The latency of every call is kept in the latencies slot.
+
+        Parameters
+        ----------
+        route : string
+            String with the route to call, e.g. "/predict"
+        payload : object
+            Payload to send, bytes are sent as they are
+        format : string
+            Format to encode the payload with: "json", "msgpack", "arrow" or
+            "raw", the answer comes back in the same format, so MessagePack
+            and Arrow answers are decoded into NumPy arrays
+        method : string
+            HTTP method to use, "GET" requests are sent without payload
+
+        Returns
+        -------
+        object
+            Decoded answer of the product
+        """
+
+        # call the product
+        return self.__call(self.__get_client(), route, payload, format, method)
+
+    # main method to score many records
+    def score_many(self, records, route = '/predict', batch_size = 256, concurrency = 4, format = 'json', report = True):
+
+        """
+        Main method to score a stream of records with the deployed product.
+
+        This function reads the records lazily from any iterable or generator,
+        sends them in batches and keeps at most concurrency batches in flight.
+        Every batch runs on its own keep-alive connection, so the batches are
+        spread over the replicas of the product. The results are yielded in
+        the order of the records, so only the batches in flight are held in
+        memory. The route has to accept a list of records and answer with a
+        list holding one result per record.
+
+        Parameters
+        ----------
+        records : iterable
+            Iterable or generator with the records to score
+        route : string
+            String with the route to call, e.g. "/predict"
+        batch_size : int
+            Number of records sent per request
+        concurrency : int
+            Maximum number of requests in flight
+        format : string
+            Format to encode the batches with: "json", "msgpack" or "arrow"
+        report : boolean
+            if True the throughput is printed once all records are scored
+
+        Returns
+        -------
+        generator
+            Generator yielding the result of each record, in the order of the
+            records. The arguments are checked right away, the records are
+            only read once the results are consumed.
+        """
+
+        # try to read the batch size and concurrency
+        try:
+
+            # read as integers
+            batch_size, concurrency = int(batch_size), int(concurrency)
+
+        # handle exception
+        except (TypeError, ValueError):
+
+            # raise Exception
+            raise Exception('batch_size and concurrency args should be positive integers: e.g. batch_size = 256, concurrency = 4')
+
+        # check the batch size and concurrency
+        if batch_size < 1 or concurrency < 1:
+
+            # raise Exception
+            raise Exception('batch_size and concurrency args should be positive integers: e.g. batch_size = 256, concurrency = 4')
+
+        # check the records
+        try:
+
+            # read the records lazily
+            records = iter(records)
+
+        # handle exception
+        except TypeError:
+
+            # raise Exception
+            raise Exception('records arg should be an iterable or generator of records: e.g. [{"age": 42}, {"age": 23}]')
+
+        # get a client with one connection per request in flight
+        product_client = self.__get_client(pool_size = concurrency)
+
+        # return the generator scoring the records
+        return self.__score_batches(product_client, records, route, batch_size, concurrency, format, report)
+
+    # helper method to score batches of records
+    def __score_batches(self, product_client, records, route, batch_size, concurrency, format, report):
+
+        """
+        Private method to score the records in batches, the generator behind
+        score_many().
+
+        Parameters
+        ----------
+        product_client : client
+            The client calling the product
+        records : iterator
+            Iterator with the records to score
+        route : string
+            String with the route to call
+        batch_size : int
+            Number of records sent per request
+        concurrency : int
+            Maximum number of requests in flight
+        format : string
+            Format to encode the batches with
+        report : boolean
+            if True the throughput is printed once all records are scored
+
+        Yields
+        ------
+        object
+            The result of each record, in the order of the records
+        """
+
+        # store the batches in flight, oldest first
+        in_flight = collections.deque()
+
+        # initialize the counters
+        rows = 0
+        batches = 0
+
+        # store start time
+        start = time.perf_counter()
+
+        # start the pool of senders
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+
+        # try to score the records
+        try:
+
+            # loop until the records and the batches in flight are exhausted
+            while True:
+
+                # fill up the batches in flight
+                while len(in_flight) < concurrency:
+
+                    # take the next batch
+                    batch = list(itertools.islice(records, batch_size))
+
+                    # check if the records are exhausted
+                    if not batch:
+
+                        # stop filling
+                        break
+
+                    # send the batch
+                    in_flight.append((len(batch), executor.submit(self.__call, product_client, route, batch, format, 'POST')))
+
+                # check if everything is scored
+                if not in_flight:
+
+                    # stop loop
+                    break
+
+                # wait for the oldest batch
+                size, future = in_flight.popleft()
+                results = future.result()
+
+                # check if there is one result per record
+                if not isinstance(results, list) or len(results) != size:
+
+                    # raise Exception
+                    raise Exception(str('Your product should answer a batch of ' + str(size) + ' records with a list of ' + str(size) + ' results.'))
+
+                # update the counters
+                rows = rows + size
+                batches = batches + 1
+
+                # yield the results in order
+                yield from results
+
+        # clean up, also if the caller stops early
+        finally:
+
+            # drop the batches that were not sent yet
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # report the throughput
+        self.__report_throughput(rows = rows, batches = batches, duration = time.perf_counter() - start, report = report)
+
+    # helper method to report the throughput
+    def __report_throughput(self, rows, batches, duration, report):
+
+        """
+        Private method to store and report the throughput of a bulk scoring.
+
+        Parameters
+        ----------
+        rows : int
+            Number of rows scored
+        batches : int
+            Number of batches sent, None if the product chunked the rows
+        duration : float
+            Duration of the scoring in seconds
+        report : boolean
+            if True the report is printed
+        """
+
+        # store the throughput
+        self.throughput = {'rows': rows,
+                           'batches': batches,
+                           'duration': duration,
+                           'rows_per_second': rows / duration if duration > 0 else 0.0}
+
+        # check if the report should be printed
+        if report:
+
+            # build report
+            report = """
+
+            Scoring Report:
+            ---------------
+
+            This is an automatically generated report on the bulk scoring of your product.
+
+            Rows:       {rows}
+            Duration:   {duration:.2f} s
+            Throughput: {rows_per_second:.0f} rows/s
+
+            """.format(**self.throughput)
+
+            # print report
+            print (report)
+
+    # main method to score a file
+    def score_file(self, path, format = None, chunk_size = None, header = True, report = True):
+
+        """
+        Main method to score a large file with the streaming bulk endpoint.
+
+        This function streams the file to the /_bulk route of the wrapper and
+        yields the results while the file is still being sent. The product
+        runs predict over chunks of a fixed size, so neither side holds more
+        than a chunk of the file in memory. The product has to be prepared
+        with the wrapper and its API script has to define predict(records).
+
+        Parameters
+        ----------
+        path : string
+            String with the path to a csv, JSON lines or Arrow stream file
+        format : string
+            Content type of the file, by default derived from its extension
+        chunk_size : int
+            Number of records per call of predict, defaults to the setting of
+            the product
+        header : boolean
+            if True the first row of a csv file holds the column names
+        report : boolean
+            if True the throughput is printed once the file is scored
+
+        Returns
+        -------
+        generator
+            Generator yielding the result of each record, in the order of the
+            file. The arguments are checked right away, the file is only sent
+            once the results are consumed.
+        """
+
+        # check if the wrapper serves the product
+        if not self.wrapped:
+
+            # raise Exception
+            raise Exception('The bulk endpoint needs the wrapper, prepare_deployment() with an API script defining predict(records).')
+
+        # derive the content type from the extension
+        content_type = format or BULK_CONTENT_TYPES.get(os.path.splitext(path)[1].lower())
+
+        # check if the content type is known
+        if content_type not in BULK_CONTENT_TYPES.values():
+
+            # raise Exception
+            raise Exception(str('format arg should be one of: ' + ', '.join(sorted(set(BULK_CONTENT_TYPES.values())))))
+
+        # check if the file exists
+        if not os.path.isfile(path):
+
+            # raise Exception
+            raise Exception(str('There is no file to score at: ' + str(path)))
+
+        # build the route
+        route = str('/_bulk?header=' + str(bool(header)).lower())
+
+        # check if the chunk size was given
+        if chunk_size is not None:
+
+            # try to read the chunk size
+            try:
+
+                # read as integer
+                chunk_size = int(chunk_size)
+
+            # handle exception
+            except (TypeError, ValueError):
+
+                # mark as invalid
+                chunk_size = 0
+
+            # check the chunk size
+            if chunk_size < 1:
+
+                # raise Exception
+                raise Exception('chunk_size arg should be a positive integer: e.g. chunk_size = 1024')
+
+            # add chunk size
+            route = str(route + '&chunk_size=' + str(chunk_size))
+
+        # return the generator streaming the file
+        return self.__stream_file(path, route, content_type, report)
 
-        """
-        Main method to delete pod.
+    # helper method to stream a file to the bulk endpoint
+    def __stream_file(self, path, route, content_type, report):
 
-        This function deletes the pods of specific products and all
-        Minikube artifacts with it.
+        """
+        Private method to stream a file to the bulk endpoint, the generator
+        behind score_file().
 
         Parameters
         ----------
-        product : string
-            String that gives the name of the product deployment that should be deleted
-        project : string
-            String that gives the name of the project in which the product should be deleted
+        path : string
+            String with the path of the file
+        route : string
+            String with the route of the bulk endpoint and its options
+        content_type : string
+            Content type of the file
+        report : boolean
+            if True the throughput is printed once the file is scored
+
+        Yields
+        ------
+        object
+            The result of each record, in the order of the file
         """
 
-        # try to delete pod
-        try:
+        # helper to read the file in blocks
+        def blocks():
 
-            # delete the pod
-            command = str('kubectl delete pod ' + product + ' -n ' + project)
-            subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+            # open the file
+            with open(path, 'rb') as file:
 
-        # handle exception
-        except:
+                # loop over blocks
+                for block in iter(lambda: file.read(1 << 20), b''):
 
-            # raise exception
-            raise Exception('I could not delete the pod for deployment: ' + product)
+                    # yield block
+                    yield block
 
-    # helper function to delete service
-    def __delete_services(self, product, project):
+        # initialize the counter
+        rows = 0
 
-        """
-        Main method to delete services.
+        # store start time
+        start = time.perf_counter()
 
-        This function deletes the services of specific products and all
-        Minikube artifacts with it.
+        # loop over the lines of the answer
+        for line in self.__get_client().stream('POST', route, blocks(), headers = {'Content-Type': content_type}):
+
+            # update the counter
+            rows = rows + 1
+
+            # yield result
+            yield json.loads(line)
+
+        # report the throughput
+        self.__report_throughput(rows = rows, batches = None, duration = time.perf_counter() - start, report = report)
+
+    # main method to report the latencies
+    def latency_report(self, report = True):
+
+        """
+        Main method to report the latencies of the latest calls.
 
         Parameters
         ----------
-        product : string
-            String that gives the name of the product deployment that should be deleted
-        project : string
-            String that gives the name of the project in which the product should be deleted
+        report : boolean
+            if True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the number of calls and the mean, median, p95, p99 and
+            maximum latency in milliseconds
         """
 
-        # try to delete service
-        try:
+        # sort the latencies
+        latencies = sorted(self.latencies)
 
-            # delete the service
-            command = str('kubectl delete service ' + product + ' -n ' + project)
-            subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        # check if there were calls
+        if not latencies:
 
-        # handle exception
-        except:
+            # raise Exception
+            raise Exception('There are no calls to report on yet, call your product using predict() first.')
 
-            # raise exception
-            raise Exception('I could not delete the service for deployment: ' + product)    
+        # helper to get a percentile
+        def percentile(share):
 
-    # helper function to delete docker container
-    def __delete_container(self, product):
+            # return percentile in milliseconds
+            return latencies[min(int(share * len(latencies)), len(latencies) - 1)] * 1000
 
-        """
-        Main method to delete container.
+        # build the summary
+        summary = {'calls': len(latencies),
+                   'mean': sum(latencies) / len(latencies) * 1000,
+                   'p50': percentile(0.5),
+                   'p95': percentile(0.95),
+                   'p99': percentile(0.99),
+                   'max': latencies[-1] * 1000}
 
-        This function deletes the a locally running Docker container
+        # check if the report should be printed
+        if report:
 
-        Parameters
-        ----------
-        product : string
-            String that gives the name of the product deployment that should be deleted
-        """
+            # build report
+            report = """
 
-        # try to delete a container
-        try:
+            Latency Report:
+            ---------------
 
-            # stop the container
-            command = str('docker stop ' + product)
-            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+            This is an automatically generated report on the latest {calls} calls to your product.
 
-            # rm container
-            command = str('docker rm ' + product)
-            subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+            Mean:       {mean:.2f} ms
+            Median:     {p50:.2f} ms
+            p95:        {p95:.2f} ms
+            p99:        {p99:.2f} ms
+            Max:        {max:.2f} ms
 
-        # handle exception
-        except:
+            """.format(**summary)
 
-            # raise exception
-            raise Exception('I could not delete the container for deployment: ' + product)
+            # print report
+            print (report)
 
-    # main method to delete products
-    def delete_deployment(self, product, project):
+        # return summary
+        return summary
+
+    # main method to report the memory of the workers
+    def memory_report(self, report = True):
 
         """
-        Main method to delete deployments.
+        Main method to report the memory of the API workers.
 
-        This function deletes the deployment of specific products and all
-        Minikube artifacts with it.
+        The wrapper loads the model once and forks the workers, which share
+        the pages of the model. The resident set size counts those pages in
+        every worker, the proportional set size splits them, so the total
+        proportional size is what the workers really take from the memory
+        limit. With several replicas, the report covers the replica that
+        answers.
 
         Parameters
         ----------
-        product : string
-            String that gives the name of the product deployment that should be deleted
-        project : string
-            String that gives the name of the project in which the product should be deleted
+        report : boolean
+            if True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the memory of the master and each worker and the totals
+            in bytes
         """
 
-        # try to delete the product deployment
-        try:
+        # check if the wrapper serves the product
+        if not self.wrapped:
 
-            # check if local deployment
-            if not self.local:
+            # raise Exception
+            raise Exception('The memory report needs the wrapper, prepare_deployment() with an API script defining app or predict.')
 
-                # check if pod exists
-                if self.__check_pods(product = product, project = project):
+        # read the memory
+        memory = self.__read_wrapper('/_memory')
 
-                    # delete the pod
-                    self.__delete_pod(product = product, project = project)
+        # check if the report should be printed
+        if report:
 
-                # if it does not exist
-                else:
+            # helper to format a size
+            def megabytes(size):
 
-                    # print message
-                    print ('There is no pod for your deployment: ' + product)
+                # return size in MB
+                return 'n/a' if size is None else '{:.1f} MB'.format(size / 1024 ** 2)
 
-                # check if service exists
-                if self.__check_svcs(product = product, project = project):
+            # initialize the lines
+            lines = [str('master'.ljust(10) + str(memory['master']['pid']).ljust(10) + megabytes(memory['master']['rss']).rjust(12) + megabytes(memory['master']['pss']).rjust(12))]
 
-                    # delete the pod
-                    self.__delete_services(product = product, project = project)
+            # loop over workers
+            for worker in memory['workers']:
 
-                # if it does not exist
-                else:
+                # add line
+                lines.append(str('worker'.ljust(10) + str(worker['pid']).ljust(10) + megabytes(worker['rss']).rjust(12) + megabytes(worker['pss']).rjust(12)))
 
-                    # print message
-                    print ('There is no service for your deployment: ' + product)
+            # build report
+            report = """
 
-            # if local
-            else:
+            Memory Report:
+            --------------
 
-                # check if the container exists
-                if self.__check_container(product = product):
+            This is an automatically generated report on the memory of the {workers} worker(s)
+            of your product. RSS counts shared pages in every worker, PSS splits them.
 
-                    # delete the container
-                    self.__delete_container(product = product)
+            Process   Pid                RSS         PSS
+            {lines}
 
-                # if it does not exist
-                else:
+            Total RSS:  {total_rss}
+            Total PSS:  {total_pss}
 
-                    # print message
-                    print ('There is no container for your deployment: ' + product)
+            """.format(workers = len(memory['workers']) or 1,
+                       lines = '\n            '.join(lines),
+                       total_rss = megabytes(memory['total_rss']),
+                       total_pss = megabytes(memory['total_pss']))
 
-        # handle exception
-        except:
+            # print report
+            print (report)
 
-            # raise exception
-            raise Exception(str('I could not delete the deployment of your product: ' + product))
+        # return memory
+        return memory
 
-    # main method to deploy product
-    def deploy(self, local = False):
+    # main method to profile the start of the product
+    def profile_startup(self, top = 10, timeout = 300, report = True):
 
         """
-        Main method to deploy the product.
+        Main method to profile the cold start of the product.
 
-        This function takes the Dockerfile and deploys it to the workbench. The
-        user can also choose to just run the container locally.
+        This function starts a container of the product image with
+        -X importtime, measures the seconds from the start of the container to
+        its first response and reads which imports take the longest. The
+        container runs in the docker daemon the image was built in and is
+        removed afterwards, the product itself is not touched.
 
         Parameters
         ----------
-        local : boolean
-            if set to True, the product is build locally and not deployed to
-            the workbench.
+        top : int
+            Number of the heaviest imports to report
+        timeout : float
+            Seconds to wait for the first response
+        report : boolean
+            If True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the seconds to the first response, the seconds spent on
+            imports and the heaviest top level imports
         """
-        # check if product is already prepared
-        if self.dk_file_path is None:
+
+        # check if the image was built
+        if self.__get_image_digest(local = bool(self.local)) is None:
 
             # raise Exception
-            raise Exception('You first need to run prepare_deployment() before deploying your product.')
+            raise Exception('You first need to build() or deploy() your product before profiling its start.')
 
-        # store local in self
-        self.local = local
+        # check if the image is on a workbench without docker daemon
+        if not self.local and not self.store.get_setting('docker_env', True):
 
-        # check if local build requested
-        if not self.local:
+            # raise Exception
+            raise Exception('The runtime of your workbench offers no docker daemon to start a container in, build() your product with local = True to profile its start locally.')
 
-            # build docker image on Minikube registry
-            self.__build_image(local = self.local)
+        # use the docker daemon the image was built in
+        prefix = '' if self.local else 'eval $(minikube -p minikube docker-env) && '
 
-            # check if already exists
-            pod_exists_already = self.__check_pods(product = self.product_name, project = self.project_name)
-            svc_exists_already = self.__check_svcs(product = self.product_name, project = self.project_name)
+        # start the container, printing the import times
+        command = str(prefix + 'docker run -d -e PYTHONPROFILEIMPORTTIME=1 ' + self.product_name + '-image:latest')
 
-            # if pod already exists delete it
-            if pod_exists_already:
+        # try to start the container
+        try:
 
-                # delete product 
-                self.__delete_pod(product = self.product_name,
-                                project = self.project_name)
+            # start container
+            container = subprocess.run(command, shell=True, check=True, stdout=subprocess.PIPE).stdout.decode('utf-8').strip()
 
-            # if service already exists delete it
-            if svc_exists_already:
+        # handle exception
+        except:
 
-                # delete service
-                self.__delete_services(product = self.product_name,
-                                    project = self.project_name)
+            # raise Exception
+            raise Exception(str('I could not start a container of ' + self.product_name + ', make sure docker is running.'))
 
-            # run deployment
-            self.__run_deployment(local = local)
+        # try to profile the container
+        try:
 
-            # expose deployment
-            self.__expose_pod()
+            # wait for the first response inside the container
+            script = FIRST_RESPONSE_SCRIPT.format(port = int(self.port), timeout = timeout)
+            first = subprocess.run(str(prefix + 'docker exec ' + container + ' python -c ' + shlex.quote(script)),
+                                   shell=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
 
-            # get url
-            self.__get_url()
+            # check if the product answered
+            if first.returncode != 0:
 
-            # change the status
-            self.current_status = 'deployed and healthy'
+                # raise Exception
+                raise Exception(str('Your product did not answer within ' + str(timeout) + ' s, check docker logs of its container.'))
+
+            # read the import times from the logs
+            logs = subprocess.run(str(prefix + 'docker logs ' + container), shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            imports = read_importtime(logs.stdout.decode('utf-8', errors='replace'))
+
+        # clean up
+        finally:
+
+            # remove the container
+            subprocess.run(str(prefix + 'docker rm -f ' + container), shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # get the top level imports, the heaviest first
+        heaviest = sorted([item for item in imports if item['depth'] == 0], key = lambda item: item['cumulative'], reverse = True)[:top]
+
+        # build the profile
+        profile = {'first_response': float(first.stdout.decode('utf-8').strip()),
+                   'import_time': sum(item['self'] for item in imports),
+                   'imports': heaviest}
+
+        # record the profile
+        self.store.save_product(project = self.project_name,
+                                name = self.product_name,
+                                settings = {'startup': {'first_response': profile['first_response'],
+                                                        'import_time': profile['import_time']}})
+
+        # check if the report should be printed
+        if report:
+
+            # build the lines of the heaviest imports
+            lines = [str(item['module'].ljust(40) + '{:.3f} s'.format(item['cumulative']).rjust(12)) for item in heaviest]
 
             # build report
             report = """
 
-            Deployment Report:
-            ------------------
-
-            This is an automatically generated report on the status of your deployed
-            product. Your API is now containerized and hosted on the workbench. You
-            can access the API using:
+            Startup Report:
+            ---------------
 
-            {service_url}
+            This is an automatically generated report on the cold start of
+            your product, from the start of its container to its first
+            response.
 
-            You can call the API in whatever way it is designed. If you want to get
-            rid of it, just use the delete_deployment() method. If you just want to
-            update the API, you can just use prepare_deployment() to create a new
-            Dockerfile and then deploy() again.
+            First response:     {first_response:.3f} s
+            Imports:            {import_time:.3f} s
+            Precompiled:        {precompile}
 
-                    Your Product
-            -----------------------
-            Name:       {name}
-            Project:    {project}
-            Status:     {status}
-            Access:     {service_url}
+            Heaviest imports                              Cumulative
+            {lines}
 
-            You are not forced to stay on your workbench though. You can use
-            the push_product() method to push the image of your product to any
-            registry you want.
-            """.format(service_url = self.service_url,
-                    name = self.product_name,
-                    project = self.project_name,
-                    status = self.current_status)
+            """.format(first_response = profile['first_response'],
+                       import_time = profile['import_time'],
+                       precompile = self.precompile,
+                       lines = '\n            '.join(lines))
 
             # print report
             print (report)
-        
-        # if local build is requested
-        else:
 
-            # build the Docker image locally
-            self.__build_image(local = self.local)
+        # return profile
+        return profile
 
-            # run the docker container locally
-            self.__run_deployment(local = self.local)
+    # main method to compare the payload formats
+    def benchmark(self, payload, route = '/_predict', formats = None, calls = 50, report = True):
 
-            # change the status
-            self.current_status = 'deployed and healthy'
+        """
+        Main method to compare the payload formats on the same model.
 
-            # construct the url
-            self.service_url = str('localhost:' + self.port + '/<your_route>')
+        This function sends the same payload to the product in every format
+        and measures the full round trip, including encoding and decoding on
+        both sides. The first call per format is not counted, so connections
+        and caches are warm. Formats whose packages are not installed are
+        skipped.
 
-            # build report
-            report = """
+        Parameters
+        ----------
+        payload : object
+            Payload to send, e.g. a NumPy matrix with a batch of features
+        route : string
+            String with the route to call, by default predict of the wrapper
+        formats : list
+            List with the formats to compare, by default json, msgpack and arrow
+        calls : int
+            Number of calls per format
+        report : boolean
+            if True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the size of the payload in bytes and the mean, median
+            and p95 round trip in milliseconds per format
+        """
 
-            Deployment Report:
-            ------------------
+        # get the client
+        product_client = self.__get_client()
 
-            This is an automatically generated report on the status of your deployed
-            product. Your API is now containerized and hosted on your local machine.
-            You can access the API using:
+        # initialize the results
+        results = {}
 
-            {service_url}
+        # loop over formats
+        for format in formats or ['json', 'msgpack', 'arrow']:
 
-            You can call the API in whatever way it is designed. If you want to get
-            rid of it, just use the delete_deployment() method. If you just want to
-            update the API, you can just use prepare_deployment() to create a new
-            Dockerfile and then deploy() again.
+            # try to encode the payload
+            try:
 
-                    Your Product
-            -----------------------
-            Name:       {name}
-            Project:    {project}
-            Status:     {status}
-            Access:     {service_url}
+                # encode payload
+                body, content_type = encode(payload, format = format)
 
-            You are not forced to stay on your local machine though. You can use
-            the push_product() method to push the image of your product to any
-            registry you want.
-            """.format(service_url = self.service_url,
-                    name = self.product_name,
-                    project = self.project_name,
-                    status = self.current_status)
+            # if the format is not available
+            except Exception as error:
+
+                # skip format
+                results[format] = {'skipped': str(error)}
+                continue
+
+            # initialize the round trips
+            round_trips = []
+
+            # loop over the calls and one warm up call
+            for call in range(int(calls) + 1):
+
+                # store start time
+                start = time.perf_counter()
+
+                # call the product
+                self.__call(product_client, route, payload, format, 'POST')
+
+                # store round trip
+                round_trips.append(time.perf_counter() - start)
+
+            # drop the warm up call and sort
+            round_trips = sorted(round_trips[1:])
+
+            # store the results of the format
+            results[format] = {'bytes': len(body),
+                               'mean': sum(round_trips) / len(round_trips) * 1000,
+                               'p50': round_trips[len(round_trips) // 2] * 1000,
+                               'p95': round_trips[min(int(0.95 * len(round_trips)), len(round_trips) - 1)] * 1000}
+
+        # check if the report should be printed
+        if report:
+
+            # initialize the lines
+            lines = []
+
+            # loop over formats
+            for format, result in results.items():
+
+                # check if the format was skipped
+                if 'skipped' in result:
+
+                    # add line
+                    lines.append(str(format.ljust(12) + 'skipped, ' + result['skipped']))
+
+                # if the format was measured
+                else:
+
+                    # add line
+                    lines.append('{format:<12}{bytes:>12}  {mean:>9.2f}  {p50:>9.2f}  {p95:>9.2f}'.format(format = format, **result))
+
+            # build report
+            report = """
+
+            Format Benchmark Report:
+            ------------------------
+
+            This is an automatically generated report comparing the payload formats
+            on {calls} calls to {route} of your product. Times are round trips in ms.
+
+            Format             Bytes       Mean     Median        p95
+            {lines}
+
+            """.format(calls = calls,
+                       route = route,
+                       lines = '\n            '.join(lines))
 
             # print report
             print (report)
 
+        # return results
+        return results
+
     # main method to push product to other registry
     def push_product(self, registry):
         """
@@ -898,16 +4376,28 @@ class product:
         # try to push to the registry
         try:
 
+            # check if the runtime of minikube offers a docker daemon
+            if self.store.get_setting('docker_env', True):
+
+                # tag and push the image with the docker daemon of minikube
+                tag_command = str('eval $(minikube -p minikube docker-env) && docker tag ' + self.product_name + '-image ' + registry + '/' + self.product_name + '-image')
+                push_command = str('eval $(minikube -p minikube docker-env) && docker push ' + registry + '/' + self.product_name + '-image')
+
+            # if it does not
+            else:
+
+                # tag and push the image with minikube
+                tag_command = str('minikube image tag ' + self.product_name + '-image ' + registry + '/' + self.product_name + '-image')
+                push_command = str('minikube image push ' + registry + '/' + self.product_name + '-image')
+
             # tag the image to a remote registry
-            command = str('eval $(minikube -p minikube docker-env) && docker tag ' + self.product_name + '-image ' + registry + '/' + self.product_name + '-image')
-            os.system(command)
+            os.system(tag_command)
 
             # print message
             print (str('> Successfully tagged the image as ' + registry + '/' + self.product_name + '-image'))
 
-            # tag the image to a remote registry
-            command = str('eval $(minikube -p minikube docker-env) && docker push ' + registry + '/' + self.product_name + '-image')
-            os.system(command)
+            # push the image to a remote registry
+            os.system(push_command)
 
             # print message
             print (str('> Successfully pushed image to ' + registry))
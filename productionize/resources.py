@@ -0,0 +1,115 @@
+"""
+resources.py contains helper functions to work with the Kubernetes resource
+quantities used by the workbench and the products, e.g. "500m" cores or
+"512Mi" of memory.
+"""
+
+# import libs
+import math
+
+# helper function to parse cpu quantities
+def parse_cpu(quantity):
+
+    """
+    Helper function to parse a Kubernetes cpu quantity.
+
+    Parameters
+    ----------
+    quantity : string
+        String with the cpu quantity, e.g. "500m" or "2"
+
+    Returns
+    -------
+    float
+        Number of cores
+    """
+
+    # check if quantity is given
+    if not quantity:
+
+        # return zero
+        return 0.0
+
+    # check for milli cores
+    if str(quantity).endswith('m'):
+
+        # return cores
+        return float(str(quantity)[:-1]) / 1000
+
+    # return cores
+    return float(quantity)
+
+# helper function to parse memory quantities
+def parse_memory(quantity):
+
+    """
+    Helper function to parse a Kubernetes memory quantity.
+
+    Parameters
+    ----------
+    quantity : string
+        String with the memory quantity, e.g. "512Mi" or "2G"
+
+    Returns
+    -------
+    int
+        Number of bytes
+    """
+
+    # check if quantity is given
+    if not quantity:
+
+        # return zero
+        return 0
+
+    # define the units
+    units = {'Ki': 1024, 'Mi': 1024 ** 2, 'Gi': 1024 ** 3, 'Ti': 1024 ** 4, 'Pi': 1024 ** 5, 'Ei': 1024 ** 6,
+             'k': 1000, 'K': 1000, 'M': 1000 ** 2, 'G': 1000 ** 3, 'T': 1000 ** 4, 'P': 1000 ** 5, 'E': 1000 ** 6}
+
+    # loop over units, the two letter units first
+    for unit, factor in sorted(units.items(), key = lambda item: -len(item[0])):
+
+        # check if quantity has unit
+        if str(quantity).endswith(unit):
+
+            # return bytes
+            return int(float(str(quantity)[:-len(unit)]) * factor)
+
+    # return bytes
+    return int(float(quantity))
+
+# helper function to derive the thread count from cpu resources
+def thread_count(cpu_limit = None, cpu_request = None):
+
+    """
+    Helper function to derive the number of threads from cpu resources.
+
+    Numerical libraries spawn one thread per visible core by default, which
+    oversubscribes the cpu quota of a container. This function gives the
+    number of threads that fits the quota: the limit if given, else the
+    request, rounded down, but at least one.
+
+    Parameters
+    ----------
+    cpu_limit : string
+        String with the cpu limit
+    cpu_request : string
+        String with the cpu request
+
+    Returns
+    -------
+    int
+        Number of threads or None if no cpu resources were given
+    """
+
+    # check which quota to follow
+    cores = parse_cpu(cpu_limit) or parse_cpu(cpu_request)
+
+    # check if there is a quota
+    if not cores:
+
+        # return None
+        return None
+
+    # return threads
+    return max(int(math.floor(cores)), 1)
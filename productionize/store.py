@@ -0,0 +1,582 @@
+"""
+store.py contains the class store(), which persists the state of the workbench
+and its products in a local SQLite database. The store records the projects,
+the products with their files, ports and service urls, as well as the history
+of builds, deployments and scaling events. That way, a new Python session can reattach to the
+deployments on the workbench, without querying the cluster again. The database is
+only opened once it is used, and only created once something is written, so reading
+from a store that does not exist leaves no file behind.
+
+Slots:
+--------
+path : string
+    Stores the path to the SQLite database
+connection : sqlite3.Connection
+    Stores the connection to the SQLite database, None until it is used
+"""
+
+# import libs
+import sqlite3
+import threading
+import json
+import time
+import os
+
+# define the default location of the store
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.productionize', 'state.db')
+
+# define the schema of the store
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS products (
+    project TEXT NOT NULL,
+    name TEXT NOT NULL,
+    api_file TEXT,
+    requirements_file TEXT,
+    port TEXT,
+    dk_file_path TEXT,
+    image TEXT,
+    build_hash TEXT,
+    image_digest TEXT,
+    service_url TEXT,
+    local INTEGER,
+    status TEXT,
+    settings TEXT,
+    manifest TEXT,
+    updated_at REAL,
+    PRIMARY KEY (project, name)
+);
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    product TEXT NOT NULL,
+    build_hash TEXT,
+    image_digest TEXT,
+    duration REAL,
+    created_at REAL
+);
+CREATE INDEX IF NOT EXISTS builds_product ON builds (project, product, created_at);
+CREATE INDEX IF NOT EXISTS builds_hash ON builds (build_hash);
+CREATE TABLE IF NOT EXISTS deployments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    product TEXT NOT NULL,
+    image_digest TEXT,
+    service_url TEXT,
+    duration REAL,
+    created_at REAL
+);
+CREATE INDEX IF NOT EXISTS deployments_product ON deployments (project, product, created_at);
+CREATE TABLE IF NOT EXISTS scaling (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    product TEXT NOT NULL,
+    replicas_from INTEGER,
+    replicas_to INTEGER,
+    metric TEXT,
+    observed REAL,
+    target REAL,
+    created_at REAL
+);
+CREATE INDEX IF NOT EXISTS scaling_product ON scaling (project, product, created_at);
+"""
+
+# define the columns added to tables after their first release
+MIGRATIONS = [('products', 'manifest', 'TEXT'), ('builds', 'profile', 'TEXT')]
+
+# define the columns of a product that can be written
+PRODUCT_COLUMNS = ['api_file', 'requirements_file', 'port', 'dk_file_path', 'image', 'build_hash',
+                   'image_digest', 'service_url', 'local', 'status', 'settings', 'manifest']
+
+# setup the class
+class store:
+
+    # describe the class
+    def __init__(self, path = None):
+
+        # check if path was given
+        if path is None:
+
+            # use default path
+            path = DEFAULT_PATH
+
+        # store path
+        self.path = path
+
+        # store the connection, opened on first use
+        self.connection = None
+
+        # store the lock to guard the connection
+        self.lock = threading.Lock()
+
+    # helper method to open the database
+    def __connect(self):
+
+        """
+        Private method to open the database, creating it and its tables if
+        they do not exist yet.
+        """
+
+        # store path
+        path = self.path
+
+        # try to open the database
+        try:
+
+            # make sure the folder exists
+            if os.path.dirname(path):
+
+                # create folder
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # open connection
+            self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+            # allow concurrent readers
+            self.connection.execute('PRAGMA journal_mode=WAL')
+
+            # create the tables
+            self.connection.executescript(SCHEMA)
+
+            # loop over the migrations
+            for table, column, column_type in MIGRATIONS:
+
+                # get the existing columns
+                columns = [row[1] for row in self.connection.execute(str('PRAGMA table_info(' + table + ')'))]
+
+                # add the column if it is missing
+                if column not in columns:
+
+                    # add column
+                    self.connection.execute(str('ALTER TABLE ' + table + ' ADD COLUMN ' + column + ' ' + column_type))
+
+        # handle exception
+        except:
+
+            # forget the connection
+            self.connection = None
+
+            # raise exception
+            raise Exception(str('I could not open the state store at: ' + path))
+
+    # helper method to run a statement
+    def __execute(self, statement, parameters = ()):
+
+        """
+        Private method to run a statement on the database.
+
+        Parameters
+        ----------
+        statement : string
+            String with the SQL statement
+        parameters : tuple
+            Tuple with the parameters of the statement
+
+        Returns
+        -------
+        list
+            List with the rows as dicts
+        """
+
+        # lock the connection
+        with self.lock:
+
+            # check if the database is not open yet
+            if self.connection is None:
+
+                # check if it is only read from and does not exist, so there is nothing to read
+                if statement.lstrip().upper().startswith('SELECT') and not os.path.exists(self.path):
+
+                    # return no rows
+                    return []
+
+                # open the database
+                self.__connect()
+
+            # run the statement
+            cursor = self.connection.execute(statement, parameters)
+
+            # get the column names
+            columns = [column[0] for column in cursor.description or []]
+
+            # return rows as dicts
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # main method to write a setting
+    def set_setting(self, key, value):
+
+        """
+        Main method to write a setting of the workbench.
+
+        Parameters
+        ----------
+        key : string
+            String with the name of the setting
+        value : object
+            Any JSON serializable value
+        """
+
+        # write the setting
+        self.__execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    # main method to read a setting
+    def get_setting(self, key, default = None):
+
+        """
+        Main method to read a setting of the workbench.
+
+        Parameters
+        ----------
+        key : string
+            String with the name of the setting
+        default : object
+            Value to return if the setting does not exist
+        """
+
+        # read the setting
+        rows = self.__execute('SELECT value FROM settings WHERE key = ?', (key,))
+
+        # check if it exists
+        if not rows:
+
+            # return default
+            return default
+
+        # return value
+        return json.loads(rows[0]['value'])
+
+    # main method to record a project
+    def save_project(self, name):
+
+        """
+        Main method to record a project.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        """
+
+        # write the project
+        self.__execute('INSERT OR IGNORE INTO projects (name, created_at) VALUES (?, ?)', (name, time.time()))
+
+    # main method to delete a project
+    def delete_project(self, name):
+
+        """
+        Main method to delete a project and its products.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        """
+
+        # delete the products
+        self.__execute('DELETE FROM products WHERE project = ?', (name,))
+
+        # delete the project
+        self.__execute('DELETE FROM projects WHERE name = ?', (name,))
+
+    # main method to list projects
+    def list_projects(self):
+
+        """
+        Main method to list all recorded projects.
+
+        Returns
+        -------
+        list
+            List with the names of the projects
+        """
+
+        # return projects
+        return [row['name'] for row in self.__execute('SELECT name FROM projects ORDER BY name')]
+
+    # main method to record a product
+    def save_product(self, project, name, **fields):
+
+        """
+        Main method to record a product or update some of its fields.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        name : string
+            String with the name of the product
+        fields : dict
+            Fields of the product to write, settings are merged into the
+            settings recorded already
+        """
+
+        # check the fields
+        for field in fields:
+
+            # check if the field is known
+            if field not in PRODUCT_COLUMNS:
+
+                # raise Exception
+                raise Exception(str('The store does not know the product field: ' + field))
+
+        # check if settings are written
+        if 'settings' in fields:
+
+            # get the recorded product
+            recorded = self.get_product(project = project, name = name)
+
+            # merge the settings
+            settings = recorded['settings'] if recorded is not None else {}
+            settings.update(fields['settings'] or {})
+            fields['settings'] = json.dumps(settings)
+
+        # check if a manifest is written
+        if fields.get('manifest') is not None:
+
+            # encode the manifest
+            fields['manifest'] = json.dumps(fields['manifest'])
+
+        # make sure the project is recorded
+        self.save_project(project)
+
+        # make sure the product is recorded
+        self.__execute('INSERT OR IGNORE INTO products (project, name, updated_at) VALUES (?, ?, ?)', (project, name, time.time()))
+
+        # check if there is anything to update
+        if fields:
+
+            # build the update
+            assignments = ', '.join(str(field + ' = ?') for field in fields)
+            statement = str('UPDATE products SET ' + assignments + ', updated_at = ? WHERE project = ? AND name = ?')
+
+            # write the fields
+            self.__execute(statement, tuple(fields.values()) + (time.time(), project, name))
+
+    # helper method to decode a product row
+    def __decode_product(self, row):
+
+        """
+        Private method to decode a product row.
+
+        Parameters
+        ----------
+        row : dict
+            Dict with the row of the product
+        """
+
+        # decode settings
+        row['settings'] = json.loads(row['settings']) if row['settings'] else {}
+
+        # decode local
+        row['local'] = bool(row['local']) if row['local'] is not None else None
+
+        # decode manifest
+        row['manifest'] = json.loads(row['manifest']) if row['manifest'] else None
+
+        # return row
+        return row
+
+    # main method to read a product
+    def get_product(self, project, name):
+
+        """
+        Main method to read a recorded product.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        name : string
+            String with the name of the product
+
+        Returns
+        -------
+        dict
+            Dict with the fields of the product or None if it is not recorded
+        """
+
+        # read the product
+        rows = self.__execute('SELECT * FROM products WHERE project = ? AND name = ?', (project, name))
+
+        # check if it exists
+        if not rows:
+
+            # return None
+            return None
+
+        # return product
+        return self.__decode_product(rows[0])
+
+    # main method to list products
+    def list_products(self, project = None):
+
+        """
+        Main method to list all recorded products.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project, if None the products of all
+            projects are listed
+
+        Returns
+        -------
+        list
+            List with the products as dicts
+        """
+
+        # check if project was given
+        if project is None:
+
+            # read all products
+            rows = self.__execute('SELECT * FROM products ORDER BY project, name')
+
+        # if project was given
+        else:
+
+            # read products of project
+            rows = self.__execute('SELECT * FROM products WHERE project = ? ORDER BY name', (project,))
+
+        # return products
+        return [self.__decode_product(row) for row in rows]
+
+    # main method to delete a product
+    def delete_product(self, project, name):
+
+        """
+        Main method to delete a recorded product.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        name : string
+            String with the name of the product
+        """
+
+        # delete the product
+        self.__execute('DELETE FROM products WHERE project = ? AND name = ?', (project, name))
+
+    # main method to record a build
+    def record_build(self, project, product, build_hash, image_digest, duration, profile = None):
+
+        """
+        Main method to record a build of a product image.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+        build_hash : string
+            String with the hash of the build inputs
+        image_digest : string
+            String with the digest of the built image
+        duration : float
+            Duration of the build in seconds
+        profile : dict
+            Dict with the profile of the build, as summarized from its progress
+        """
+
+        # write the build
+        self.__execute('INSERT INTO builds (project, product, build_hash, image_digest, duration, profile, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (project, product, build_hash, image_digest, duration, json.dumps(profile) if profile is not None else None, time.time()))
+
+    # main method to record a deployment
+    def record_deployment(self, project, product, image_digest, service_url, duration):
+
+        """
+        Main method to record a deployment of a product.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+        image_digest : string
+            String with the digest of the deployed image
+        service_url : string
+            String with the url of the deployed service
+        duration : float
+            Duration of the deployment in seconds
+        """
+
+        # write the deployment
+        self.__execute('INSERT INTO deployments (project, product, image_digest, service_url, duration, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                       (project, product, image_digest, service_url, duration, time.time()))
+
+    # main method to record a scaling event
+    def record_scaling(self, project, product, replicas_from, replicas_to, metric, observed, target):
+
+        """
+        Main method to record a scaling event of a product.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+        replicas_from : int
+            Number of replicas before the event
+        replicas_to : int
+            Number of replicas after the event
+        metric : string
+            String with the metric the product was scaled on
+        observed : float
+            Observed value of the metric per replica
+        target : float
+            Target value of the metric per replica
+        """
+
+        # write the scaling event
+        self.__execute('INSERT INTO scaling (project, product, replicas_from, replicas_to, metric, observed, target, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                       (project, product, replicas_from, replicas_to, metric, observed, target, time.time()))
+
+    # main method to read the history of a product
+    def history(self, project, product):
+
+        """
+        Main method to read the build, deployment and scaling history of a
+        product.
+
+        Parameters
+        ----------
+        project : string
+            String with the name of the project
+        product : string
+            String with the name of the product
+
+        Returns
+        -------
+        dict
+            Dict with the lists of builds, deployments and scaling events,
+            newest first
+        """
+
+        # read builds
+        builds = self.__execute('SELECT * FROM builds WHERE project = ? AND product = ? ORDER BY created_at DESC', (project, product))
+
+        # loop over builds
+        for build in builds:
+
+            # decode the profile
+            build['profile'] = json.loads(build['profile']) if build.get('profile') else None
+
+        # read deployments
+        deployments = self.__execute('SELECT * FROM deployments WHERE project = ? AND product = ? ORDER BY created_at DESC', (project, product))
+
+        # read scaling events
+        scaling = self.__execute('SELECT * FROM scaling WHERE project = ? AND product = ? ORDER BY created_at DESC', (project, product))
+
+        # return history
+        return {'builds': builds, 'deployments': deployments, 'scaling': scaling}
@@ -6,7 +6,8 @@ necessary for the successfully productionizing your model.
 The components you need are:
 
 1. Docker: as a container technology https://www.docker.com
-2. VirtualBox: as a driver https://www.virtualbox.org
+2. VirtualBox: as a driver https://www.virtualbox.org, alternatively the docker driver
+   runs the cluster in a container, or HyperKit, Podman or QEMU can be used
 3. Minikube: as a local Kubernetes cluster https://minikube.sigs.k8s.io/
 4. Kubectl: as a Kubernetes CLI https://kubectl.docs.kubernetes.io
 
@@ -36,27 +37,78 @@ kc_prev_installed : boolean
     Stores if kubectl was already installed
 mk_prev_installed : boolean
     Stores if minikube was already installed
+driver : string
+    Stores the minikube driver the cluster runs on
+dr_installed : boolean
+    Stores if the tool the driver needs is already installed
+dr_prev_installed : boolean
+    Stores if the tool the driver needs was already installed
 current_projects : list
     Stores all active projects on the workbench
+inventory : inventory
+    Stores the in-memory view of the projects and products on the workbench
+store : store
+    Stores the persistent state of the workbench and its products
 cpus_used : string
     Stores the CPUs allocated to the workbench
 memory_used : string
     Stores the memory allocated to the workbench
+setup_durations : dict
+    Stores the duration of the setup per component in seconds
+idle_watch : threading.Event
+    Stores the event stopping the watch on idle products, None if not watching
 """
 
 # import libs
 import subprocess
+import shutil
 import os
 import sys
 import re
 import warnings
 import time
+import concurrent.futures
+import collections
+import threading
+import hashlib
+import tempfile
+import tarfile
+import json
+import math
+import io
+from productionize.inventory import inventory, SYSTEM_NAMESPACES
+from productionize.store import store
+from productionize.client import client
+from productionize.product import read_requirements, lock_requirements
+from productionize.resources import parse_cpu, parse_memory
+
+# drivers the cluster can run on and the tools they need
+DRIVERS = {'virtualbox': {'name': 'VirtualBox', 'component': 'virtualbox'},
+           'docker': {'name': 'Docker', 'component': 'docker'},
+           'hyperkit': {'name': 'HyperKit', 'component': 'hyperkit', 'probe': 'hyperkit -v',
+                        'install': 'brew install hyperkit', 'uninstall': 'brew uninstall hyperkit --force'},
+           'podman': {'name': 'Podman', 'component': 'podman', 'probe': 'podman version',
+                      'install': 'brew install podman', 'uninstall': 'brew uninstall podman --force'},
+           'qemu': {'name': 'QEMU', 'component': 'qemu', 'probe': 'qemu-system-x86_64 --version',
+                    'install': 'brew install qemu', 'uninstall': 'brew uninstall qemu --force'}}
+
+# minimum resources minikube needs
+MIN_CPUS = 2
+MIN_MEMORY = 2048 * 1024 ** 2
+
+# resources requested by the Kubernetes system pods
+SYSTEM_CPUS = 0.75
+SYSTEM_MEMORY = 1024 * 1024 ** 2
+
+# resources assumed for products that did not declare any
+DEFAULT_CPU_REQUEST = '250m'
+DEFAULT_MEMORY_REQUEST = '256Mi'
 
 # setup the class
 class workbench:
 
     # define the class object
-    def __init__(self):
+    def __init__(self, state_file = None, driver = None):
 
         # store the working directory
         self.wd = os.getcwd()
@@ -74,12 +126,28 @@ class workbench:
 
         # write to slot
         self.py_version = str(major_v + '.' + minor_v + '.' + micro_v)
+
+        # check if driver was given
+        if driver is None:
+
+            # use the docker driver on linux and virtualbox elsewhere
+            driver = 'docker' if self.platform.startswith('linux') else 'virtualbox'
+
+        # check if driver is known
+        if driver not in DRIVERS:
+
+            # raise Exception
+            raise Exception(str('driver arg should be one of: ' + ', '.join(sorted(DRIVERS))))
+
+        # store driver
+        self.driver = driver
         
         # store if components are installed
         self.vb_installed = None
         self.dk_installed = None
         self.kc_installed = None
         self.mk_installed = None
+        self.dr_installed = None
 
         # check if components were installed
         self.__check_installed()
@@ -89,16 +157,30 @@ class workbench:
         self.vb_prev_installed = self.vb_installed
         self.kc_prev_installed = self.kc_installed
         self.mk_prev_installed = self.mk_installed
+        self.dr_prev_installed = self.dr_installed
 
         # store component versions
         self.dk_version = None
         self.vb_version = None
         self.kc_version = None
         self.mk_version = None
+        self.dr_version = None
+
+        # open the persistent state store
+        self.store = store(path = state_file)
+
+        # store memory usage, as recorded by previous sessions
+        self.cpus_used = self.store.get_setting('cpus_used')
+        self.memory_used = self.store.get_setting('memory_used')
 
-        # store memory usage
-        self.cpus_used = None
-        self.memory_used = None
+        # store setup durations
+        self.setup_durations = {}
+
+        # store the inventory of projects and products
+        self.inventory = inventory()
+
+        # store the watch on idle products
+        self.idle_watch = None
 
         # welcome message
         welcome_message = """
@@ -130,7 +212,7 @@ class workbench:
                   Already on machine      Purpose
         ------------------------------------------------------
         Docker:         {dk_exists}        Containerization
-        VirtualBox:     {vb_exists}        Cluster Hypervisor
+        {dr_label:<16}{dr_exists}        Cluster Driver
         Kubectl:        {kc_exists}        Kubernetes CLI
         Minikube:       {mk_exists}        Local Kubernetes
 
@@ -142,7 +224,8 @@ class workbench:
                    python_version = self.py_version,
                    number_cores = os.cpu_count(),
                    dk_exists = self.dk_prev_installed,
-                   vb_exists = self.vb_prev_installed,
+                   dr_label = str(DRIVERS[self.driver]['name'] + ':'),
+                   dr_exists = self.dr_prev_installed,
                    kc_exists = self.kc_prev_installed,
                    mk_exists = self.mk_prev_installed)
 
@@ -150,89 +233,279 @@ class workbench:
         print(welcome_message)
 
         # check if brew exists
-        try:
-            
+        self.brew = shutil.which('brew') is not None
+
+        # check if brew can install the components
+        if self.brew:
+
             # update brew before starting
             subprocess.call('brew update'.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
 
-        # if it crashed
-        except:
+        # check if brew is needed, on linux the components can come from the package manager of the system
+        elif not self.platform.startswith('linux'):
 
             # raise Exception
             raise Exception('homebrew is not installed on your machine, please install it here: https://brew.sh')
 
-        # add project slot
-        self.current_projects = []
-        
-    # helper function to check if components are installed
-    def __check_installed(self):
+        # if brew is missing on linux
+        else:
+
+            # print message
+            print ('> Homebrew is not installed, setup() only checks the components, missing ones have to be installed with the package manager of your system')
+
+    # helper method to check if a component can be installed
+    def __check_brew(self, name):
 
         """
-        Helper method to check if components are already installed.
+        Helper method to check if Homebrew can install a missing component.
 
-        This function tests if the main components Docker, VirtualBox, Kubectl
-        and Minikube are already installed.
+        Parameters
+        ----------
+        name : string
+            String with the name of the component
         """
 
-        # try to call docker
-        try:
+        # check if brew exists
+        if not self.brew:
 
-            # call docker
-            subprocess.call('docker version'.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+            # raise Exception
+            raise Exception(str(name + ' is not installed and Homebrew is not available to install it, please install ' + name + ' with the package manager of your system and run setup() again.'))
 
-            # if it did not crash, it is installed
-            self.dk_installed = True
+    # slot with the active projects
+    @property
+    def current_projects(self):
 
-        # if it crashes
-        except:
+        """
+        Slot with all active projects on the workbench.
 
-            # it is not installed
-            self.dk_installed = False
-        
-        # try to call virtualbox
-        try:
+        The projects are read from the inventory, which is kept current by
+        watching the cluster.
+        """
 
-            # call virtualbox
-            subprocess.call('virtualbox --help'.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        # return projects from the inventory
+        return self.inventory.list_projects()
 
-            # if it did not crash, it is installed
-            self.vb_installed = True
+    # helper function to probe a single component
+    def __probe(self, command):
 
-        # if it crashes
-        except:
+        """
+        Helper method to probe if a single component is installed.
 
-            # it is not installed
-            self.vb_installed = False
+        This function calls the cli of a component and returns True if the
+        call went through. The binaries are resolved from the PATH, so stand-in
+        binaries can be used to test the setup.
+
+        Parameters
+        ----------
+        command : string
+            String with the command to call the component
+        """
 
-        # try to call kubectl
+        # try to call the component
         try:
 
-            # call kubectl
-            subprocess.call('kubectl config view'.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+            # call the component
+            subprocess.call(command.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
 
             # if it did not crash, it is installed
-            self.kc_installed = True
+            return True
 
         # if it crashes
         except:
 
             # it is not installed
-            self.kc_installed = False
+            return False
 
-        # try to call minikube
-        try:
+    # helper function to check if components are installed
+    def __check_installed(self):
 
-            # call minikube
-            subprocess.call('minikube version'.split(), stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        """
+        Helper method to check if components are already installed.
 
-            # if it did not crash, it is installed
-            self.mk_installed = True
+        This function tests if the main components Docker, Kubectl and
+        Minikube and the tool the driver needs are already installed. Tools
+        the driver does not need are not probed. The components are probed
+        concurrently, as the calls do not depend on each other.
+        """
 
-        # if it crashes
-        except:
+        # define the probe for each component
+        probes = {'dk': 'docker version',
+                  'kc': 'kubectl config view',
+                  'mk': 'minikube version'}
 
-            # it is not installed
-            self.mk_installed = False
+        # check if the driver needs virtualbox
+        if self.driver == 'virtualbox':
+
+            # probe virtualbox
+            probes['vb'] = 'virtualbox --help'
+
+        # check if the driver needs another tool
+        if 'probe' in DRIVERS[self.driver]:
+
+            # probe the tool of the driver
+            probes['dr'] = DRIVERS[self.driver]['probe']
+
+        # probe all components at once
+        with concurrent.futures.ThreadPoolExecutor(max_workers = len(probes)) as executor:
+
+            # submit the probes
+            futures = {key: executor.submit(self.__probe, command) for key, command in probes.items()}
+
+        # write results to self
+        self.dk_installed = futures['dk'].result()
+        self.kc_installed = futures['kc'].result()
+        self.mk_installed = futures['mk'].result()
+
+        # check if virtualbox was probed
+        if 'vb' in futures:
+
+            # write result to self
+            self.vb_installed = futures['vb'].result()
+
+        # check if the driver runs on virtualbox
+        if self.driver == 'virtualbox':
+
+            # the driver tool is virtualbox
+            self.dr_installed = self.vb_installed
+
+        # check if the driver runs on docker
+        elif self.driver == 'docker':
+
+            # the driver tool is docker
+            self.dr_installed = self.dk_installed
+
+        # if the driver needs another tool
+        else:
+
+            # write result to self
+            self.dr_installed = futures['dr'].result()
+
+    # helper function to run tasks along a dependency graph
+    def __run_graph(self, tasks, max_workers = None):
+
+        """
+        Helper method to run tasks along a dependency graph.
+
+        This function runs every task as soon as all the tasks it depends on
+        are finished. Independent tasks run concurrently. If a task fails, the
+        tasks depending on it are not started and the first exception is
+        raised once all running tasks are done.
+
+        Parameters
+        ----------
+        tasks : dict
+            Dict with the task name as key and a tuple of the callable and a
+            list of the names of the tasks it depends on as value
+        max_workers : int
+            Maximum number of tasks to run at the same time, the default None
+            runs all ready tasks at once
+
+        Returns
+        -------
+        dict
+            Dict with the task name as key and the duration in seconds as value
+        """
+
+        # check that all dependencies are known
+        for name, (task, depends_on) in tasks.items():
+
+            # loop over dependencies
+            for dependency in depends_on:
+
+                # check if dependency is known
+                if dependency not in tasks:
+
+                    # raise Exception
+                    raise Exception(str('The task ' + name + ' depends on the unknown task ' + dependency))
+
+        # store durations, finished and failed tasks
+        durations = {}
+        finished = set()
+        failed = {}
+
+        # store running tasks
+        running = {}
+
+        # helper to time a task
+        def timed(task):
+
+            # store start time
+            start = time.perf_counter()
+
+            # run task
+            task()
+
+            # return duration
+            return time.perf_counter() - start
+
+        # set number of workers
+        if max_workers is None:
+
+            # run all tasks at once if possible
+            max_workers = max(len(tasks), 1)
+
+        # open the pool
+        with concurrent.futures.ThreadPoolExecutor(max_workers = max_workers) as executor:
+
+            # loop until nothing is left to run
+            while True:
+
+                # submit all tasks whose dependencies are finished
+                if not failed:
+
+                    # loop over tasks
+                    for name, (task, depends_on) in tasks.items():
+
+                        # check if task is ready
+                        if name not in finished and name not in running.values() and all(d in finished for d in depends_on):
+
+                            # submit task
+                            running[executor.submit(timed, task)] = name
+
+                # check if anything is running
+                if not running:
+
+                    # stop loop
+                    break
+
+                # wait for the next task to finish
+                done, _ = concurrent.futures.wait(running, return_when = concurrent.futures.FIRST_COMPLETED)
+
+                # loop over finished tasks
+                for future in done:
+
+                    # get name of task
+                    name = running.pop(future)
+
+                    # try to collect the result
+                    try:
+
+                        # store duration
+                        durations[name] = future.result()
+
+                        # mark as finished
+                        finished.add(name)
+
+                    # handle exception
+                    except Exception as e:
+
+                        # store failure
+                        failed[name] = e
+
+        # check if something failed
+        if failed:
+
+            # raise the first exception
+            raise list(failed.values())[0]
+
+        # check if some tasks could never be started
+        if len(finished) < len(tasks):
+
+            # raise Exception
+            raise Exception('The tasks could not be run, as their dependencies are circular')
+
+        # return durations
+        return durations
 
     # main function to debug
     def setup_debug(self, issue = "docker"):
@@ -248,7 +521,8 @@ class workbench:
         ----------
         issue : string
             indicates what component should be investigated, the default is
-            "docker", alternatives are "virtualbox", "kubectl" and "minikube".
+            "docker", alternatives are "virtualbox", "kubectl", "minikube" and
+            the drivers "hyperkit", "podman" and "qemu".
         """
 
         # check if issue docker:
@@ -269,6 +543,12 @@ class workbench:
             # install kubectl
             subprocess.call('brew install kubectl'.split())
 
+        # check if issue is the tool of another driver
+        if issue in DRIVERS and 'install' in DRIVERS[issue]:
+
+            # install the tool
+            subprocess.call(DRIVERS[issue]['install'].split())
+
         # check if issue minikube
         if issue == 'minikube':
 
@@ -295,9 +575,18 @@ class workbench:
             dk_version = subprocess.check_output('docker version --format "{{.Server.Version}}"'.split())
             dk_version = '.'.join(re.findall(r'\d+', str(dk_version)))
 
+        # check if the driver runs without Docker
+        elif self.driver == 'podman':
+
+            # Docker is optional, the images are built by minikube
+            dk_version = 'not needed'
+
         # if it is not installed already
         else:
 
+            # check if it can be installed
+            self.__check_brew('Docker')
+
             # try to install docker
             try:
 
@@ -360,6 +649,9 @@ class workbench:
         # if it is not installed already
         else:
 
+            # check if it can be installed
+            self.__check_brew('VirtualBox')
+
             # try to install virtualbox
             try:
 
@@ -431,6 +723,9 @@ class workbench:
         # if it is not installed already
         else:
 
+            # check if it can be installed
+            self.__check_brew('kubectl')
+
             # try to install kubectl
             try:
 
@@ -483,6 +778,62 @@ class workbench:
         # write Kubectl version to self
         self.kc_version = kc_version
 
+    # helper function to install the tool of the driver
+    def __install_driver(self):
+
+        """
+        helper method to install the tool the driver needs.
+
+        This function downloads and sets up the tool of drivers other than
+        VirtualBox and Docker, e.g. HyperKit, Podman or QEMU.
+        """
+
+        # get the driver
+        driver = DRIVERS[self.driver]
+
+        # check if the tool is already installed
+        if not self.dr_prev_installed:
+
+            # check if it can be installed
+            self.__check_brew(driver['name'])
+
+            # try to install the tool
+            try:
+
+                # install the tool
+                dr_install_success = subprocess.call(driver['install'].split(), stdout=subprocess.DEVNULL)
+
+            # handle crash
+            except:
+
+                # set dr_install_success to failed
+                dr_install_success = 1
+
+            # check if it worked
+            if dr_install_success != 0:
+
+                # stop function
+                raise Exception(str(driver['name'] + ' could not be installed, run setup_debug(issue = "' + self.driver + '") to print detailed logs'))
+
+            # print message
+            print (str('> ' + driver['name'] + ' was successfully installed'))
+
+        # try to collect version
+        try:
+
+            # check the version
+            dr_version = subprocess.check_output(driver['probe'].split(), stderr=subprocess.STDOUT)
+            dr_version = '.'.join(re.findall(r'\d+', str(dr_version))[0:3])
+
+        # handle exception
+        except:
+
+            # stop function
+            raise Exception(str(driver['name'] + ' could not be installed, run setup_debug(issue = "' + self.driver + '") to print detailed logs'))
+
+        # write version to self
+        self.dr_version = dr_version
+
     # helper function to install minikube
     def __install_minikube(self):
 
@@ -503,6 +854,9 @@ class workbench:
         # if it is not installed already
         else:
 
+            # check if it can be installed
+            self.__check_brew('Minikube')
+
             # try to install minikube
             try:
 
@@ -559,37 +913,99 @@ class workbench:
         self.mk_version = mk_version
 
     # main function to setup the workbench
-    def setup(self, report = True):
+    def setup(self, report = True, max_workers = None):
 
         """
         main method to setup the workbench.
 
         This function downloads and sets up all components necessary for the
-        workbench. The components include Docker, VirtualBox, Kubectl and
-        Minikube.
+        workbench. The components include Docker, Kubectl, Minikube and the
+        tool the driver needs, e.g. VirtualBox. Only the tools the driver
+        needs are installed. Homebrew holds a global lock and updates itself,
+        so the components it installs are installed one after the other,
+        while the versions of the components already installed are read
+        concurrently. Minikube is only installed once Kubectl and the driver
+        are ready.
 
         Parameters
         ----------
         report : boolean
             if True a process report is printed with the progress on the
             installation
+        max_workers : int
+            maximum number of components to install at the same time, the
+            default None installs all independent components at once
         """
 
-        # install docker
-        self.__install_docker()
+        # get the component of the driver
+        component = DRIVERS[self.driver]['component']
+
+        # define the installers and the components they depend on
+        installers = {'docker': (self.__install_docker, []),
+                      'kubectl': (self.__install_kubectl, []),
+                      'minikube': (self.__install_minikube, ['kubectl', component])}
+
+        # check if the driver needs virtualbox
+        if self.driver == 'virtualbox':
+
+            # install virtualbox
+            installers['virtualbox'] = (self.__install_virtualbox, [])
+
+        # check if the driver needs another tool
+        elif component not in installers:
+
+            # install the tool of the driver
+            installers[component] = (self.__install_driver, [])
+
+        # store which components are installed already
+        installed = {'docker': self.dk_prev_installed or self.driver == 'podman',
+                     'virtualbox': self.vb_prev_installed,
+                     component: self.dr_prev_installed,
+                     'kubectl': self.kc_prev_installed,
+                     'minikube': self.mk_prev_installed}
+
+        # initialize the previous component brew installs
+        previous = None
 
-        # install virtualbox
-        self.__install_virtualbox()
+        # loop over the components in the order brew installs them
+        for name in dict.fromkeys(['docker', component, 'kubectl', 'minikube']):
 
-        # install kubectl
-        self.__install_kubectl()
+            # check if brew installs the component
+            if name in installers and not installed[name]:
 
-        # install minikube
-        self.__install_minikube()
+                # check if brew installs another component before
+                if previous is not None and previous not in installers[name][1]:
+
+                    # wait for it, so brew installs one component at a time
+                    installers[name] = (installers[name][0], installers[name][1] + [previous])
+
+                # store the component
+                previous = name
+
+        # store start time
+        setup_start = time.perf_counter()
+
+        # install all components along the dependency graph
+        self.setup_durations = self.__run_graph(tasks = installers, max_workers = max_workers)
+
+        # store the total duration
+        self.setup_durations['total'] = time.perf_counter() - setup_start
 
         # check if all components can be detected
         self.__check_installed()
 
+        # check if the driver runs on virtualbox
+        if self.driver == 'virtualbox':
+
+            # the driver version is the virtualbox version
+            self.dr_version = self.vb_version
+
+        # check if the driver runs on docker
+        elif self.driver == 'docker':
+
+            # the driver version is the docker version
+            self.dr_version = self.dk_version
+
         # check if the report should be printed
         if report:
 
@@ -602,12 +1018,14 @@ class workbench:
             This is an automatically generated report on the setup process of your local workbench. The set
             of components required for the workbench to work were processed as follows:
 
-                                Status                     Version
-            ---------------------------------------------------------------------
-            Docker:         installed == {dk_exists}        {dk_version}
-            VirtualBox:     installed == {vb_exists}        {vb_version}
-            Kubectl:        installed == {kc_exists}        {kc_version}
-            Minikube:       installed == {mk_exists}        {mk_version}
+                                Status                     Version         Duration
+            -------------------------------------------------------------------------------
+            Docker:         installed == {dk_exists}        {dk_version}        {dk_duration:.1f}s
+            {dr_label:<16}installed == {dr_exists}        {dr_version}        {dr_duration:.1f}s
+            Kubectl:        installed == {kc_exists}        {kc_version}        {kc_duration:.1f}s
+            Minikube:       installed == {mk_exists}        {mk_version}        {mk_duration:.1f}s
+
+            The setup took {total_duration:.1f}s in total.
 
             In case not all components could be installed, please consult the setup_debug() method. This
             method prints out the system logs when installing and configuring the components.
@@ -617,14 +1035,20 @@ class workbench:
             ! | or create an account at Dockerhub https://hub.docker.com. In case you have any questions,
             ! | please consult: https://www.docker.com/products/docker-desktop.
 
-            """.format(dk_exists = self.dk_version,
-                       vb_exists = self.vb_prev_installed,
-                       kc_exists = self.kc_prev_installed,
-                       mk_exists = self.mk_prev_installed,
+            """.format(dk_exists = self.dk_installed,
+                       dr_label = str(DRIVERS[self.driver]['name'] + ':'),
+                       dr_exists = self.dr_installed,
+                       kc_exists = self.kc_installed,
+                       mk_exists = self.mk_installed,
                        dk_version = self.dk_version,
-                       vb_version = self.vb_version,
+                       dr_version = self.dr_version,
                        kc_version = self.kc_version,
-                       mk_version = self.mk_version)
+                       mk_version = self.mk_version,
+                       dk_duration = self.setup_durations['docker'],
+                       dr_duration = self.setup_durations[component],
+                       kc_duration = self.setup_durations['kubectl'],
+                       mk_duration = self.setup_durations['minikube'],
+                       total_duration = self.setup_durations['total'])
 
             # print report
             print (report)
@@ -632,301 +1056,2157 @@ class workbench:
         # update status
         self.current_status = 'installed'
 
-    # main function to start cluster
-    def start_cluster(self, cpus = '2', memory = '2G'):
+    # helper method to get the memory of the host
+    def __get_host_memory(self):
 
         """
-        main method to start the workbench cluster
+        Helper method to get the physical memory of the host.
 
-        This function initiates and starts the local workbench cluster. The
-        cluster is a Kubernetes based composition of Docker, VirtualBox,
-        Kubectl and Minikube.
+        Returns
+        -------
+        int
+            Number of bytes or None if the memory can not be determined
+        """
+
+        # try to ask the os
+        try:
+
+            # return physical memory
+            return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+        # handle exception
+        except:
+
+            # try to ask sysctl on macOS
+            try:
+
+                # return physical memory
+                return int(subprocess.check_output('sysctl -n hw.memsize'.split(), stderr=subprocess.DEVNULL))
+
+            # handle exception
+            except:
+
+                # memory is unknown
+                return None
+
+    # helper method to size the cluster
+    def __autosize(self, headroom = 0.25, nodes = 1):
+
+        """
+        Helper method to size the cluster from the host and the products.
+
+        This function adds up the declared requests of all recorded products,
+        adds the overhead of the Kubernetes system pods and a buffer, and then
+        fits the result between the minimum minikube needs and what the host
+        can give without starving itself.
 
         Parameters
         ----------
-        cpus : string
-            indicates the number of cores the cluster can use as resources
-        memory : string
-            indicates the amount of memory the cluster can use
+        headroom : float
+            share of the host cores and memory that is always left to the host
+        nodes : int
+            number of nodes the allocation is split across
+
+        Returns
+        -------
+        dict
+            Dict with the chosen allocation and how it was derived
         """
 
-        # try to start minikube
-        try:
+        # get host resources
+        host_cpus = os.cpu_count() or MIN_CPUS
+        host_memory = self.__get_host_memory() or MIN_MEMORY
 
-            # build report
-            report = """
+        # add up the declared needs of the products
+        product_cpus = 0.0
+        product_memory = 0
 
-            Starting Report:
-            ----------------
+        # loop over recorded products
+        for recorded in self.store.list_products():
 
-            This is an automatically generated report on the starting process of your workbench cluster.
-            Your cluster will be started now. This steps involves starting up a Virtual Machine on your
-            machine and installing Minikube in this VM. Additionally, kubectl on your local machine is
-            configured to access the cluster directly.
+            # skip products that are not deployed to the workbench
+            if recorded['status'] == 'deleted' or recorded['local']:
 
-            Now follows the log trace of the starting procedure:
+                # go to next product
+                continue
 
-            """
+            # get replicas
+            replicas = int(recorded['settings'].get('replicas', 1))
 
-            # print report
-            print (report)
+            # add requests
+            product_cpus += replicas * parse_cpu(recorded['settings'].get('cpu_request') or DEFAULT_CPU_REQUEST)
+            product_memory += replicas * parse_memory(recorded['settings'].get('memory_request') or DEFAULT_MEMORY_REQUEST)
 
-            # start minikube
-            subprocess.call(str('minikube start --driver=virtualbox --cpus=' + cpus + ' --memory=' + memory).split())
+        # calculate what the cluster needs including a buffer
+        needed_cpus = (SYSTEM_CPUS + product_cpus) * 1.25
+        needed_memory = (SYSTEM_MEMORY + product_memory) * 1.25
 
-            # build report
-            report = """
+        # calculate what the host can give
+        available_cpus = max(int(host_cpus * (1 - headroom)), MIN_CPUS * nodes)
+        available_memory = max(int(host_memory * (1 - headroom)), MIN_MEMORY * nodes)
 
-            Your workbench is running on your machine now. as a next step, you can create a project on 
-            the workbench using the open_project() method.
+        # fit the needs per node into the bounds
+        cpus = min(max(int(math.ceil(needed_cpus / nodes)), MIN_CPUS), available_cpus // nodes)
+        memory = min(max(int(needed_memory / nodes), MIN_MEMORY), available_memory // nodes)
 
-            """
+        # check if the host is too small
+        if needed_cpus > available_cpus or needed_memory > available_memory:
 
-            # print report
-            print (report)
+            # print warning
+            warnings.warn('The recorded products need more resources than your machine can give to the workbench')
 
-            # update status
-            self.current_status = 'running'
+        # return allocation
+        return {'cpus': str(cpus),
+                'memory': str(str(memory // 1024 ** 2) + 'mb'),
+                'host_cpus': host_cpus,
+                'host_memory': host_memory,
+                'product_cpus': product_cpus,
+                'product_memory': product_memory,
+                'needed_cpus': needed_cpus,
+                'needed_memory': needed_memory}
 
-            # update resource usage
-            self.cpus_used = cpus
-            self.memory_used = memory
+    # helper method to list the products that run on the workbench
+    def __list_deployed_products(self):
 
-        # handle exception
-        except:
+        """
+        Helper method to list the recorded products deployed to the workbench.
 
-            # update status
-            self.current_status = 'crashed'
+        Returns
+        -------
+        list
+            List with the recorded products as dicts
+        """
 
-            # raise exception
-            raise Exception('I could not start the cluster')
+        # return products that are deployed to the workbench
+        return [recorded for recorded in self.store.list_products()
+                if recorded['status'] != 'deleted' and not recorded['local'] and recorded['image']]
 
-    # main function to open a new project
-    def open_project(self, name = None):
+    # helper method to snapshot the product images
+    def __snapshot_images(self):
 
         """
-        main method to open projects on the workbench cluster.
-
-        This function opens a new project on the workbench cluster. Technically
-        speaking, this function creates a new Kubernetes namespace.
+        Helper method to save the product images next to the store.
 
-        Parameters
-        ----------
-        name : string
-            indicates the project name, but should not have spaces or any
-            separators, others than "-"
+        This function saves the images of all deployed products that changed
+        since their last snapshot, so they can be loaded again even if the
+        cluster was deleted. The images are saved concurrently.
         """
 
-        # check if project name was given
-        if name is None:
+        # store the folder of the snapshots
+        snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'images')
+        os.makedirs(snapshot_dir, exist_ok=True)
 
-            # assign default project name
-            name = 'my-project'
-        
-        # if name was given
-        else:
+        # helper to snapshot one image
+        def snapshot(recorded):
 
-            # ensure the name complies with standards
-            name = name.replace('_', '-').replace('/', '-')
+            # build the path of the snapshot
+            path = os.path.join(snapshot_dir, str(recorded['project'] + '-' + recorded['name'] + '.tar'))
 
-        # try to create a new namespace
-        try:
+            # check if the runtime of minikube offers a docker daemon
+            if self.store.get_setting('docker_env', True):
 
-            # create new namespace
-            subprocess.call(str('kubectl create namespace ' + name).split(), stdout=subprocess.DEVNULL)
+                # save the image from the docker daemon of minikube
+                command = str('eval $(minikube -p minikube docker-env) && docker save -o ' + path + ' ' + recorded['image'])
 
-            # send message
-            print (str('> Successfully created project: ' + name))
+            # if it does not
+            else:
+
+                # save the image with minikube
+                command = str('minikube image save ' + recorded['image'] + ' ' + path)
+
+            # save the image
+            saved = subprocess.call(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+            # check if it worked
+            if saved == 0:
+
+                # record the snapshot
+                self.store.save_product(project = recorded['project'],
+                                        name = recorded['name'],
+                                        settings = {'snapshot_file': path,
+                                                    'snapshot_digest': recorded['image_digest']})
+
+        # get the products whose image changed since the last snapshot
+        products = [recorded for recorded in self.__list_deployed_products()
+                    if recorded['image_digest'] and recorded['settings'].get('snapshot_digest') != recorded['image_digest']]
+
+        # check if there is anything to save
+        if products:
+
+            # save the images concurrently
+            with concurrent.futures.ThreadPoolExecutor(max_workers = min(len(products), os.cpu_count() or 1)) as executor:
+
+                # wait for all snapshots
+                list(executor.map(snapshot, products))
+
+    # helper method to preload images into minikube
+    def __preload_images(self, products):
+
+        """
+        Helper method to preload the base and product images into minikube.
+
+        This function loads the Python base images of the products and the
+        snapshots of the product images that are missing in minikube. The
+        images are loaded concurrently.
+
+        Parameters
+        ----------
+        products : list
+            List with the recorded products as dicts
+
+        Returns
+        -------
+        int
+            Number of images loaded
+        """
+
+        # try to list the images in minikube
+        try:
+
+            # list images
+            present = subprocess.check_output('minikube image ls'.split(), stderr=subprocess.DEVNULL).decode('utf-8').split()
+
+        # handle exception
+        except:
+
+            # assume nothing is present
+            present = []
+
+        # helper to check if an image is present
+        def is_present(image):
+
+            # return if the image is present, with or without registry prefix
+            return any(line == image or line.endswith(str('/' + image)) for line in present)
+
+        # initialize the images to load
+        loads = set()
+
+        # loop over products
+        for recorded in products:
+
+            # try to read the base image from the Dockerfile
+            try:
+
+                # read in file
+                with open(recorded['dk_file_path']) as file:
+
+                    # loop over lines
+                    for line in file:
+
+                        # check if line is the base image or the default of the base image argument
+                        if line.strip().startswith('FROM ') or line.strip().startswith('ARG BASE_IMAGE='):
+
+                            # get base image
+                            base_image = line.strip().split()[1].split('=')[-1]
+
+                            # check if the base image is an argument
+                            if base_image.startswith('$'):
+
+                                # skip line
+                                continue
+
+                            # check if it has to be loaded
+                            if not is_present(base_image):
+
+                                # load base image
+                                loads.add(base_image)
+
+            # handle exception
+            except:
+
+                # the Dockerfile is gone, skip the base image
+                pass
+
+            # check if the product image has to be loaded
+            if not is_present(recorded['image']) and recorded['settings'].get('snapshot_file'):
+
+                # load snapshot
+                loads.add(recorded['settings']['snapshot_file'])
+
+        # helper to load one image
+        def load(image):
+
+            # load the image
+            return subprocess.call(['minikube', 'image', 'load', image], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+
+        # check if there is anything to load
+        if not loads:
+
+            # nothing was loaded
+            return 0
+
+        # load the images concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers = min(len(loads), os.cpu_count() or 1)) as executor:
+
+            # wait for all loads
+            loaded = list(executor.map(load, sorted(loads)))
+
+        # return number of loaded images
+        return sum(loaded)
+
+    # helper method to restore the deployments
+    def __restore_deployments(self, products):
+
+        """
+        Helper method to restore all recorded projects and products.
+
+        This function applies the namespaces of all recorded projects and the
+        recorded manifests of all products with a single kubectl call. No
+        image is rebuilt.
+
+        Parameters
+        ----------
+        products : list
+            List with the recorded products as dicts
+
+        Returns
+        -------
+        int
+            Number of products restored
+        """
+
+        # add the namespaces of all projects
+        items = [{'apiVersion': 'v1', 'kind': 'Namespace', 'metadata': {'name': name}} for name in self.store.list_projects()]
+
+        # add the manifests of all products
+        restored = [recorded for recorded in products if recorded['manifest']]
+        items = items + [manifest for recorded in restored for manifest in recorded['manifest']]
+
+        # check if there is anything to restore
+        if not items:
+
+            # nothing was restored
+            return 0
+
+        # try to apply the manifests
+        try:
+
+            # apply all manifests at once
+            listing = json.dumps({'apiVersion': 'v1', 'kind': 'List', 'items': items})
+            subprocess.run('kubectl apply -f -'.split(), input=listing.encode('utf-8'), stdout=subprocess.DEVNULL, check=True)
+
+        # handle exception
+        except:
+
+            # raise Exception
+            raise Exception('I could not restore the projects and products on the workbench')
+
+        # return number of restored products
+        return len(restored)
+
+    # main function to start cluster
+    def start_cluster(self, cpus = '2', memory = '2G', headroom = 0.25, restore = False, nodes = 1):
+
+        """
+        main method to start the workbench cluster
+
+        This function initiates and starts the local workbench cluster. The
+        cluster is a Kubernetes based composition of Docker, Kubectl and
+        Minikube, running on the driver chosen for the workbench.
+
+        Parameters
+        ----------
+        cpus : string
+            indicates the number of cores the cluster can use as resources,
+            "auto" sizes the cluster from the host and the recorded products
+        memory : string
+            indicates the amount of memory the cluster can use, "auto" sizes
+            the cluster from the host and the recorded products
+        headroom : float
+            share of the host cores and memory that is left to the host when
+            sizing the cluster automatically
+        restore : boolean
+            if True all recorded projects and products are brought back from
+            their stored images and manifests, without rebuilding anything
+        nodes : int
+            number of nodes of the cluster, the cpus and memory are given to
+            each node
+        """
+
+        # check if the cluster should be sized automatically
+        if cpus == 'auto' or memory == 'auto':
+
+            # size the cluster
+            allocation = self.__autosize(headroom = headroom, nodes = int(nodes))
+
+            # check if cpus should be sized
+            if cpus == 'auto':
+
+                # use the sized cpus
+                cpus = allocation['cpus']
+
+            # check if memory should be sized
+            if memory == 'auto':
+
+                # use the sized memory
+                memory = allocation['memory']
+
+            # build report
+            report = """
+
+            Sizing Report:
+            --------------
+
+            This is an automatically generated report on the resources allocated to your workbench. The
+            allocation covers the requests of the recorded products and the Kubernetes system pods with
+            a buffer, while leaving {headroom:.0%} of your machine to the host.
+
+                                Cores           Memory
+            ---------------------------------------------------------------------
+            Host:               {host_cpus:<16}{host_memory:.0f}mb
+            Products:           {product_cpus:<16.2f}{product_memory:.0f}mb
+            Needed:             {needed_cpus:<16.2f}{needed_memory:.0f}mb
+            Allocated:          {cpus:<16}{memory}    per node on {nodes} node(s)
+
+            """.format(headroom = headroom,
+                       host_cpus = allocation['host_cpus'],
+                       host_memory = allocation['host_memory'] / 1024 ** 2,
+                       product_cpus = allocation['product_cpus'],
+                       product_memory = allocation['product_memory'] / 1024 ** 2,
+                       needed_cpus = allocation['needed_cpus'],
+                       needed_memory = allocation['needed_memory'] / 1024 ** 2,
+                       cpus = cpus,
+                       memory = memory,
+                       nodes = int(nodes))
+
+            # print report
+            print (report)
+
+        # try to start minikube
+        try:
+
+            # build report
+            report = """
+
+            Starting Report:
+            ----------------
+
+            This is an automatically generated report on the starting process of your workbench cluster.
+            Your cluster will be started now. This steps involves starting up a Virtual Machine on your
+            machine and installing Minikube in this VM. Additionally, kubectl on your local machine is
+            configured to access the cluster directly.
+
+            Now follows the log trace of the starting procedure:
+
+            """
+
+            # print report
+            print (report)
+
+            # start minikube
+            subprocess.call(str('minikube start --driver=' + self.driver + ' --cpus=' + cpus + ' --memory=' + memory + ' --nodes=' + str(int(nodes))).split())
+
+            # record the number of nodes, so products are built on all of them
+            self.store.set_setting('nodes', int(nodes))
+
+            # record if the runtime of minikube offers a docker daemon, else images are built and moved with minikube image
+            self.store.set_setting('docker_env', subprocess.call('minikube -p minikube docker-env'.split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0)
+
+            # check if the deployments should be restored
+            if restore:
+
+                # store start time
+                restore_start = time.perf_counter()
+
+                # get the recorded products
+                products = self.__list_deployed_products()
+
+                # preload the images
+                images_loaded = self.__preload_images(products = products)
+
+                # restore projects and products
+                products_restored = self.__restore_deployments(products = products)
+
+                # print message
+                print (str('> Restored ' + str(products_restored) + ' product(s) and loaded ' + str(images_loaded) +
+                           ' image(s) in ' + str(round(time.perf_counter() - restore_start, 1)) + 's'))
+
+            # build report
+            report = """
+
+            Your workbench is running on your machine now. as a next step, you can create a project on 
+            the workbench using the open_project() method.
+
+            """
+
+            # print report
+            print (report)
+
+            # update status
+            self.current_status = 'running'
+
+            # update resource usage
+            self.cpus_used = cpus
+            self.memory_used = memory
+
+            # record resource usage
+            self.store.set_setting('cpus_used', cpus)
+            self.store.set_setting('memory_used', memory)
+
+            # seed the inventory and start watching the cluster
+            self.__refresh_inventory()
+
+        # handle exception
+        except:
+
+            # update status
+            self.current_status = 'crashed'
+
+            # raise exception
+            raise Exception('I could not start the cluster')
+
+    # main function to open a new project
+    def open_project(self, name = None):
+
+        """
+        main method to open projects on the workbench cluster.
+
+        This function opens a new project on the workbench cluster. Technically
+        speaking, this function creates a new Kubernetes namespace.
+
+        Parameters
+        ----------
+        name : string
+            indicates the project name, but should not have spaces or any
+            separators, others than "-"
+        """
+
+        # check if project name was given
+        if name is None:
+
+            # assign default project name
+            name = 'my-project'
+        
+        # if name was given
+        else:
+
+            # ensure the name complies with standards
+            name = name.replace('_', '-').replace('/', '-')
+
+        # try to create a new namespace
+        try:
+
+            # create new namespace
+            subprocess.call(str('kubectl create namespace ' + name).split(), stdout=subprocess.DEVNULL)
+
+            # send message
+            print (str('> Successfully created project: ' + name))
+
+            # add to the inventory
+            self.inventory.add_project(name)
+
+            # record the project
+            self.store.save_project(name)
+        
+        # if it crashed
+        except:
+
+            # raise Exception
+            raise Exception('I could not create the new project')
+    
+    # main method to list all current projects
+    def list_projects(self):
+
+        """
+        main method to list all projects on the workbench cluster.
+
+        This function lists all projects that are currently on the workbench.
+        The projects are answered from the inventory, which is seeded by a
+        single listing and then kept current by watching the cluster.
+        """
+
+        # make sure the inventory is current
+        self.__refresh_inventory()
+
+        # return list with all projects on the workbench
+        return self.inventory.list_projects()
+
+    # helper method to read the resource usage
+    def __read_usage(self):
+
+        """
+        Helper method to read the resources the nodes and pods actually use.
+
+        The usage is read with kubectl top from the metrics-server, which
+        minikube offers as the addon metrics-server. It samples the usage
+        every few seconds.
+
+        Returns
+        -------
+        dict
+            Dict with the cpu in cores and the memory in bytes used by node
+            and by namespace, None if the metrics-server is not available
+        """
+
+        # try to read the usage
+        try:
+
+            # read the usage of the nodes and of all pods
+            node_lines = subprocess.check_output('kubectl top nodes --no-headers'.split(), stderr=subprocess.DEVNULL, text=True).splitlines()
+            pod_lines = subprocess.check_output('kubectl top pods --all-namespaces --no-headers'.split(), stderr=subprocess.DEVNULL, text=True).splitlines()
+
+        # if the metrics-server is not available
+        except:
+
+            # return None
+            return None
+
+        # initialize the usage
+        usage = {'nodes': {}, 'namespaces': {}}
+
+        # loop over the nodes, named by their first and followed by their cpu, share and memory
+        for line in node_lines:
+
+            # split line
+            fields = line.split()
+
+            # check if the node is measured, e.g. not <unknown> while it starts
+            if len(fields) >= 4 and fields[1] != '<unknown>':
+
+                # store usage
+                usage['nodes'][fields[0]] = {'cpu': parse_cpu(fields[1]), 'memory': parse_memory(fields[3])}
+
+        # loop over the pods, named by their namespace and name and followed by their cpu and memory
+        for line in pod_lines:
+
+            # split line
+            fields = line.split()
+
+            # check if the pod is measured
+            if len(fields) >= 4:
+
+                # add usage to the namespace
+                namespace = usage['namespaces'].setdefault(fields[0], {'cpu': 0.0, 'memory': 0})
+                namespace['cpu'] += parse_cpu(fields[2])
+                namespace['memory'] += parse_memory(fields[3])
+
+        # return usage
+        return usage
+
+    # helper method to list the cluster
+    def __list_cluster(self):
+
+        """
+        Helper method to list the cluster.
+
+        This function lists all namespaces, deployments, pods, services and
+        nodes of the cluster with a single kubectl call. The listing is used to seed the inventory
+        as well, unless the inventory is watching the cluster already, as the
+        watches are more recent than a listing that was taken before their
+        latest events.
+
+        Returns
+        -------
+        dict
+            Dict with the output of kubectl get -o json
+        """
+
+        # try to list the cluster
+        try:
+
+            # list namespaces, deployments, pods, services and nodes in one call
+            command = 'kubectl get namespaces,deployments,pods,services,nodes --all-namespaces -o json'
+            listing = json.loads(subprocess.check_output(command.split(), stderr=subprocess.DEVNULL))
+
+        # handle exception
+        except:
+
+            # raise Exception
+            raise Exception('I could not list the projects on the workbench, make sure the cluster is running')
+
+        # check if the inventory is watching
+        if not self.inventory.watching:
+
+            # seed the inventory with the listing
+            self.inventory.seed(listing)
+
+        # return listing
+        return listing
+
+    # helper method to keep the inventory current
+    def __refresh_inventory(self):
+
+        """
+        Helper method to make sure the inventory is current.
+
+        If the inventory is not watching the cluster yet, it is seeded with a
+        single listing and the watches are started. Afterwards all queries are
+        answered from memory.
+        """
+
+        # check if the inventory is watching
+        if not self.inventory.watching:
+
+            # seed the inventory
+            self.__list_cluster()
+
+            # start watching
+            self.inventory.start()
+
+    # helper method to get the state of the cluster
+    def __get_cluster_state(self):
+
+        """
+        Helper method to list the state of all projects and nodes on the cluster.
+
+        This function lists the cluster with a single call and groups the
+        items by project and by node. System namespaces are not considered to
+        be projects, but their pods count towards the utilization of the nodes.
+
+        Returns
+        -------
+        dict
+            Dict with the projects and the nodes. Projects hold the products,
+            services and requested resources, nodes hold the allocatable and
+            requested resources and the placement of the products.
+        """
+
+        # list the cluster
+        listing = self.__list_cluster()
+
+        # initialize the state
+        state = {}
+        nodes = {}
+
+        # helper to get a project
+        def get_project(name):
+
+            # add project if it is new
+            if name not in state:
+
+                # add empty project
+                state[name] = {'products': {}, 'services': [], 'cpu_requests': 0.0, 'memory_requests': 0}
+
+            # return project
+            return state[name]
+
+        # helper to get a node
+        def get_node(name):
+
+            # add node if it is new
+            if name not in nodes:
+
+                # add empty node
+                nodes[name] = {'cpu_allocatable': 0.0, 'memory_allocatable': 0, 'cpu_requests': 0.0,
+                               'memory_requests': 0, 'pods': 0, 'products': {}}
+
+            # return node
+            return nodes[name]
+
+        # loop over all items
+        for item in listing.get('items', []):
+
+            # get kind and metadata
+            kind = item.get('kind')
+            metadata = item.get('metadata', {})
+
+            # check if item is a node
+            if kind == 'Node':
+
+                # get allocatable resources
+                allocatable = item.get('status', {}).get('allocatable', {})
+
+                # add node
+                node = get_node(metadata.get('name'))
+                node['cpu_allocatable'] = parse_cpu(allocatable.get('cpu'))
+                node['memory_allocatable'] = parse_memory(allocatable.get('memory'))
+
+                # go to next item
+                continue
+
+            # check if item is a namespace
+            if kind == 'Namespace':
+
+                # check if namespace is a project
+                if metadata.get('name') not in SYSTEM_NAMESPACES:
+
+                    # add project
+                    get_project(metadata.get('name'))
+
+                # go to next item
+                continue
+
+            # initialize the requested resources
+            cpu_requests = 0.0
+            memory_requests = 0
+
+            # check if item is a running pod
+            if kind == 'Pod' and item.get('status', {}).get('phase') not in ['Succeeded', 'Failed']:
+
+                # loop over containers to sum up requested resources
+                for container in item.get('spec', {}).get('containers', []):
+
+                    # get requests
+                    requests = container.get('resources', {}).get('requests', {})
+
+                    # add requests
+                    cpu_requests += parse_cpu(requests.get('cpu'))
+                    memory_requests += parse_memory(requests.get('memory'))
+
+                # check if the pod is placed on a node
+                if item.get('spec', {}).get('nodeName'):
+
+                    # add requests to the node
+                    node = get_node(item['spec']['nodeName'])
+                    node['pods'] += 1
+                    node['cpu_requests'] += cpu_requests
+                    node['memory_requests'] += memory_requests
+
+            # skip items in system namespaces
+            if metadata.get('namespace') in SYSTEM_NAMESPACES:
+
+                # go to next item
+                continue
+
+            # get the project
+            project = get_project(metadata.get('namespace'))
+
+            # check if item is a pod, the pods pre-pulling an image are not products
+            if kind == 'Pod' and 'prepull' not in metadata.get('labels', {}):
+
+                # the product is named by the run label
+                product_name = metadata.get('labels', {}).get('run', metadata.get('name'))
+
+                # add the pod to the product
+                pods = project['products'].setdefault(product_name, [])
+                pods.append({'pod': metadata.get('name'),
+                             'phase': item.get('status', {}).get('phase'),
+                             'node': item.get('spec', {}).get('nodeName')})
+
+                # add requests to the project
+                project['cpu_requests'] += cpu_requests
+                project['memory_requests'] += memory_requests
+
+                # check if the pod is placed on a node
+                if item.get('spec', {}).get('nodeName'):
+
+                    # add the product to the placement of the node
+                    placement = get_node(item['spec']['nodeName'])['products']
+                    key = str(metadata.get('namespace') + '/' + product_name)
+                    placement[key] = placement.get(key, 0) + 1
+
+            # check if item is a deployment
+            elif kind == 'Deployment':
+
+                # a product scaled to zero has a deployment but no pods
+                project['products'].setdefault(metadata.get('name'), [])
+
+            # check if item is a service
+            elif kind == 'Service':
+
+                # add service
+                project['services'].append(metadata.get('name'))
+
+        # return state
+        return {'projects': state, 'nodes': nodes}
+
+    # main method to list all products in project
+    def list_products(self, project):
+
+        """
+        main method to list all products in a projec.
+
+        This function lists all products that are currently deployed in a
+        project on the workbench.
+
+        Parameters
+        ----------
+        project : string
+            String that gives the name of the project, for which products should be listed
+
+        Returns
+        -------
+        list
+            List with the names of the products in the project
+        """
+
+        # make sure the inventory is current
+        self.__refresh_inventory()
+
+        # get products from the inventory
+        products = self.inventory.list_products(project)
+
+        # check if there are products
+        if not products:
+
+            # print message
+            print (str('It seems that there are no products deployed for your project: ' + project))
+
+        # return product list
+        return products
+
+    # main method to check if a product exists
+    def has_product(self, project, product):
+
+        """
+        main method to check if a product is deployed in a project.
+
+        This function answers from the inventory, so it does not call the
+        cluster once the inventory is watching.
+
+        Parameters
+        ----------
+        project : string
+            String that gives the name of the project
+        product : string
+            String that gives the name of the product
+        """
+
+        # make sure the inventory is current
+        self.__refresh_inventory()
+
+        # return if the product exists
+        return self.inventory.has_product(project = project, product = product)
+
+    # main method to delete a project
+    def delete_project(self, name = None):
+
+        """
+        main method to delete projects on the workbench cluster.
+
+        This function deletes a project on the workbench cluster. Technically
+        speaking, this function deletes a Kubernetes namespace. To do so,
+        the methods requires a project name
+
+        Parameters
+        ----------
+        name : string
+            indicates the project name, but should not have spaces or any
+            separators, others than "-"
+        """
+
+        # check if name was given
+        if name is None:
+
+            # break function
+            raise Exception('You need to provide a name for the project you want to delete')
+        
+        # if name was provided
+        else:
+
+            # try to delete the project
+            try:
+
+                # delete project    
+                subprocess.call(str('kubectl delete namespaces ' + name).split(), stdout=subprocess.DEVNULL)
+
+                # print message
+                print (str('> Successfully deleted project: ' + name))
+
+            # handle exception
+            except:
+
+                # raise Exception
+                raise Exception('I could not delete the project')
+
+            # delete project out of the inventory
+            self.inventory.remove_project(name)
+
+            # delete project and its products out of the store
+            self.store.delete_project(name)
+
+    # main function to give status report on cluster
+    def inspect(self, report = True):
+
+        """
+        main method to build a status report on cluster.
+
+        This function builds a report on the current workbench. It shows how
+        many products, projects and resources are bound. All projects are
+        inspected with a single call to the cluster. The resources are
+        reported as requested and, if the metrics-server addon of minikube is
+        enabled, as actually used.
+
+        Parameters
+        ----------
+        report : boolean
+            if True the report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the summary of the workbench
+        """
+
+        # check if all components are running
+        self.__check_installed()
+
+        # get the state of the cluster
+        state = self.__get_cluster_state()
+
+        # read the resources in use, if the metrics-server runs
+        usage = self.__read_usage()
+
+        # build the summary per project
+        projects = {}
+
+        # loop over projects
+        for project, content in state['projects'].items():
+
+            # add project to summary
+            projects[project] = {'product_count': len(content['products']),
+                                 'products': sorted(content['products']),
+                                 'pods': sum(len(pods) for pods in content['products'].values()),
+                                 'placement': {product: sorted(pod['node'] for pod in pods if pod['node'])
+                                               for product, pods in content['products'].items()},
+                                 'services': sorted(content['services']),
+                                 'cpu_requests': content['cpu_requests'],
+                                 'memory_requests': content['memory_requests'],
+                                 'cpu_usage': usage['namespaces'].get(project, {}).get('cpu') if usage else None,
+                                 'memory_usage': usage['namespaces'].get(project, {}).get('memory') if usage else None}
+
+        # build the summary per node
+        nodes = {}
+
+        # loop over nodes
+        for node, content in state['nodes'].items():
+
+            # add node to summary
+            nodes[node] = dict(content)
+
+            # calculate the utilization of the node
+            nodes[node]['cpu_utilization'] = content['cpu_requests'] / content['cpu_allocatable'] if content['cpu_allocatable'] else None
+            nodes[node]['memory_utilization'] = content['memory_requests'] / content['memory_allocatable'] if content['memory_allocatable'] else None
+
+            # get the resources the node uses
+            node_usage = usage['nodes'].get(node) if usage else None
+
+            # add the usage and its share of the allocatable resources
+            nodes[node]['cpu_usage'] = node_usage['cpu'] if node_usage else None
+            nodes[node]['memory_usage'] = node_usage['memory'] if node_usage else None
+            nodes[node]['cpu_usage_utilization'] = node_usage['cpu'] / content['cpu_allocatable'] if node_usage and content['cpu_allocatable'] else None
+            nodes[node]['memory_usage_utilization'] = node_usage['memory'] / content['memory_allocatable'] if node_usage and content['memory_allocatable'] else None
+
+        # build the summary
+        summary = {'status': self.current_status,
+                   'driver': self.driver,
+                   'components': {'docker': self.dk_installed,
+                                  DRIVERS[self.driver]['component']: self.dr_installed,
+                                  'kubectl': self.kc_installed,
+                                  'minikube': self.mk_installed},
+                   'cpus_used': self.cpus_used,
+                   'memory_used': self.memory_used,
+                   'usage_available': usage is not None,
+                   'project_count': len(projects),
+                   'product_count': sum(project['product_count'] for project in projects.values()),
+                   'projects': projects,
+                   'nodes': nodes}
+
+        # check if the report should be printed
+        if report:
+
+            # initialize the lines per project
+            project_lines = []
+
+            # loop over projects
+            for name, project in sorted(projects.items()):
+
+                # build line
+                line = '        {name:<20}{products:<12}{cpu:<12.2f}{memory:<16}{cpu_used:<12}{memory_used}'.format(name = name,
+                                                                                    products = project['product_count'],
+                                                                                    cpu = project['cpu_requests'],
+                                                                                    memory = '{:.0f}Mi'.format(project['memory_requests'] / 1024 ** 2),
+                                                                                    cpu_used = 'n/a' if project['cpu_usage'] is None else '{:.2f}'.format(project['cpu_usage']),
+                                                                                    memory_used = 'n/a' if project['memory_usage'] is None else '{:.0f}Mi'.format(project['memory_usage'] / 1024 ** 2))
+
+                # add line
+                project_lines.append(line)
+
+            # initialize the lines per node
+            node_lines = []
+
+            # loop over nodes
+            for name, node in sorted(nodes.items()):
+
+                # build line
+                line = '        {name:<20}{pods:<8}{cpu:<12}{memory:<14}{cpu_used:<12}{memory_used:<14}{products}'.format(name = name,
+                                                                                       pods = node['pods'],
+                                                                                       cpu = '{:.0%}'.format(node['cpu_utilization'] or 0),
+                                                                                       memory = '{:.0%}'.format(node['memory_utilization'] or 0),
+                                                                                       cpu_used = 'n/a' if node['cpu_usage_utilization'] is None else '{:.0%}'.format(node['cpu_usage_utilization']),
+                                                                                       memory_used = 'n/a' if node['memory_usage_utilization'] is None else '{:.0%}'.format(node['memory_usage_utilization']),
+                                                                                       products = ', '.join(str(product + ' x' + str(count)) for product, count in sorted(node['products'].items())))
+
+                # add line
+                node_lines.append(line)
+
+            # build report
+            report = """
+
+        Workbench Report:
+        -----------------
+
+        This is an automatically generated report on your workbench. Your
+        workbench consists of four main components:
+
+                              Status                     Version
+        ---------------------------------------------------------------------
+        Docker:         installed == {dk_exists}        {dk_version}
+        {dr_label:<16}installed == {dr_exists}        {dr_version}
+        Kubectl:        installed == {kc_exists}        {kc_version}
+        Minikube:       installed == {mk_exists}        {mk_version}
+
+        You are running this session with Python {python_version}. Your machine
+        has {number_cores} cores. In total you allocated the following resources to
+        the workbench:
+
+        Cores:      {cpus_used}
+        Memory:     {memory_used}
+
+        Your workbench is currently hosting {product_counter} product(s) in 
+        {project_counter} project(s):
+
+        Project             Products    CPU req.    Memory req.     CPU used    Memory used
+        ---------------------------------------------------------------------------------------
+{project_lines}
+
+        The products are placed on {node_counter} node(s) as follows:
+
+        Node                Pods    CPU req.    Memory req.   CPU used    Memory used   Products
+        ---------------------------------------------------------------------------------------------
+{node_lines}
+{usage_note}
+
+        """.format(python_version = self.py_version,
+                   number_cores = os.cpu_count(),
+                   dk_exists = self.dk_installed,
+                   dr_label = str(DRIVERS[self.driver]['name'] + ':'),
+                   dr_exists = self.dr_installed,
+                   kc_exists = self.kc_installed,
+                   mk_exists = self.mk_installed,
+                   dk_version = self.dk_version,
+                   dr_version = self.dr_version,
+                   kc_version = self.kc_version,
+                   mk_version = self.mk_version,
+                   cpus_used = self.cpus_used,
+                   memory_used = self.memory_used,
+                   project_counter = summary['project_count'],
+                   product_counter = summary['product_count'],
+                   project_lines = '\n'.join(project_lines),
+                   node_counter = len(nodes),
+                   node_lines = '\n'.join(node_lines),
+                   usage_note = '' if usage is not None else str('\n        The resources in use are only known with the metrics-server,'
+                                                                 + '\n        enable it with: minikube addons enable metrics-server\n'))
+
+            # print report
+            print (report)
+
+        # return the summary
+        return summary
+
+    # main method to export a project
+    def export_project(self, name, path, compress = True, report = True):
+
+        """
+        Main method to export a project with all its products into one bundle.
+
+        The bundle is a tar archive holding the records and manifests of the
+        products and their images. All images are saved with a single docker
+        save, so layers the images share, e.g. a shared base image, are stored
+        once. The images are streamed from docker into the archive without
+        being written to disk in between. import_project() loads the bundle on
+        another workbench.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the project
+        path : string
+            String with the path of the bundle, e.g. "my-project.tar.gz"
+        compress : boolean
+            If True, the bundle is compressed with gzip
+        report : boolean
+            If True a report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the number of products, images and distinct layers and
+            blobs, the size of the bundle in bytes and the duration in seconds
+        """
+
+        # get the products of the project deployed to the workbench
+        products = [recorded for recorded in self.__list_deployed_products() if recorded['project'] == name]
+
+        # check if there are any
+        if not products:
+
+            # raise Exception
+            raise Exception(str('The project ' + name + ' has no products deployed to the workbench.'))
+
+        # check if the runtime of minikube offers a docker daemon
+        if not self.store.get_setting('docker_env', True):
+
+            # raise Exception
+            raise Exception('export_project() saves the images with their shared layers from the docker daemon of minikube, which the runtime of this workbench does not offer.')
+
+        # store start time
+        start = time.perf_counter()
+
+        # get the images, each one only once
+        images = sorted(set(recorded['image'] for recorded in products))
+
+        # describe the bundle
+        bundle = {'project': name,
+                  'created_at': time.time(),
+                  'images': images,
+                  'products': [{'name': recorded['name'],
+                                'image': recorded['image'],
+                                'image_digest': recorded['image_digest'],
+                                'port': recorded['port'],
+                                'settings': {key: value for key, value in recorded['settings'].items()
+                                             if key not in ['base_url', 'snapshot_file', 'snapshot_digest', 'packed_in']}}
+                               for recorded in products]}
+
+        # helper to add a file from bytes
+        def add_bytes(archive, member_name, data):
+
+            # describe the file
+            info = tarfile.TarInfo(member_name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+
+            # add the file
+            archive.addfile(info, io.BytesIO(data))
+
+        # initialize the number of blobs
+        blobs = 0
+
+        # open the bundle as a stream
+        with tarfile.open(path, 'w|gz' if compress else 'w|') as archive:
+
+            # add the description first, so an import knows the bundle before the images
+            add_bytes(archive, 'bundle.json', json.dumps(bundle, indent=2).encode('utf-8'))
+
+            # loop over products
+            for recorded in products:
+
+                # add the manifests
+                add_bytes(archive, str('manifests/' + recorded['name'] + '.json'), json.dumps(recorded['manifest'] or [], indent=2).encode('utf-8'))
+
+            # save all images at once from the docker daemon of minikube, which stores shared layers once
+            command = str('eval $(minikube -p minikube docker-env) && docker save ' + ' '.join(images))
+            saver = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+            # try to stream the images into the bundle
+            try:
+
+                # loop over the files of the saved images as they arrive
+                with tarfile.open(fileobj=saver.stdout, mode='r|') as saved:
+
+                    # loop over files
+                    for member in saved:
+
+                        # count the layers and blobs, which docker stores once per digest
+                        if member.isfile() and (member.name.endswith('layer.tar') or str('/' + member.name).count('/blobs/')):
+
+                            # count blob
+                            blobs += 1
+
+                        # move the file under images/
+                        content = saved.extractfile(member) if member.isfile() else None
+                        member.name = str('images/' + member.name)
+
+                        # check if the file links to another one
+                        if member.islnk():
+
+                            # move the link target as well
+                            member.linkname = str('images/' + member.linkname)
+
+                        # add file
+                        archive.addfile(member, content)
+
+            # clean up
+            finally:
+
+                # wait for docker
+                saver.stdout.close()
+                saved_code = saver.wait()
+
+            # check if the images were saved
+            if saved_code != 0:
+
+                # raise Exception
+                raise Exception(str('I could not save the images of the project ' + name + ', make sure the workbench is running.'))
+
+        # build the summary
+        summary = {'products': len(products),
+                   'images': len(images),
+                   'blobs': blobs,
+                   'size': os.path.getsize(path),
+                   'duration': time.perf_counter() - start}
+
+        # check if a report should be printed
+        if report:
+
+            # build report
+            report = """
+
+            Export Report:
+            --------------
+
+            This is an automatically generated report on the export of your
+            project. Load it on another workbench with import_project().
+
+            Project:    {project}
+            Bundle:     {path}
+            Products:   {products}
+            Images:     {images}
+            Blobs:      {blobs}
+            Size:       {size:.1f} MB
+            Duration:   {duration:.1f} s
+            """.format(project = name,
+                       path = path,
+                       products = summary['products'],
+                       images = summary['images'],
+                       blobs = summary['blobs'],
+                       size = summary['size'] / 1024 ** 2,
+                       duration = summary['duration'])
+
+            # print report
+            print (report)
+
+        # return summary
+        return summary
+
+    # main method to import a project
+    def import_project(self, path, name = None, report = True):
+
+        """
+        Main method to import a project bundle written by export_project().
+
+        The bundle is read as a stream. While the images are streamed into
+        the docker daemon of minikube, the project is created and the
+        manifests of the products are applied in parallel, so the products
+        start as soon as their images are loaded. The node ports of the
+        services are left to the cluster, so the project can be imported next
+        to the exported one. If the import fails, the applied manifests are
+        deleted again.
+
+        Parameters
+        ----------
+        path : string
+            String with the path of the bundle
+        name : string
+            String with the name of the project, default is the name of the
+            exported project
+        report : boolean
+            If True a report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the number of products and images and the duration in
+            seconds
+        """
+
+        # store start time
+        start = time.perf_counter()
+
+        # initialize the bundle, the manifests, the applied items and the workers
+        bundle = None
+        manifests = {}
+        applied = {}
+        loader = None
+        applier = None
+        target = None
+
+        # use a single executor for the parallel steps
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers = 2)
+
+        # helper to move a manifest into the project
+        def move(item, project):
+
+            # move the manifest into the namespace of the project
+            item = dict(item, metadata = dict(item['metadata'], namespace = project))
+
+            # check if it is a service
+            if item.get('kind') == 'Service':
+
+                # leave the node ports to the cluster, the exported ones may be taken
+                item['spec'] = dict(item.get('spec', {}), ports = [{key: value for key, value in port.items() if key != 'nodePort'}
+                                                                   for port in item.get('spec', {}).get('ports', [])])
+
+            # return manifest
+            return item
+
+        # helper to apply the project and its manifests
+        def apply(project, items):
+
+            # check if the namespace exists already
+            applied['namespace'] = subprocess.call(['kubectl', 'get', 'namespace', project], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0
+
+            # store the items, so they can be deleted if the import fails
+            applied['items'] = items
+
+            # create the namespace and apply the manifests at once
+            listing = json.dumps({'apiVersion': 'v1', 'kind': 'List',
+                                  'items': [{'apiVersion': 'v1', 'kind': 'Namespace', 'metadata': {'name': project}}] + items})
+            subprocess.run('kubectl apply -f -'.split(), input=listing.encode('utf-8'), stdout=subprocess.DEVNULL, check=True)
+
+        # try to read the bundle
+        try:
+
+            # open the bundle as a stream, compressed or not
+            with tarfile.open(path, 'r|*') as archive:
+
+                # initialize the stream of the images
+                images = None
+
+                # loop over the files of the bundle
+                for member in archive:
+
+                    # check if it is the description
+                    if member.name == 'bundle.json':
+
+                        # read description
+                        bundle = json.loads(archive.extractfile(member).read())
+
+                        # get the name of the project
+                        project = name or bundle['project']
+
+                    # check if it is a manifest
+                    elif member.name.startswith('manifests/'):
+
+                        # read manifests
+                        manifests[member.name[len('manifests/'):-len('.json')]] = json.loads(archive.extractfile(member).read())
+
+                    # check if it is a file of the images
+                    elif member.name.startswith('images/'):
+
+                        # check if the images are not loaded yet
+                        if images is None:
+
+                            # check if the description was read
+                            if bundle is None:
+
+                                # raise Exception
+                                raise Exception(str('The bundle ' + path + ' was not written by export_project().'))
+
+                            # move the manifests into the project
+                            items = [move(item, project) for product_manifests in manifests.values() for item in product_manifests]
+
+                            # apply the project and the manifests in parallel to the loading
+                            applier = executor.submit(apply, project, items)
+
+                            # check if the workbench runs several nodes or offers no docker daemon
+                            if self.store.get_setting('nodes', 1) > 1 or not self.store.get_setting('docker_env', True):
+
+                                # collect the images in a file, which minikube loads on all nodes
+                                target = tempfile.NamedTemporaryFile(suffix='.tar', delete=False)
+
+                            # if it runs one node
+                            else:
+
+                                # stream the images into the docker daemon of minikube
+                                loader = subprocess.Popen('eval $(minikube -p minikube docker-env) && docker load', shell=True,
+                                                          stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                target = loader.stdin
+
+                            # open the stream of the images
+                            images = tarfile.open(fileobj=target, mode='w|')
+
+                        # move the file back out of images/
+                        content = archive.extractfile(member) if member.isfile() else None
+                        member.name = member.name[len('images/'):]
+
+                        # check if the file links to another one
+                        if member.islnk():
+
+                            # move the link target as well
+                            member.linkname = member.linkname[len('images/'):]
+
+                        # add file
+                        images.addfile(member, content)
+
+                # check if there were images
+                if images is None:
+
+                    # raise Exception
+                    raise Exception(str('The bundle ' + path + ' holds no images.'))
+
+                # close the stream of the images
+                images.close()
+                target.close()
+
+            # check if the images were streamed into docker
+            if loader is not None:
+
+                # check if docker loaded them
+                if loader.wait() != 0:
+
+                    # raise Exception
+                    raise Exception('docker could not load the images')
+
+            # if they were collected in a file
+            else:
+
+                # load the images on all nodes
+                subprocess.run(['minikube', 'image', 'load', target.name], stdout=subprocess.DEVNULL, check=True)
+
+            # wait for the manifests
+            applier.result()
+
+        # handle exception
+        except Exception as error:
+
+            # wait for the manifests, so they are not applied after the clean up
+            executor.shutdown(wait=True)
+
+            # check if the manifests were applied
+            if applied.get('items'):
+
+                # delete the applied manifests
+                listing = json.dumps({'apiVersion': 'v1', 'kind': 'List', 'items': applied['items']})
+                subprocess.run('kubectl delete --ignore-not-found -f -'.split(), input=listing.encode('utf-8'),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+            # check if the namespace was created by the import
+            if applied.get('namespace'):
+
+                # delete the namespace
+                subprocess.call(['kubectl', 'delete', 'namespace', project, '--ignore-not-found'],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+            # raise Exception
+            raise Exception(str('I could not import the bundle ' + path + ': ' + str(error)))
+
+        # clean up
+        finally:
+
+            # stop the executor
+            executor.shutdown(wait=True)
+
+            # check if the images were collected in a file
+            if target is not None and loader is None:
+
+                # close and remove the file
+                target.close()
+                os.remove(target.name)
+
+        # record the project
+        self.store.save_project(project)
+        self.inventory.add_project(project)
+
+        # loop over products
+        for item in bundle['products']:
+
+            # record the product, so product() reattaches to it
+            self.store.save_product(project = project,
+                                    name = item['name'],
+                                    port = item['port'],
+                                    image = item['image'],
+                                    image_digest = item['image_digest'],
+                                    local = 0,
+                                    status = 'deployed and healthy',
+                                    manifest = [move(manifest, project) for manifest in manifests.get(item['name'], [])],
+                                    settings = item['settings'])
+
+        # build the summary
+        summary = {'products': len(bundle['products']),
+                   'images': len(bundle['images']),
+                   'duration': time.perf_counter() - start}
+
+        # check if a report should be printed
+        if report:
+
+            # build report
+            report = """
+
+            Import Report:
+            --------------
+
+            This is an automatically generated report on the import of your
+            project. The products start as soon as Kubernetes finds their
+            images.
+
+            Project:    {project}
+            Bundle:     {path}
+            Products:   {products}
+            Images:     {images}
+            Duration:   {duration:.1f} s
+            """.format(project = project,
+                       path = path,
+                       products = summary['products'],
+                       images = summary['images'],
+                       duration = summary['duration'])
+
+            # print report
+            print (report)
+
+        # return summary
+        return summary
+
+    # main method to build a shared base image
+    def build_base_image(self, libraries, py_version = None, local = False):
+
+        """
+        Main method to build a base image the products can share.
+
+        The base image holds Python and a set of libraries. It is built once
+        per Python version and set of libraries, and every product built
+        afterwards whose requirements contain all of its libraries is built
+        from it, so the libraries are installed only once and the layer is
+        shared by all images. The libraries are resolved into a hash-pinned
+        lock like the requirements of a product, and a locked product only
+        uses the base image if its lock pins the same distributions. Lines of
+        a lock are installed as they are.
+
+        Parameters
+        ----------
+        libraries : list
+            List with the requirement lines to install, e.g. "numpy==1.26.4",
+            or the lines of a lock
+        py_version : string
+            String with the Python version, default is the version in use
+        local : boolean
+            If True, the base image is built locally instead of on the workbench
+
+        Returns
+        -------
+        string
+            String with the name of the base image
+        """
 
-            # add to list of projects
-            self.current_projects.append(name)
-        
-        # if it crashed
+        # check if the Python version was given
+        if py_version is None:
+
+            # use the version in use
+            py_version = self.py_version
+
+        # sort the libraries, so their order does not matter
+        libraries = sorted(set(libraries))
+
+        # name the base image after the Python version and the libraries
+        image = str('productionize-base:' + py_version + '-' + hashlib.sha256('\n'.join(libraries).encode('utf-8')).hexdigest()[:12])
+
+        # store the folder of the build context next to the store
+        context = os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'base', image.split(':')[1])
+        os.makedirs(context, exist_ok=True)
+
+        # write the requirements
+        with open(os.path.join(context, 'requirements.txt'), 'w') as file:
+            file.write('\n'.join(libraries) + '\n')
+
+        # check if the libraries are the lines of a lock
+        if all('--hash=' in line for line in libraries):
+
+            # use them as the lock
+            lock = libraries
+
+        # if they have to be resolved
+        else:
+
+            # resolve the libraries through the locks of the products
+            cache_file = lock_requirements(str('\n'.join(libraries) + '\n').encode('utf-8'), py_version,
+                                           folder = os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'locks'),
+                                           docker_env = self.store.get_setting('docker_env', True))
+
+            # read the lock, if the libraries could be locked
+            lock = list(read_requirements(cache_file).values()) if cache_file is not None else None
+
+        # check if the libraries are locked
+        if lock is not None:
+
+            # write the lock
+            with open(os.path.join(context, 'requirements.lock'), 'w') as file:
+                file.write('\n'.join(lock) + '\n')
+
+            # install the pinned distributions without resolving dependencies
+            install = 'COPY requirements.lock /base/requirements.lock\nRUN python -m pip install --no-deps --require-hashes -r /base/requirements.lock\n'
+
+        # if they are installed unlocked
+        else:
+
+            # install the requirements
+            install = 'COPY requirements.txt /base/requirements.txt\nRUN python -m pip install -r /base/requirements.txt\n'
+
+        # write the Dockerfile
+        with open(os.path.join(context, 'Dockerfile'), 'w') as file:
+            file.write(str('FROM python:' + py_version + '\n' + install))
+
+        # check if the workbench runs several nodes or offers no docker daemon
+        if not local and (self.store.get_setting('nodes', 1) > 1 or not self.store.get_setting('docker_env', True)):
+
+            # build image with minikube, on all nodes
+            command = str('minikube image build' + (' --all' if self.store.get_setting('nodes', 1) > 1 else '') + ' -t ' + image + ' ' + context)
+
+        # check if the image is built on the workbench
+        elif not local:
+
+            # build image with the docker daemon of minikube
+            command = str('eval $(minikube -p minikube docker-env) && docker build -t ' + image + ' ' + context)
+
+        # if the image is built locally
+        else:
+
+            # build image
+            command = str('docker build -t ' + image + ' ' + context)
+
+        # print message
+        print (str('> Building the base image ' + image + ' with ' + str(len(libraries)) + ' libraries'))
+
+        # try to build the image
+        try:
+
+            # build the image with BuildKit
+            subprocess.run(command, shell=True, check=True, env=dict(os.environ, DOCKER_BUILDKIT='1'))
+
+        # handle exception
         except:
 
             # raise Exception
-            raise Exception('I could not create the new project')
-    
-    # main method to list all current projects
-    def list_projects(self):
-
-        """
-        main method to list all projects on the workbench cluster.
+            raise Exception(str('I could not build the base image ' + image + ', make sure the libraries can be installed with pip.'))
 
-        This function lists all projects that are currently on the workbench.
-        """
+        # record the base image
+        base_images = self.store.get_setting('base_images', {})
+        base_images[image] = {'image': image, 'py_version': py_version, 'libraries': libraries, 'lock': lock}
+        self.store.set_setting('base_images', base_images)
 
-        # print list with all projects on the workbench
-        return self.current_projects
+        # return image
+        return image
 
-    # main method to list all products in project
-    def list_products(self, project):
+    # main method to build several products
+    def build_products(self, products, local = False, base = True, max_workers = None, report = True):
 
         """
-        main method to list all products in a projec.
+        Main method to build the images of several products concurrently.
 
-        This function lists all products that are currently deployed in a
-        project on the workbench.
+        The products are grouped by a requirement they share, and the
+        requirements all products of a group share are installed once into a
+        base image, which fits every product of the group. The images are
+        then built concurrently with BuildKit. deploy() skips the build of an
+        image that is up to date, so the products deploy faster afterwards.
 
         Parameters
         ----------
-        project : string
-            String that gives the name of the project, for which products should be listed
+        products : list
+            List with the prepared products
+        local : boolean
+            If True, the images are built locally instead of on the workbench
+        base : boolean
+            If True, the shared requirements are installed into a base image
+        max_workers : int
+            Number of concurrent builds, default is the number of cores
+        report : boolean
+            If True a report is printed
+
+        Returns
+        -------
+        dict
+            Dict with the build duration per product in seconds
         """
 
-        # try to list all products
-        try:
+        # loop over products
+        for item in products:
 
-            # retrieve list of products
-            command = str("kubectl get pods --template '{{range .items}}{{.metadata.name}}{{\",\"}}{{end}}' -n " + project)
-            product_list = os.popen(command).read()
+            # check if product is prepared
+            if item.dk_file_path is None:
 
-            # return product list
-            return product_list
+                # raise Exception
+                raise Exception(str('The product ' + item.product_name + ' has to be prepared before it can be built.'))
 
-        # handle exception
-        except:
+        # get the Dockerfiles of the products
+        dockerfiles = collections.Counter(item.dk_file_path for item in products)
 
-            # print message
-            print (str('It seems that there are no products deployed for your project: ' + project))
+        # check if products share a Dockerfile
+        if max(dockerfiles.values()) > 1:
 
-    # main method to delete a project
-    def delete_project(self, name = None):
+            # raise Exception
+            raise Exception('Some products share the Dockerfile of their working directory, prepare each product in a folder of its own.')
+
+        # store start time
+        start = time.perf_counter()
+
+        # initialize the base images
+        base_images = []
+
+        # check if a base image should be built
+        if base:
+
+            # loop over the Python versions
+            for py_version in sorted(set(item.py_version for item in products)):
+
+                # get the requirement lines of the products of the version
+                remaining = {item.product_name: set(read_requirements(os.path.join(item.wd, item.requirements_file)).values())
+                             for item in products if item.py_version == py_version}
+
+                # get the products of the version with locked requirements
+                locked = {item.product_name: item for item in products if item.py_version == py_version and item.lock_file is not None}
+
+                # loop until no line is shared by two of the remaining products
+                while True:
+
+                    # count the requirement lines over the remaining products
+                    counts = collections.Counter(line for lines in remaining.values() for line in lines)
+
+                    # get the most common line
+                    shared = [line for line, count in counts.most_common(1) if count > 1]
+
+                    # check if a line is shared
+                    if not shared:
+
+                        # stop grouping
+                        break
+
+                    # group the products requiring the most common line
+                    group = [name for name, lines in remaining.items() if shared[0] in lines]
+
+                    # get the locks of the group, if all of its products are locked
+                    locks = [set(read_requirements(os.path.join(locked[name].wd, locked[name].lock_file)).values())
+                             for name in group] if all(name in locked for name in group) else None
+
+                    # build a base image from the lines or pinned distributions all products of the group share, so it fits every one of them
+                    libraries = sorted(set.intersection(*locks) if locks else set.intersection(*[remaining[name] for name in group]))
+
+                    # check if anything is shared
+                    if libraries:
+
+                        # build base image
+                        base_images.append(self.build_base_image(libraries = libraries, py_version = py_version, local = local))
+
+                    # loop over the group
+                    for name in group:
+
+                        # remove the product
+                        del remaining[name]
+
+        # initialize the profiles of the builds, images that are up to date have none
+        profiles = {}
+
+        # helper to build one product
+        def build(item):
+
+            # store start time
+            build_start = time.perf_counter()
+
+            # build the image, holding back the output and reports of concurrent builds
+            profiles[item.product_name] = item.build(local = local, quiet = True, report = False)
+
+            # return duration
+            return time.perf_counter() - build_start
+
+        # build the images concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers = max_workers or os.cpu_count() or 1) as executor:
+
+            # start the builds
+            futures = {item.product_name: executor.submit(build, item) for item in products}
+
+        # initialize the durations and failures
+        durations = {}
+        failures = []
+
+        # loop over builds
+        for name, future in futures.items():
+
+            # try to get the duration
+            try:
+
+                # store duration
+                durations[name] = future.result()
+
+            # handle exception
+            except Exception as error:
+
+                # store failure
+                failures.append(str(name + ': ' + str(error)))
+
+        # check if a report should be printed
+        if report:
+
+            # get the profiles of the images built
+            built = [profile for profile in profiles.values() if profile is not None]
+
+            # build report
+            report = """
+
+            Build Report:
+            -------------
+
+            This is an automatically generated report on the images of your
+            products, built concurrently from a shared base image.
+
+              Builds
+            -----------------------
+            Products:       {products}
+            Built:          {built}
+            Failed:         {failed}
+            Base images:    {base_images}
+            Duration:       {duration} s
+            Slowest build:  {slowest} s
+            Cached steps:   {cached} of {steps}
+            """.format(products = len(products),
+                       built = len(durations),
+                       failed = len(failures),
+                       base_images = ', '.join(base_images) or 'None',
+                       duration = round(time.perf_counter() - start, 1),
+                       slowest = round(max(durations.values()), 1) if durations else 0,
+                       cached = sum(profile['cached_steps'] for profile in built),
+                       steps = sum(profile['dockerfile_steps'] for profile in built))
+
+            # print report
+            print (report)
+
+        # check if builds failed
+        if failures:
+
+            # raise Exception
+            raise Exception(str('I could not build all products: ' + '; '.join(failures)))
+
+        # return durations
+        return durations
+
+    # helper method to check for idle products
+    def __check_idle(self, product_idle, cluster_idle, watch_start):
 
         """
-        main method to delete projects on the workbench cluster.
+        Helper method to scale idle products to zero and stop an idle cluster.
 
-        This function deletes a project on the workbench cluster. Technically
-        speaking, this function deletes a Kubernetes namespace. To do so,
-        the methods requires a project name
+        The activity of a product is read from the wrapper serving it, on a new
+        connection per reading, until every replica answered. Products that
+        can not be observed, as they are not served by the wrapper or some of
+        their replicas do not answer, are never scaled and count as active, so
+        the cluster is not stopped while they are deployed.
 
         Parameters
         ----------
-        name : string
-            indicates the project name, but should not have spaces or any
-            separators, others than "-"
+        product_idle : float
+            Seconds without requests after which a product is scaled to zero
+        cluster_idle : float
+            Seconds without requests to any product after which the cluster
+            is stopped, None to keep it running
+        watch_start : float
+            Time the watch started, which counts as activity
+
+        Returns
+        -------
+        boolean
+            True if the cluster was stopped
         """
 
-        # check if name was given
-        if name is None:
+        # initialize the latest activity
+        latest = watch_start
 
-            # break function
-            raise Exception('You need to provide a name for the project you want to delete')
-        
-        # if name was provided
-        else:
+        # loop over the products on the workbench
+        for recorded in self.__list_deployed_products():
 
-            # try to delete the project
-            try:
+            # get the settings
+            settings = recorded['settings']
 
-                # delete project    
-                subprocess.call(str('kubectl delete namespaces ' + name).split(), stdout=subprocess.DEVNULL)
+            # skip products served by a pack, the pack is observed instead
+            if settings.get('packed_in'):
+
+                # skip product
+                continue
+
+            # check if the product is scaled to zero
+            if recorded['status'] == 'scaled to zero':
+
+                # use the recorded activity
+                latest = max(latest, settings.get('last_activity') or watch_start)
+
+                # continue with the next product
+                continue
+
+            # get the url of the product
+            base_url = settings.get('base_url') or recorded['service_url']
+
+            # check if the product can be observed
+            if not settings.get('wrapped') or recorded['status'] != 'deployed and healthy' or not base_url:
+
+                # count the product as active
+                latest = time.time()
+
+                # continue with the next product
+                continue
+
+            # get the number of replicas
+            replicas = int(settings.get('replicas') or 1)
+
+            # initialize the readings by host of the replica
+            readings = {}
+
+            # read until every replica answered, each reading on a new connection
+            for _ in range(replicas * 4):
+
+                # try to read the activity of a replica
+                try:
+
+                    # read stats
+                    product_client = client(base_url, pool_size = 1, timeout = 10)
+                    status, headers, content, latency = product_client.request('GET', '/_stats')
+                    product_client.close()
+                    stats = json.loads(content)
+
+                # if the replica does not answer
+                except:
+
+                    # skip reading
+                    continue
+
+                # store stats
+                readings[stats['host']] = stats
+
+                # check if every replica answered
+                if len(readings) >= replicas:
+
+                    # stop reading
+                    break
+
+            # check if some replicas were not read
+            if len(readings) < replicas:
+
+                # count the product as active
+                latest = time.time()
+
+                # continue with the next product
+                continue
+
+            # get the idle time of the most recently called replica, on the clock of its container
+            idle = min(stats['time'] - stats['last_request'] for stats in readings.values())
+
+            # record the last activity on the local clock
+            last_activity = time.time() - idle
+            self.store.save_product(project = recorded['project'],
+                                    name = recorded['name'],
+                                    settings = {'last_activity': last_activity})
+
+            # check if the product is idle
+            if idle > product_idle and sum(stats['in_flight'] for stats in readings.values()) == 0:
+
+                # scale the product to zero
+                command = str('kubectl scale deployment/' + recorded['name'] + ' --replicas=0 -n ' + recorded['project'])
+                subprocess.call(command.split(), stdout=subprocess.DEVNULL)
+
+                # record the product
+                self.store.save_product(project = recorded['project'],
+                                        name = recorded['name'],
+                                        status = 'scaled to zero')
 
                 # print message
-                print (str('> Successfully deleted project: ' + name))
+                print (str('> Scaled ' + recorded['project'] + '/' + recorded['name'] + ' to zero after ' + str(int(idle)) + ' s without requests'))
 
-            # handle exception
-            except:
+            # update the latest activity
+            latest = max(latest, last_activity)
 
-                # raise Exception
-                raise Exception('I could not delete the project')
+        # check if the cluster is idle
+        if cluster_idle is not None and time.time() - latest > cluster_idle:
 
-            # try to delete project out of list
-            try:
+            # print message
+            print (str('> Stopping the cluster after ' + str(int(time.time() - latest)) + ' s without requests'))
 
-                # delete project out of list
-                self.current_projects.remove(name)
-            
-            # handle exception
-            except:
+            # stop cluster
+            self.stop_cluster()
 
-                # print warning
-                warnings.warn('I could not find the project in self.current_projects')
+            # return True
+            return True
 
-    # main function to give status report on cluster
-    def inspect(self):
+        # return False
+        return False
+
+    # main method to watch for idle products
+    def watch_idle(self, product_idle = 900, cluster_idle = None, interval = 60):
 
         """
-        main method to build a status report on cluster.
+        Main method to free the resources of idle products and an idle cluster.
 
-        This function builds a report on the current workbench. It shows how
-        many products, projects and resources are bound.
+        This function watches the activity of the products in the background.
+        Products without requests for product_idle seconds are scaled to zero
+        and woken by the next call through predict(). If cluster_idle is
+        given, the whole cluster is stopped once no product was called for
+        that long. The watch runs as long as this Python session.
+
+        Parameters
+        ----------
+        product_idle : float
+            Seconds without requests after which a product is scaled to zero
+        cluster_idle : float
+            Seconds without requests after which the cluster is stopped, None
+            to keep it running
+        interval : float
+            Seconds between two checks
         """
 
-        # check if all components are running
-        self.__check_installed()
+        # stop a previous watch
+        self.stop_watching_idle()
 
-        # calculate number of projects
-        project_counter = len(self.current_projects)
+        # store the event stopping the watch
+        stop = threading.Event()
+        self.idle_watch = stop
 
-        # initialize product counter
-        product_counter = 0
+        # store the start of the watch
+        watch_start = time.time()
 
-        # loop over all projects to count products
-        for project in self.current_projects:
+        # helper to run the watch
+        def watch():
 
-            # get the products deployed
-            products_in_project = self.list_products(project = project)
-            
-            # split in list and count length
-            product_counter = product_counter + len(products_in_project.split(','))
+            # loop until the watch is stopped
+            while not stop.wait(interval):
 
-            # return
-            return product_counter
+                # try to check the products
+                try:
 
-        # build report
-        report = """
+                    # check products and stop if the cluster was stopped
+                    if self.__check_idle(product_idle = product_idle, cluster_idle = cluster_idle, watch_start = watch_start):
 
-        Workbench Report:
-        -----------------
+                        # stop watch
+                        break
 
-        This is an automatically generated report on your workbench. Your
-        workbench consists of four main components:
+                # handle exception
+                except Exception as error:
 
-                              Status                     Version
-        ---------------------------------------------------------------------
-        Docker:         installed == {dk_exists}        {dk_version}
-        VirtualBox:     installed == {vb_exists}        {vb_version}
-        Kubectl:        installed == {kc_exists}        {kc_version}
-        Minikube:       installed == {mk_exists}        {mk_version}
+                    # print message
+                    print (str('> The idle watch failed, trying again: ' + str(error)))
 
-        You are running this session with Python {python_version}. Your machine
-        has {number_cores}. In total you allocated the following resources to
-        the workbench:
+        # start the watch in the background
+        threading.Thread(target=watch, daemon=True).start()
 
-        Cores:      {cpus_used}
-        Memory:     {memory_used}
+        # print message
+        print (str('> Watching for idle products every ' + str(interval) + ' s'))
 
-        Your workbench is currently hosting {product_counter} product in 
-        {project_counter} project(s).
+    # main method to stop watching for idle products
+    def stop_watching_idle(self):
 
-        """.format(operating_system = self.platform,
-                   python_version = self.py_version,
-                   number_cores = os.cpu_count(),
-                   dk_exists = self.dk_installed,
-                   vb_exists = self.vb_installed,
-                   kc_exists = self.kc_installed,
-                   mk_exists = self.mk_installed,
-                   cpus_used = self.cpus_used,
-                   memory_used = self.memory_used,
-                   project_counter = project_counter,
-                   product_counter = product_counter)
+        """
+        Main method to stop the watch on idle products.
+        """
 
-        # print report
-        print (report)
+        # check if there is a watch
+        if self.idle_watch is not None:
+
+            # stop watch
+            self.idle_watch.set()
+            self.idle_watch = None
 
     # main function to stop cluster
-    def stop_cluster(self):
+    def stop_cluster(self, snapshot = False):
 
         """
         main method to stop the workbench cluster.
 
-        This function stops the running workbench cluster.
+        This function stops the running workbench cluster. A stopped cluster
+        keeps its images, so start_cluster(restore = True) brings the products
+        back without saving them first.
+
+        Parameters
+        ----------
+        snapshot : boolean
+            if True the images of the deployed products that changed are saved
+            next to the store first, so they survive the cluster
         """
 
         # try to stop minikube
         try:
 
+            # check if the images should be saved
+            if snapshot:
+
+                # save the product images, so they can be restored
+                self.__snapshot_images()
+
+            # stop watching the cluster
+            self.inventory.stop()
+
             # stop cluster
             subprocess.call('minikube stop'.split(), stdout=subprocess.DEVNULL)
 
@@ -945,8 +3225,56 @@ class workbench:
             # raise exception
             raise Exception('I could not stop the cluster')
 
+    # main function to delete cluster
+    def delete_cluster(self, snapshot = True):
+
+        """
+        main method to delete the workbench cluster.
+
+        This function deletes the workbench cluster with all its images. The
+        images of the deployed products are saved next to the store first, so
+        start_cluster(restore = True) can bring the products back on a new
+        cluster.
+
+        Parameters
+        ----------
+        snapshot : boolean
+            if True the images of the deployed products that changed are saved
+            before the cluster is deleted
+        """
+
+        # try to delete minikube
+        try:
+
+            # check if the images should be saved
+            if snapshot:
+
+                # save the product images, so they can be restored
+                self.__snapshot_images()
+
+            # stop watching the cluster
+            self.inventory.stop()
+
+            # delete cluster
+            subprocess.run('minikube delete'.split(), stdout=subprocess.DEVNULL, check=True)
+
+            # update status
+            self.current_status = 'deleted'
+
+            # print message
+            print ('> Successfully deleted the cluster')
+
+        # handle exception
+        except:
+
+            # update status
+            self.current_status = 'not responding'
+
+            # raise exception
+            raise Exception('I could not delete the cluster')
+
     # main function to uninstall workbench
-    def uninstall(self, docker = None, kubectl = None, virtualbox = None, minikube = None, report = True):
+    def uninstall(self, docker = None, kubectl = None, virtualbox = None, minikube = None, driver = None, report = True):
 
         """
         main method to uninstall all components.
@@ -966,6 +3294,9 @@ class workbench:
             indicates if virtualbox should be removed from the machine
         minikube : boolean
             indicates if minikube should be removed from the machine
+        driver : boolean
+            indicates if the tool of the driver should be removed from the
+            machine, only used for drivers other than VirtualBox and Docker
         report : True
             if True a process report is printed with the progress on the
             installation
@@ -1004,8 +3335,8 @@ class workbench:
         # check if virtualbox should be deleted
         if virtualbox is None:
 
-            # check if it was installed before
-            if self.vb_prev_installed:
+            # check if it was installed before or not needed at all
+            if self.vb_prev_installed or self.driver != 'virtualbox':
 
                 # don't delete if it was there before
                 virtualbox = False 
@@ -1143,6 +3474,39 @@ class workbench:
                 # raise Exception
                 raise Exception('I could not delete VirtualBox')
 
+        # check if the driver needs another tool
+        if 'uninstall' in DRIVERS[self.driver]:
+
+            # check if the tool should be deleted
+            if driver is None:
+
+                # delete if it wasn't there before
+                driver = not self.dr_prev_installed
+
+            # check if the tool should be deleted
+            if driver:
+
+                # try to delete the tool
+                try:
+
+                    # delete the tool
+                    dr_deleted = subprocess.call(DRIVERS[self.driver]['uninstall'].split(), stdout=subprocess.DEVNULL)
+
+                # handle exception
+                except:
+
+                    # it could not be deleted
+                    dr_deleted = 1
+
+                # check if it worked
+                if dr_deleted != 0:
+
+                    # raise Exception
+                    raise Exception(str('I could not delete ' + DRIVERS[self.driver]['name']))
+
+                # print message
+                print (str('> Successfully deleted ' + DRIVERS[self.driver]['name']))
+
         # check if they are still installed
         self.__check_installed()
 
@@ -1161,13 +3525,14 @@ class workbench:
                         Still on machine               
             --------------------------------
             Docker:         {dk_exists}       
-            VirtualBox:     {vb_exists}  
+            {dr_label:<16}{dr_exists}  
             Kubectl:        {kc_exists}
             Minikube:       {mk_exists}
 
 
             """.format(dk_exists = self.dk_installed,
-                    vb_exists = self.vb_installed,
+                    dr_label = str(DRIVERS[self.driver]['name'] + ':'),
+                    dr_exists = self.dr_installed,
                     kc_exists = self.kc_installed,
                     mk_exists = self.mk_installed)
 
@@ -0,0 +1,1843 @@
+"""
+wrapper.py is injected into the image of a product and serves its API. The
+wrapper imports the API script instead of running it. It hands all routes to
+the WSGI app of the script, e.g. a Flask app, and adds routes of its own on
+top, like the streaming bulk endpoint. The wrapper only needs the standard
+library, so it runs in any image the product builds. The payload formats are
+defined here as well and shared with the client of the product, which
+negotiates them by content type: JSON always works, MessagePack and Arrow are
+used if the packages are installed and decode straight into NumPy arrays.
+
+With several workers, the wrapper imports the API script, and so loads the
+model, once and then forks the workers. The workers share the pages of the
+model copy-on-write instead of loading a copy each.
+
+If the API script defines PRODUCTS, the wrapper serves a pack of products. The
+script of each product is loaded from products/<name>/api.py on its first
+request and served under /<name>/. Once the loaded products exceed the memory
+budget, the least recently used ones are dropped. Dropping is best effort, the
+memory is only freed once nothing refers to the objects of the product anymore,
+and C extensions it imported stay loaded.
+
+Every worker counts its requests and a histogram of their latencies in a block
+of memory shared by all workers, so the activity of the whole container is
+served on /_stats.
+
+The API script can define:
+--------
+app : callable
+    WSGI app serving the routes of the API
+predict : callable
+    Function taking a batch of records and returning one result per record,
+    served on /_predict, on /predict if there is no app and used by the bulk
+    endpoint
+PRODUCTS : list
+    Names of the products packed into the image
+MEMORY_BUDGET : int
+    Bytes the loaded products of a pack may take, None for no limit
+"""
+
+# import libs
+import http.server
+import urllib.parse
+import signal
+import socket
+import struct
+import mmap
+import time
+import gc
+import importlib.util
+import importlib
+import collections
+import threading
+import itertools
+import json
+import csv
+import io
+import os
+import sys
+
+# define the route of the streaming bulk endpoint
+BULK_ROUTE = '/_bulk'
+
+# define the route of predict, which the app of the API script can not shadow
+PREDICT_ROUTE = '/_predict'
+
+# define the number of records per model call on the bulk endpoint
+CHUNK_SIZE = int(os.environ.get('PRODUCTIONIZE_CHUNK_SIZE', '1024'))
+
+# define the port to serve on
+PORT = int(os.environ.get('PORT', '8000'))
+
+# define the number of worker processes
+WORKERS = int(os.environ.get('WEB_CONCURRENCY') or 1)
+
+# define the route reporting the memory of the workers
+MEMORY_ROUTE = '/_memory'
+
+# define the route reporting the loaded products of a pack
+MODELS_ROUTE = '/_models'
+
+# define the seconds a product of a pack waits for running requests, so its memory is measured alone
+LOAD_WAIT = float(os.environ.get('PRODUCTIONIZE_LOAD_WAIT', '10'))
+
+# define the route reporting the activity of the workers
+STATS_ROUTE = '/_stats'
+
+# define the counters every worker keeps
+METER_FIELDS = ['requests', 'errors', 'in_flight', 'last_request']
+
+# define the counters that are combined by their maximum instead of their sum
+METER_MAXIMA = ['last_request']
+
+# define the upper bounds of the latency histogram in seconds
+LATENCY_BOUNDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf')]
+
+# define the content types of the bulk formats
+BULK_FORMATS = {'text/csv': 'csv',
+                'application/x-ndjson': 'jsonl',
+                'application/jsonl': 'jsonl',
+                'application/vnd.apache.arrow.stream': 'arrow'}
+
+# define the content types of the payload formats
+CONTENT_TYPES = {'json': 'application/json',
+                 'msgpack': 'application/msgpack',
+                 'arrow': 'application/vnd.apache.arrow.stream',
+                 'raw': 'application/octet-stream'}
+
+# helper function to import an optional package
+def require(module, package, format):
+
+    """
+    Helper function to import the package a format needs.
+
+    Parameters
+    ----------
+    module : string
+        String with the module to import
+    package : string
+        String with the package to install
+    format : string
+        String with the format needing the package
+
+    Returns
+    -------
+    module
+        The imported module
+    """
+
+    # try to import the module
+    try:
+
+        # return module
+        return importlib.import_module(module)
+
+    # handle exception
+    except ImportError:
+
+        # raise Exception
+        raise Exception(str('The ' + format + ' format needs the ' + package + ' package: pip install ' + package))
+
+# helper function to turn NumPy values into JSON
+def to_builtin(value):
+
+    """
+    Helper function to turn NumPy arrays and scalars into lists and numbers.
+
+    Parameters
+    ----------
+    value : object
+        Value JSON can not serialize
+
+    Returns
+    -------
+    object
+        The value as list or number, anything else as string
+    """
+
+    # check if the value is a NumPy array or scalar
+    if hasattr(value, 'tolist'):
+
+        # return list or number
+        return value.tolist()
+
+    # return string
+    return str(value)
+
+# helper function to pack NumPy values into MessagePack
+def pack_default(value):
+
+    """
+    Helper function to pack NumPy arrays as raw bytes with dtype and shape,
+    so they are not turned into one Python object per element.
+
+    Parameters
+    ----------
+    value : object
+        Value MessagePack can not serialize
+
+    Returns
+    -------
+    object
+        The array as dict, NumPy scalars as numbers
+    """
+
+    # check if the value is an array of numbers
+    if hasattr(value, 'dtype') and hasattr(value, 'shape') and value.dtype.kind in 'biuf':
+
+        # import numpy
+        import numpy
+
+        # pack the array
+        return {'__ndarray__': True,
+                'dtype': value.dtype.str,
+                'shape': list(value.shape),
+                'data': numpy.ascontiguousarray(value).tobytes()}
+
+    # check if the value is another NumPy value
+    if hasattr(value, 'tolist'):
+
+        # return list or number
+        return value.tolist()
+
+    # raise Exception
+    raise TypeError(str('I can not pack values of type ' + type(value).__name__))
+
+# helper function to unpack NumPy arrays from MessagePack
+def unpack_hook(value):
+
+    """
+    Helper function to unpack arrays packed by pack_default.
+
+    Parameters
+    ----------
+    value : dict
+        Dict decoded by MessagePack
+
+    Returns
+    -------
+    object
+        The array as read-only view on the payload, other dicts as they are
+    """
+
+    # check if the dict is an array
+    if value.get('__ndarray__'):
+
+        # import numpy
+        numpy = require('numpy', 'numpy', 'msgpack')
+
+        # view the bytes as array
+        return numpy.frombuffer(value['data'], dtype=numpy.dtype(value['dtype'])).reshape(value['shape'])
+
+    # return dict
+    return value
+
+# helper function to turn a payload into an Arrow table
+def to_table(payload):
+
+    """
+    Helper function to turn a payload into an Arrow table.
+
+    Vectors become the column "value", matrices become the columns "f0",
+    "f1", ... and dicts of columns and DataFrames keep their columns.
+
+    Parameters
+    ----------
+    payload : object
+        Payload to turn into a table
+
+    Returns
+    -------
+    pyarrow.Table
+        The payload as table
+    """
+
+    # import pyarrow and numpy
+    pyarrow = require('pyarrow', 'pyarrow', 'arrow')
+    numpy = require('numpy', 'numpy', 'arrow')
+
+    # check if the payload is a table
+    if isinstance(payload, pyarrow.Table):
+
+        # return table
+        return payload
+
+    # check if the payload is a DataFrame
+    if hasattr(payload, 'columns') and hasattr(payload, 'to_numpy'):
+
+        # return table
+        return pyarrow.Table.from_pandas(payload, preserve_index=False)
+
+    # check if the payload holds columns
+    if isinstance(payload, dict):
+
+        # return table
+        return pyarrow.table(payload)
+
+    # turn the payload into an array
+    array = numpy.asarray(payload)
+
+    # check if the array is a vector
+    if array.ndim == 1:
+
+        # return table
+        return pyarrow.table({'value': array})
+
+    # check if the array is a matrix
+    if array.ndim == 2:
+
+        # return table
+        return pyarrow.table({str('f' + str(column)): array[:, column] for column in range(array.shape[1])})
+
+    # raise Exception
+    raise Exception('The arrow format takes vectors, matrices, dicts of columns or DataFrames')
+
+# helper function to turn an Arrow table into NumPy
+def from_table(table):
+
+    """
+    Helper function to turn an Arrow table into a NumPy array.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        Table to turn into an array
+
+    Returns
+    -------
+    object
+        A vector for a single column, a matrix for several numeric columns
+        and a list of records if there are other columns
+    """
+
+    # import pyarrow and numpy
+    pyarrow = require('pyarrow', 'pyarrow', 'arrow')
+    numpy = require('numpy', 'numpy', 'arrow')
+
+    # check if all columns are numeric
+    if not all(pyarrow.types.is_integer(field.type) or pyarrow.types.is_floating(field.type) or pyarrow.types.is_boolean(field.type)
+               for field in table.schema):
+
+        # return records
+        return table.to_pylist()
+
+    # get the columns as arrays
+    columns = [column.to_numpy() for column in table.columns]
+
+    # check if there is a single column
+    if len(columns) == 1:
+
+        # return vector
+        return columns[0]
+
+    # return matrix
+    return numpy.column_stack(columns)
+
+# helper function to encode a payload
+def encode(payload, format = 'json'):
+
+    """
+    Helper function to encode a payload.
+
+    Parameters
+    ----------
+    payload : object
+        Payload to encode, bytes are sent as they are
+    format : string
+        Format to encode the payload with: "json", "msgpack", "arrow" or "raw"
+
+    Returns
+    -------
+    tuple
+        Tuple with the encoded body and its content type
+    """
+
+    # check if payload is already encoded
+    if isinstance(payload, (bytes, bytearray)) or format == 'raw':
+
+        # send as it is
+        return bytes(payload), CONTENT_TYPES['raw']
+
+    # check if format is msgpack
+    if format == 'msgpack':
+
+        # import msgpack
+        msgpack = require('msgpack', 'msgpack', 'msgpack')
+
+        # encode payload
+        return msgpack.packb(payload, use_bin_type=True, default=pack_default), CONTENT_TYPES['msgpack']
+
+    # check if format is arrow
+    if format == 'arrow':
+
+        # import pyarrow
+        pyarrow = require('pyarrow', 'pyarrow', 'arrow')
+        require('pyarrow.ipc', 'pyarrow', 'arrow')
+
+        # write the table as stream
+        table = to_table(payload)
+        sink = pyarrow.BufferOutputStream()
+
+        # write table
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        # encode payload
+        return sink.getvalue().to_pybytes(), CONTENT_TYPES['arrow']
+
+    # check if format is json
+    if format == 'json':
+
+        # encode payload
+        return json.dumps(payload, default=to_builtin).encode('utf-8'), CONTENT_TYPES['json']
+
+    # raise Exception
+    raise Exception(str('format arg should be one of: ' + ', '.join(sorted(CONTENT_TYPES))))
+
+# helper function to decode a payload
+def decode(body, content_type):
+
+    """
+    Helper function to decode a payload by its content type.
+
+    Parameters
+    ----------
+    body : bytes
+        Body of the request or response
+    content_type : string
+        Content type of the body
+
+    Returns
+    -------
+    object
+        Decoded payload, text if the content type is unknown
+    """
+
+    # strip the parameters of the content type
+    content_type = (content_type or '').split(';')[0].strip()
+
+    # check if the body is json
+    if content_type == CONTENT_TYPES['json']:
+
+        # decode json
+        return json.loads(body.decode('utf-8') or 'null')
+
+    # check if the body is msgpack
+    if content_type == CONTENT_TYPES['msgpack']:
+
+        # import msgpack
+        msgpack = require('msgpack', 'msgpack', 'msgpack')
+
+        # decode msgpack
+        return msgpack.unpackb(body, raw=False, object_hook=unpack_hook)
+
+    # check if the body is arrow
+    if content_type == CONTENT_TYPES['arrow']:
+
+        # import pyarrow
+        pyarrow = require('pyarrow', 'pyarrow', 'arrow')
+        require('pyarrow.ipc', 'pyarrow', 'arrow')
+
+        # read the table without copying the body
+        return from_table(pyarrow.ipc.open_stream(pyarrow.py_buffer(body)).read_all())
+
+    # check if the body is binary
+    if content_type == CONTENT_TYPES['raw']:
+
+        # return bytes
+        return body
+
+    # return text
+    return body.decode('utf-8', errors='replace')
+
+# helper function to pick the format of an answer
+def negotiate(accept, content_type):
+
+    """
+    Helper function to pick the format of an answer.
+
+    Parameters
+    ----------
+    accept : string
+        Accept header of the request
+    content_type : string
+        Content type of the request
+
+    Returns
+    -------
+    string
+        The first accepted format, else the format of the request, else json
+    """
+
+    # get the formats by content type
+    formats = {value: key for key, value in CONTENT_TYPES.items()}
+
+    # loop over the accepted content types
+    for accepted in (accept or '').split(','):
+
+        # check if the format is known
+        if accepted.split(';')[0].strip() in formats:
+
+            # return format
+            return formats[accepted.split(';')[0].strip()]
+
+    # fall back to the format of the request, raw bodies are answered with json
+    format = formats.get((content_type or '').split(';')[0].strip(), 'json')
+    return 'json' if format == 'raw' else format
+
+# helper function to read the memory of a process
+def read_memory(pid):
+
+    """
+    Helper function to read the memory of a process from /proc.
+
+    The resident set size counts shared pages in every process sharing them,
+    the proportional set size splits them between those processes, so the
+    proportional sizes of the workers add up to the memory they really use.
+
+    Parameters
+    ----------
+    pid : int
+        Id of the process
+
+    Returns
+    -------
+    dict
+        Dict with the pid, the resident and the proportional set size in
+        bytes, None if they can not be read
+    """
+
+    # initialize the memory
+    memory = {'pid': pid, 'rss': None, 'pss': None}
+
+    # loop over the files and the fields to read
+    for path, field, key in [('status', 'VmRSS:', 'rss'), ('smaps_rollup', 'Pss:', 'pss')]:
+
+        # try to read the file
+        try:
+
+            # read file
+            with open(str('/proc/' + str(pid) + '/' + path)) as file:
+
+                # loop over lines
+                for line in file:
+
+                    # check if the line holds the field
+                    if line.startswith(field):
+
+                        # store the size in bytes
+                        memory[key] = int(line.split()[1]) * 1024
+                        break
+
+        # if the file can not be read
+        except (OSError, ValueError):
+
+            # skip the field
+            continue
+
+    # return memory
+    return memory
+
+# helper function to list the workers
+def list_workers(master):
+
+    """
+    Helper function to list the worker processes forked by the master.
+
+    Parameters
+    ----------
+    master : int
+        Id of the master process
+
+    Returns
+    -------
+    list
+        List with the ids of the workers
+    """
+
+    # initialize the workers
+    workers = []
+
+    # loop over the processes
+    for entry in os.listdir('/proc'):
+
+        # skip everything that is not a process
+        if not entry.isdigit():
+
+            # skip entry
+            continue
+
+        # try to read the parent of the process
+        try:
+
+            # read the status, the name in brackets may contain spaces
+            with open(str('/proc/' + entry + '/stat')) as file:
+                parent = int(file.read().rsplit(')', 1)[1].split()[1])
+
+        # if the process is gone
+        except (OSError, ValueError, IndexError):
+
+            # skip process
+            continue
+
+        # check if the process is a worker
+        if parent == master:
+
+            # add worker
+            workers.append(int(entry))
+
+    # return workers
+    return sorted(workers)
+
+# helper function to load the API script
+def load_api(folder = os.path.dirname(os.path.abspath(__file__))):
+
+    """
+    Helper function to import the API script next to the wrapper.
+
+    Parameters
+    ----------
+    folder : string
+        String with the folder of the API script
+
+    Returns
+    -------
+    module
+        The imported API script
+    """
+
+    # make the API script importable
+    sys.path.insert(0, folder)
+
+    # import API script
+    return importlib.import_module('api')
+
+# setup the class counting the requests
+class meter:
+
+    # describe the class
+    def __init__(self, slots = 1):
+
+        # store the number of slots, one per worker
+        self.slots = slots
+
+        # store the size of a slot in bytes, the counters followed by the histogram
+        self.size = 8 * (len(METER_FIELDS) + len(LATENCY_BOUNDS))
+
+        # store the counters in anonymous memory, which forked workers share
+        self.memory = mmap.mmap(-1, self.size * slots)
+
+        # store the slot of this worker
+        self.slot = 0
+
+        # store the start time
+        self.started = time.time()
+
+        # store the lock to guard the slot between threads
+        self.lock = threading.Lock()
+
+    # main method to update a counter
+    def update(self, field, value, add = True):
+
+        """
+        Main method to add to or set a counter of this worker.
+
+        Parameters
+        ----------
+        field : string
+            String with the name of the counter
+        value : float
+            Value to add or set
+        add : boolean
+            If True the value is added, else it is set
+        """
+
+        # get the offset of the counter
+        offset = self.slot * self.size + 8 * METER_FIELDS.index(field)
+
+        # lock the slot
+        with self.lock:
+
+            # check if the value is added
+            if add:
+
+                # add value
+                value = value + struct.unpack_from('d', self.memory, offset)[0]
+
+            # write value
+            struct.pack_into('d', self.memory, offset, value)
+
+    # main method to count the latency of a request
+    def observe(self, latency):
+
+        """
+        Main method to count the latency of a request in the histogram of
+        this worker.
+
+        Parameters
+        ----------
+        latency : float
+            Latency of the request in seconds
+        """
+
+        # get the bucket of the latency
+        bucket = next(index for index, bound in enumerate(LATENCY_BOUNDS) if latency <= bound)
+
+        # get the offset of the bucket
+        offset = self.slot * self.size + 8 * (len(METER_FIELDS) + bucket)
+
+        # lock the slot
+        with self.lock:
+
+            # count latency
+            struct.pack_into('d', self.memory, offset, struct.unpack_from('d', self.memory, offset)[0] + 1)
+
+    # main method to reset a slot
+    def reset(self, slot, field):
+
+        """
+        Main method to reset a counter of a slot, e.g. of a worker that died.
+
+        Parameters
+        ----------
+        slot : int
+            Slot of the worker
+        field : string
+            String with the name of the counter
+        """
+
+        # reset counter
+        struct.pack_into('d', self.memory, slot * self.size + 8 * METER_FIELDS.index(field), 0.0)
+
+    # main method to read the counters
+    def read(self):
+
+        """
+        Main method to read the counters of all workers.
+
+        Returns
+        -------
+        dict
+            Dict with the counters and the latency histogram of all workers
+            combined, the start time, the current time and the host name of
+            the container
+        """
+
+        # initialize the counters
+        counters = {field: 0.0 for field in METER_FIELDS}
+        buckets = [0] * len(LATENCY_BOUNDS)
+
+        # loop over slots
+        for slot in range(self.slots):
+
+            # read the slot
+            values = struct.unpack_from(str(len(METER_FIELDS) + len(LATENCY_BOUNDS)) + 'd', self.memory, slot * self.size)
+
+            # loop over the counters
+            for field, value in zip(METER_FIELDS, values):
+
+                # combine the counter
+                counters[field] = max(counters[field], value) if field in METER_MAXIMA else counters[field] + value
+
+            # loop over the buckets
+            for index, value in enumerate(values[len(METER_FIELDS):]):
+
+                # add bucket
+                buckets[index] += int(value)
+
+        # add the times, a container that was not called yet was last active at its start
+        counters['last_request'] = max(counters['last_request'], self.started)
+        counters['started'] = self.started
+        counters['time'] = time.time()
+        counters['workers'] = self.slots
+
+        # add the histogram, the last bound is open
+        counters['latency_bounds'] = LATENCY_BOUNDS[:-1]
+        counters['latency_buckets'] = buckets
+
+        # add the host, which tells the replicas of a product apart
+        counters['host'] = socket.gethostname()
+
+        # return counters
+        return counters
+
+# setup the class loading the products of a pack
+class packer:
+
+    # describe the class
+    def __init__(self, folder, products, budget = None):
+
+        # store the folder of the products
+        self.folder = folder
+
+        # store the names of the products
+        self.products = set(products)
+
+        # store the memory budget in bytes
+        self.budget = budget
+
+        # store the loaded products, least recently used first
+        self.loaded = collections.OrderedDict()
+
+        # store the number of products dropped
+        self.evictions = 0
+
+        # store the lock to guard loading and dropping
+        self.lock = threading.Lock()
+
+        # store the requests running on a product and if a product is loading
+        self.serving = 0
+        self.loading = False
+
+        # store the condition telling that no request runs and no product loads
+        self.idle = threading.Condition(self.lock)
+
+    # helper method to drop products over the budget
+    def __evict(self):
+
+        """
+        Private method to drop the least recently used products until the
+        loaded products fit into the budget. The last product loaded is
+        always kept. Dropping is best effort, the memory is only freed once
+        nothing refers to the objects of the product anymore, e.g. a request
+        still running on it, and C extensions stay loaded.
+        """
+
+        # loop while the products exceed the budget
+        while self.budget is not None and len(self.loaded) > 1 and sum(entry['cost'] for entry in self.loaded.values()) > self.budget:
+
+            # drop the least recently used product
+            name, entry = self.loaded.popitem(last=False)
+            sys.modules.pop(entry['module'].__name__, None)
+
+            # update counter
+            self.evictions = self.evictions + 1
+
+            # print message
+            print (str('> Dropped product ' + name + ' to stay within the memory budget'), flush=True)
+
+        # try to free the memory of the dropped products
+        gc.collect()
+
+    # main method to get a product
+    def get(self, name):
+
+        """
+        Main method to get the API script of a product, loading it on its
+        first request. Every product returned has to be handed back with
+        release() once its request is served.
+
+        The cost of a product is the growth of the resident memory while it
+        loads, but at least the size of its files, as memory-mapped models
+        only become resident once they are used. The first product importing
+        a library pays for it, until it is loaded again. New requests wait
+        while a product loads, and the load waits up to LOAD_WAIT seconds
+        for the running requests, so their memory does not count. If they
+        run longer, the cost is measured alongside them and marked as not
+        isolated.
+
+        Parameters
+        ----------
+        name : string
+            String with the name of the product
+
+        Returns
+        -------
+        module
+            The API script of the product or None if it is not packed
+        """
+
+        # lock the products
+        with self.lock:
+
+            # wait while another product loads
+            self.idle.wait_for(lambda: not self.loading)
+
+            # check if the product is loaded
+            if name in self.loaded:
+
+                # mark as recently used
+                self.loaded.move_to_end(name)
+
+                # count the request
+                self.serving = self.serving + 1
+
+                # return product
+                return self.loaded[name]['module']
+
+            # check if the product is packed
+            if name not in self.products:
+
+                # return None
+                return None
+
+            # get the folder of the product
+            folder = os.path.join(self.folder, name)
+
+            # hold back new requests and wait for the running ones, so the memory they use does not count
+            self.loading = True
+            isolated = self.idle.wait_for(lambda: self.serving == 0, timeout = LOAD_WAIT)
+
+            # try to load the product
+            try:
+
+                # store the memory before loading
+                before = read_memory(os.getpid())['rss'] or 0
+
+                # import the API script of the product
+                spec = importlib.util.spec_from_file_location(str('product_' + name.replace('-', '_')), os.path.join(folder, 'api.py'))
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[spec.name] = module
+                spec.loader.exec_module(module)
+
+                # store the memory after loading
+                after = read_memory(os.getpid())['rss'] or 0
+
+            # let the requests go on
+            finally:
+
+                # update status
+                self.loading = False
+                self.idle.notify_all()
+
+            # get the size of the files of the product
+            size = sum(os.path.getsize(os.path.join(folder, file)) for file in os.listdir(folder) if os.path.isfile(os.path.join(folder, file)))
+
+            # store the product with its cost
+            self.loaded[name] = {'module': module, 'cost': max(after - before, size), 'isolated': isolated}
+
+            # count the request
+            self.serving = self.serving + 1
+
+            # print message
+            print (str('> Loaded product ' + name), flush=True)
+
+            # drop products over the budget
+            self.__evict()
+
+            # return product
+            return module
+
+    # main method to hand back a product
+    def release(self):
+
+        """
+        Main method to hand back a product got from get() once its request
+        is served.
+        """
+
+        # lock the products
+        with self.lock:
+
+            # count the request as done
+            self.serving = self.serving - 1
+
+            # wake a product waiting to load
+            self.idle.notify_all()
+
+    # main method to describe the pack
+    def status(self):
+
+        """
+        Main method to describe the loaded products of the pack.
+
+        Returns
+        -------
+        dict
+            Dict with the packed and loaded products, their costs in bytes and
+            if they were measured alone, the budget and the number of products
+            dropped
+        """
+
+        # lock the products
+        with self.lock:
+
+            # return status
+            return {'products': sorted(self.products),
+                    'loaded': [{'name': name, 'cost': entry['cost'], 'isolated': entry['isolated']} for name, entry in self.loaded.items()],
+                    'budget': self.budget,
+                    'evictions': self.evictions}
+
+# setup the class reading a request body
+class body(io.RawIOBase):
+
+    # describe the class
+    def __init__(self, rfile, headers):
+
+        # store the stream of the connection
+        self.rfile = rfile
+
+        # check if the body is sent in chunks
+        self.chunked = 'chunked' in headers.get('Transfer-Encoding', '').lower()
+
+        # store the bytes left in the body or the current chunk
+        self.remaining = 0 if self.chunked else int(headers.get('Content-Length') or 0)
+
+        # store if the last chunk was read
+        self.done = not self.chunked
+
+    # the body can be read
+    def readable(self):
+
+        # return True
+        return True
+
+    # main method to read from the body
+    def readinto(self, buffer):
+
+        """
+        Main method to read the next bytes of the body into a buffer.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to read into
+
+        Returns
+        -------
+        int
+            Number of bytes read, 0 at the end of the body
+        """
+
+        # check if a new chunk has to be started
+        if self.remaining == 0 and not self.done:
+
+            # read the size of the chunk
+            size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+
+            # check if this is the last chunk
+            if size == 0:
+
+                # skip the trailers
+                while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+
+                # update status
+                self.done = True
+
+            # store the size of the chunk
+            self.remaining = size
+
+        # check if the body is exhausted
+        if self.remaining == 0:
+
+            # return end of body
+            return 0
+
+        # read the next bytes
+        data = self.rfile.read(min(len(buffer), self.remaining))
+
+        # check if the connection broke
+        if not data:
+
+            # raise Exception
+            raise ConnectionError('The request body ended early')
+
+        # update the bytes left
+        self.remaining = self.remaining - len(data)
+
+        # skip the line break after a chunk
+        if self.chunked and self.remaining == 0:
+
+            # skip line break
+            self.rfile.readline()
+
+        # copy into the buffer
+        buffer[:len(data)] = data
+
+        # return number of bytes
+        return len(data)
+
+    # main method to skip the rest of the body
+    def drain(self):
+
+        """
+        Main method to skip the unread rest of the body, so the connection
+        can be kept alive.
+        """
+
+        # initialize the buffer
+        buffer = bytearray(65536)
+
+        # read until the body is exhausted
+        while self.readinto(buffer):
+            pass
+
+# helper function to convert a csv value
+def to_value(value):
+
+    """
+    Helper function to convert a csv value to a number if it is one.
+
+    Parameters
+    ----------
+    value : string
+        String with the csv value
+
+    Returns
+    -------
+    object
+        The value as int, float or string
+    """
+
+    # try to convert to int
+    try:
+
+        # return int
+        return int(value)
+
+    # if it is no int
+    except ValueError:
+
+        # try to convert to float
+        try:
+
+            # return float
+            return float(value)
+
+        # if it is no number
+        except ValueError:
+
+            # return string
+            return value
+
+# helper function to read the records of a body
+def read_records(stream, bulk_format, header = True):
+
+    """
+    Helper function to read the records of a body one by one.
+
+    Parameters
+    ----------
+    stream : io.BufferedReader
+        The body to read from
+    bulk_format : string
+        Format of the body: "csv", "jsonl" or "arrow"
+    header : boolean
+        If True, the first csv row holds the column names and is skipped
+
+    Yields
+    ------
+    object
+        The records, csv rows as lists of values
+    """
+
+    # check if the body is csv
+    if bulk_format == 'csv':
+
+        # read the rows
+        rows = csv.reader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+
+        # check if there is a header
+        if header:
+
+            # skip header
+            next(rows, None)
+
+        # loop over rows
+        for row in rows:
+
+            # yield row
+            yield [to_value(value) for value in row]
+
+    # check if the body is json lines
+    elif bulk_format == 'jsonl':
+
+        # loop over lines
+        for line in stream:
+
+            # skip empty lines
+            if line.strip():
+
+                # yield record
+                yield json.loads(line)
+
+    # check if the body is arrow
+    elif bulk_format == 'arrow':
+
+        # import pyarrow
+        import pyarrow.ipc
+
+        # loop over the record batches of the stream
+        for batch in pyarrow.ipc.open_stream(stream):
+
+            # yield the rows of the batch
+            yield from zip(*[column.to_pylist() for column in batch.columns])
+
+# setup the class handling the requests
+class handler(http.server.BaseHTTPRequestHandler):
+
+    # keep connections alive
+    protocol_version = 'HTTP/1.1'
+
+    # send small responses right away
+    disable_nagle_algorithm = True
+
+    # the API script
+    api = None
+
+    # the id of the process that loaded the API script
+    master = None
+
+    # the packer, if the API script packs several products
+    packer = None
+
+    # the meter counting the requests
+    meter = None
+
+    # remember the status of the response
+    def send_response(self, code, message = None):
+
+        # store status
+        self.status = code
+
+        # send status
+        super().send_response(code, message)
+
+    # log to stderr without the default noise
+    def log_message(self, format, *args):
+
+        # write log
+        sys.stderr.write(str(self.command + ' ' + self.path + ' ' + (args[1] if len(args) > 1 else '') + '\n'))
+
+    # helper method to send a complete response
+    def __respond(self, status, content, content_type = 'application/json'):
+
+        """
+        Private method to send a complete response.
+
+        Parameters
+        ----------
+        status : int
+            HTTP status code
+        content : bytes
+            Body of the response
+        content_type : string
+            Content type of the response
+        """
+
+        # send headers
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+
+        # send body
+        self.wfile.write(content)
+
+    # helper method to send a chunk of a streamed response
+    def __write_chunk(self, data):
+
+        """
+        Private method to send a chunk of a streamed response.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes of the chunk, empty bytes end the response
+        """
+
+        # send chunk in one write
+        self.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+
+    # main method to route a request
+    def __dispatch(self):
+
+        """
+        Main method to route a request to the wrapper or the API script.
+        """
+
+        # split path and query
+        route, _, query = self.path.partition('?')
+
+        # open the body
+        request_body = body(self.rfile, self.headers)
+
+        # check if the request counts as activity
+        counted = route not in [MEMORY_ROUTE, MODELS_ROUTE, STATS_ROUTE]
+
+        # check if the request is counted
+        if counted:
+
+            # count the request in flight
+            self.meter.update('in_flight', 1)
+            self.status = None
+
+            # store start time
+            start = time.perf_counter()
+
+        # store if a product of the pack has to be handed back
+        held = False
+
+        # try to serve the request
+        try:
+
+            # store the prefix of the product
+            script_name = ''
+
+            # check if the memory is requested
+            if route == MEMORY_ROUTE and self.command == 'GET':
+
+                # serve memory
+                self.__memory()
+                return
+
+            # check if the activity is requested
+            if route == STATS_ROUTE and self.command == 'GET':
+
+                # serve activity
+                self.__respond(200, json.dumps(self.meter.read()).encode('utf-8'))
+                return
+
+            # check if the products of a pack are requested
+            if route == MODELS_ROUTE and self.command == 'GET' and self.packer is not None:
+
+                # serve status of the pack
+                self.__respond(200, json.dumps(self.packer.status()).encode('utf-8'))
+                return
+
+            # check if the wrapper serves a pack
+            if self.packer is not None:
+
+                # split the product from the route
+                name, _, rest = route[1:].partition('/')
+                script_name, route = str('/' + name), str('/' + rest)
+
+                # get the API script of the product
+                self.api = self.packer.get(name)
+                held = self.api is not None
+
+            # check if there is no API script
+            if self.api is None:
+
+                # send not found
+                self.__respond(404, json.dumps({'error': str('There is no product ' + script_name)}).encode('utf-8'))
+
+            # check if the bulk endpoint is called
+            elif route == BULK_ROUTE and self.command == 'POST':
+
+                # serve bulk endpoint
+                self.__bulk(request_body, urllib.parse.parse_qs(query))
+
+            # check if predict of the wrapper is called
+            elif route == PREDICT_ROUTE and self.command == 'POST' and callable(getattr(self.api, 'predict', None)):
+
+                # serve predict
+                self.__predict(request_body)
+
+            # check if the API script brings an app
+            elif callable(getattr(self.api, 'app', None)):
+
+                # serve the app
+                self.__wsgi(request_body, route, query, script_name)
+
+            # check if predict is called
+            elif route == '/predict' and self.command == 'POST' and callable(getattr(self.api, 'predict', None)):
+
+                # serve predict
+                self.__predict(request_body)
+
+            # if the route is unknown
+            else:
+
+                # send not found
+                self.__respond(404, json.dumps({'error': str('There is no route ' + route)}).encode('utf-8'))
+
+        # handle a broken connection
+        except ConnectionError:
+
+            # close the connection
+            self.close_connection = True
+
+        # clean up
+        finally:
+
+            # hand back the product of the pack
+            if held:
+                self.packer.release()
+
+            # skip what was not read, so the connection can be kept alive
+            if not self.close_connection:
+                request_body.drain()
+
+            # check if the request is counted
+            if counted:
+
+                # count the request and its latency
+                self.meter.observe(time.perf_counter() - start)
+                self.meter.update('in_flight', -1)
+                self.meter.update('requests', 1)
+                self.meter.update('last_request', time.time(), add = False)
+
+                # check if the request failed
+                if self.status is None or self.status >= 500:
+
+                    # count error
+                    self.meter.update('errors', 1)
+
+    # helper method to serve the memory of the workers
+    def __memory(self):
+
+        """
+        Private method to serve the memory of the master and its workers.
+        """
+
+        # get the master
+        master = self.master or os.getpid()
+
+        # read the memory of the master and the workers
+        memory = {'master': read_memory(master),
+                  'workers': [read_memory(worker) for worker in list_workers(master)]}
+
+        # loop over the sizes
+        for key in ['rss', 'pss']:
+
+            # add the total
+            sizes = [process[key] for process in [memory['master']] + memory['workers']]
+            memory[str('total_' + key)] = sum(sizes) if None not in sizes else None
+
+        # send memory
+        self.__respond(200, json.dumps(memory).encode('utf-8'))
+
+    # helper method to serve predict
+    def __predict(self, request_body):
+
+        """
+        Private method to serve predict of the API script.
+
+        The payload is decoded by its content type, so MessagePack and Arrow
+        payloads reach predict as NumPy arrays. The answer is encoded in the
+        first format the caller accepts.
+
+        Parameters
+        ----------
+        request_body : body
+            The body of the request
+        """
+
+        # get the content type
+        content_type = self.headers.get('Content-Type', CONTENT_TYPES['json'])
+
+        # try to predict
+        try:
+
+            # decode the records
+            records = decode(request_body.read(), content_type)
+
+            # predict
+            results = self.api.predict(records)
+
+            # encode the results
+            content, result_type = encode(results if hasattr(results, 'dtype') else list(results),
+                                          format = negotiate(self.headers.get('Accept'), content_type))
+
+        # handle exception
+        except Exception as error:
+
+            # send error
+            self.__respond(500, json.dumps({'error': str(error)}).encode('utf-8'))
+
+            # stop function
+            return
+
+        # send results
+        self.__respond(200, content, result_type)
+
+    # helper method to serve the bulk endpoint
+    def __bulk(self, request_body, query):
+
+        """
+        Private method to serve the streaming bulk endpoint.
+
+        The body is read as a stream of records, which are handed to predict
+        of the API script in chunks of a fixed size. The results of each chunk
+        are sent as JSON lines before the next chunk is read, so only one
+        chunk is held in memory, whatever the size of the body.
+
+        Parameters
+        ----------
+        request_body : body
+            The body of the request
+        query : dict
+            Dict with the query parameters: chunk_size and header
+        """
+
+        # check if the API script can predict
+        if not callable(getattr(self.api, 'predict', None)):
+
+            # send error
+            self.__respond(501, b'{"error": "The API script does not define predict(records)"}')
+
+            # stop function
+            return
+
+        # get the format of the body
+        bulk_format = BULK_FORMATS.get(self.headers.get('Content-Type', '').split(';')[0].strip())
+
+        # check if the format is known
+        if bulk_format is None:
+
+            # send error
+            self.__respond(415, json.dumps({'error': str('The bulk endpoint takes: ' + ', '.join(sorted(BULK_FORMATS)))}).encode('utf-8'))
+
+            # stop function
+            return
+
+        # get the size of the chunks
+        chunk_size = int(query.get('chunk_size', [CHUNK_SIZE])[0])
+
+        # read the records lazily
+        header = query.get('header', ['true'])[0].lower() not in ['0', 'false', 'no']
+        records = read_records(io.BufferedReader(request_body, 65536), bulk_format, header = header)
+
+        # start the streamed response
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        # try to stream the results
+        try:
+
+            # loop over the chunks
+            while True:
+
+                # take the next chunk
+                chunk = list(itertools.islice(records, chunk_size))
+
+                # check if the records are exhausted
+                if not chunk:
+
+                    # stop loop
+                    break
+
+                # predict the chunk at once
+                results = list(self.api.predict(chunk))
+
+                # check if there is one result per record
+                if len(results) != len(chunk):
+
+                    # raise Exception
+                    raise Exception(str('predict returned ' + str(len(results)) + ' results for ' + str(len(chunk)) + ' records'))
+
+                # send the results of the chunk
+                self.__write_chunk(''.join(str(json.dumps(result, default=to_builtin) + '\n') for result in results).encode('utf-8'))
+
+        # handle exception
+        except Exception as error:
+
+            # log the error
+            sys.stderr.write(str('The bulk request failed: ' + str(error) + '\n'))
+
+            # end without the last chunk, so the caller sees the response is incomplete
+            self.close_connection = True
+
+            # stop function
+            return
+
+        # end the response
+        self.__write_chunk(b'')
+
+    # helper method to serve the app of the API script
+    def __wsgi(self, request_body, route, query, script_name = ''):
+
+        """
+        Private method to hand a request to the WSGI app of the API script.
+
+        Parameters
+        ----------
+        request_body : body
+            The body of the request
+        route : string
+            String with the route of the request
+        query : string
+            String with the query of the request
+        script_name : string
+            String with the prefix of the product in a pack
+        """
+
+        # build the environment of the request, the input ends with the body
+        # even if it is sent in chunks without a length
+        environ = {'REQUEST_METHOD': self.command,
+                   'SCRIPT_NAME': script_name,
+                   'PATH_INFO': urllib.parse.unquote(route, 'iso-8859-1'),
+                   'QUERY_STRING': query,
+                   'CONTENT_TYPE': self.headers.get('Content-Type', ''),
+                   'CONTENT_LENGTH': self.headers.get('Content-Length', ''),
+                   'REMOTE_ADDR': self.client_address[0],
+                   'SERVER_NAME': 'localhost',
+                   'SERVER_PORT': str(PORT),
+                   'SERVER_PROTOCOL': self.request_version,
+                   'wsgi.version': (1, 0),
+                   'wsgi.url_scheme': 'http',
+                   'wsgi.input': io.BufferedReader(request_body, 65536),
+                   'wsgi.input_terminated': True,
+                   'wsgi.errors': sys.stderr,
+                   'wsgi.multithread': True,
+                   'wsgi.multiprocess': WORKERS > 1 and hasattr(os, 'fork'),
+                   'wsgi.run_once': False}
+
+        # loop over headers
+        for name, value in self.headers.items():
+
+            # get the key of the header
+            key = str('HTTP_' + name.upper().replace('-', '_'))
+
+            # skip the headers that are set already
+            if key in ['HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH']:
+
+                # skip header
+                continue
+
+            # join repeated headers
+            if key in environ:
+
+                # add value
+                environ[key] = str(environ[key] + ',' + value)
+
+            # if the header is new
+            else:
+
+                # add header
+                environ[key] = value
+
+        # store the status and headers of the response
+        response = {}
+
+        # helper to start the response
+        def start_response(status, headers, exc_info = None):
+
+            # store status and headers
+            response['status'] = status
+            response['headers'] = headers
+
+            # return write
+            return write
+
+        # helper to send the headers once the first bytes are ready
+        def send_headers():
+
+            # send status
+            code, _, message = response['status'].partition(' ')
+            self.send_response(int(code), message)
+
+            # loop over headers
+            for name, value in response['headers']:
+
+                # send header
+                self.send_header(name, value)
+
+            # check if the length is known
+            response['chunked'] = not any(name.lower() == 'content-length' for name, value in response['headers'])
+
+            # check if the response has to be sent in chunks
+            if response['chunked']:
+
+                # send in chunks
+                self.send_header('Transfer-Encoding', 'chunked')
+
+            # end headers
+            self.end_headers()
+            response['sent'] = True
+
+        # helper to write bytes of the response
+        def write(data):
+
+            # check if the headers were sent
+            if not response.get('sent'):
+
+                # send headers
+                send_headers()
+
+            # check if the response is sent in chunks
+            if response['chunked']:
+
+                # send chunk
+                self.__write_chunk(data)
+
+            # if the length is known
+            else:
+
+                # send bytes
+                self.wfile.write(data)
+
+        # call the app
+        result = self.api.app(environ, start_response)
+
+        # try to send the response
+        try:
+
+            # loop over the bytes of the response
+            for data in result:
+
+                # send non empty bytes
+                if data:
+                    write(data)
+
+            # check if the headers were sent
+            if not response.get('sent'):
+
+                # send headers
+                send_headers()
+
+            # check if the response is sent in chunks
+            if response['chunked']:
+
+                # end the response
+                self.__write_chunk(b'')
+
+        # clean up
+        finally:
+
+            # close the result
+            if hasattr(result, 'close'):
+                result.close()
+
+    # route all methods
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = __dispatch
+
+# main function to serve the API
+def main():
+
+    """
+    Main function to import the API script and serve it.
+
+    With more than one worker, the API script is imported and the port is
+    bound once, then the workers are forked and all accept on the same port.
+    The garbage collector is frozen before forking, so it does not touch the
+    pages of the model and copy them into every worker. Workers that die
+    are replaced.
+    """
+
+    # import the API script
+    handler.api = load_api()
+    handler.master = os.getpid()
+
+    # check if the API script packs several products
+    if getattr(handler.api, 'PRODUCTS', None):
+
+        # load the products on their first request
+        handler.packer = packer(folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products'),
+                                products = handler.api.PRODUCTS,
+                                budget = getattr(handler.api, 'MEMORY_BUDGET', None))
+        handler.api = None
+
+    # give every worker a slot to count its requests
+    handler.meter = meter(slots = max(WORKERS, 1))
+
+    # bind the port
+    server = http.server.ThreadingHTTPServer(('0.0.0.0', PORT), handler)
+
+    # print message
+    print (str('> Serving the API on port ' + str(PORT) + ' with ' + str(WORKERS) + ' worker(s)'), flush=True)
+
+    # check if a single process serves the API
+    if WORKERS <= 1 or not hasattr(os, 'fork'):
+
+        # serve
+        server.serve_forever()
+
+        # stop function
+        return
+
+    # keep the objects loaded so far out of the garbage collector
+    gc.collect()
+    gc.freeze()
+
+    # store the slots of the workers and if the wrapper is stopping
+    workers = {}
+    stopping = []
+
+    # helper to fork a worker
+    def fork_worker(slot):
+
+        # forget the requests in flight of a worker that died in this slot
+        handler.meter.reset(slot, 'in_flight')
+
+        # fork
+        pid = os.fork()
+
+        # check if this is the worker
+        if pid == 0:
+
+            # count in the slot of the worker
+            handler.meter.slot = slot
+
+            # stop on signals like any process
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+            # try to serve
+            try:
+
+                # serve
+                server.serve_forever()
+
+            # never return into the loop of the master
+            finally:
+
+                # exit worker
+                os._exit(0)
+
+        # store worker
+        workers[pid] = slot
+
+    # helper to stop the workers
+    def stop(signum, frame):
+
+        # update status
+        stopping.append(signum)
+
+        # loop over workers
+        for pid in list(workers):
+
+            # try to stop the worker
+            try:
+
+                # stop worker
+                os.kill(pid, signal.SIGTERM)
+
+            # if the worker is gone already
+            except ProcessLookupError:
+                pass
+
+    # stop the workers with the master
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # loop over the workers
+    for slot in range(WORKERS):
+
+        # fork worker
+        fork_worker(slot)
+
+    # loop until all workers are gone
+    while workers:
+
+        # try to wait for a worker to end
+        try:
+
+            # wait for worker
+            pid, status = os.wait()
+
+        # if there are no workers left
+        except ChildProcessError:
+
+            # stop loop
+            break
+
+        # forget the worker
+        slot = workers.pop(pid, None)
+
+        # check if the worker died on its own
+        if not stopping and slot is not None:
+
+            # print message
+            print (str('> Worker ' + str(pid) + ' ended, starting a new one'), flush=True)
+
+            # replace worker
+            fork_worker(slot)
+
+# run the wrapper
+if __name__ == '__main__':
+    main()
@@ -20,4 +20,5 @@ setup(name='productionize',
       author_email='ljstroemsdoerfer@gmail.com',
       license='MIT',
       packages=['productionize'],
+      python_requires='>=3.9',
       zip_safe=False)
\ No newline at end of file
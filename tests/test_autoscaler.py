@@ -0,0 +1,139 @@
+# import libs
+import pytest
+from productionize.autoscaler import policy, percentile, measure, simulate
+
+# helper to build the stats of a replica
+def stats(requests, time, started = 0.0, in_flight = 0, buckets = None):
+
+    # return stats
+    return {'requests': requests, 'time': time, 'started': started, 'in_flight': in_flight,
+            'latency_bounds': [0.1, 0.2, 0.4], 'latency_buckets': buckets or [0, 0, 0, 0]}
+
+# test the checks of the policy
+def test_policy_rejects_invalid_arguments():
+
+    # check the metric
+    with pytest.raises(Exception):
+        policy(1, 3, 10, metric = 'cpu')
+
+    # check the bounds
+    with pytest.raises(Exception):
+        policy(3, 1, 10)
+
+    # check the target
+    with pytest.raises(Exception):
+        policy(1, 3, 0)
+
+# test scaling up
+def test_decide_scales_up_by_ratio_right_away():
+
+    # setup policy
+    scaling_policy = policy(1, 10, target = 10)
+
+    # twice the target on two replicas needs four
+    assert scaling_policy.decide(2, 20.0, now = 0) == 4
+
+# test the bounds
+def test_decide_keeps_replicas_within_bounds():
+
+    # setup policy
+    scaling_policy = policy(2, 5, target = 10)
+
+    # far above the target
+    assert scaling_policy.decide(3, 100.0, now = 0) == 5
+
+    # without a metric, only the bounds apply
+    assert scaling_policy.decide(1, None, now = 0) == 2
+    assert scaling_policy.decide(3, None, now = 0) == 3
+
+# test the tolerance
+def test_decide_ignores_small_deviations():
+
+    # setup policy
+    scaling_policy = policy(1, 10, target = 10, tolerance = 0.1)
+
+    # within ten percent of the target
+    assert scaling_policy.decide(4, 10.9, now = 0) == 4
+
+# test scaling down
+def test_decide_scales_down_only_after_the_delay():
+
+    # setup policy
+    scaling_policy = policy(1, 10, target = 10, scale_down_delay = 60)
+
+    # the load needs four replicas
+    assert scaling_policy.decide(4, 10.0, now = 0) == 4
+
+    # a dip within the delay keeps them
+    assert scaling_policy.decide(4, 2.5, now = 30) == 4
+
+    # once the high recommendation is older than the delay, it scales down
+    assert scaling_policy.decide(4, 2.5, now = 90) == 1
+
+# test the percentile
+def test_percentile_interpolates_within_the_bucket():
+
+    # no requests
+    assert percentile([0.1, 0.2], [0, 0, 0]) == 0.0
+
+    # all requests in the first bucket
+    assert percentile([0.1, 0.2], [10, 0, 0], q = 0.5) == pytest.approx(0.05)
+
+    # the p95 falls into the second bucket
+    assert percentile([0.1, 0.2], [50, 50, 0], q = 0.95) == pytest.approx(0.19)
+
+    # latencies above the last bound are reported as the last bound
+    assert percentile([0.1, 0.2], [0, 0, 10]) == 0.2
+
+# test the request rate
+def test_measure_rate_per_replica():
+
+    # two replicas, read twice
+    previous = {'a': stats(100, 10.0), 'b': stats(50, 10.0)}
+    current = {'a': stats(200, 20.0), 'b': stats(70, 20.0)}
+
+    # mean of 10 and 2 requests per second
+    assert measure(previous, current, 'rate') == pytest.approx(6.0)
+
+# test restarted replicas
+def test_measure_skips_restarted_and_new_replicas():
+
+    # the replica restarted and a new one appeared
+    previous = {'a': stats(100, 10.0, started = 1.0)}
+    current = {'a': stats(5, 20.0, started = 15.0), 'b': stats(10, 20.0)}
+
+    # nothing can be compared yet
+    assert measure(previous, current, 'rate') is None
+    assert measure({}, current, 'p95') is None
+
+# test the requests in flight
+def test_measure_in_flight_from_the_current_reading():
+
+    # two replicas read now
+    current = {'a': stats(0, 1.0, in_flight = 3), 'b': stats(0, 1.0, in_flight = 1)}
+
+    # mean over the replicas
+    assert measure({}, current, 'in_flight') == 2.0
+    assert measure({}, {}, 'in_flight') is None
+
+# test the p95 latency
+def test_measure_p95_from_the_latencies_of_the_interval():
+
+    # the earlier requests were fast, the ones of the interval slow
+    previous = {'a': stats(10, 10.0, buckets = [10, 0, 0, 0])}
+    current = {'a': stats(20, 20.0, buckets = [10, 0, 10, 0])}
+
+    # only the requests of the interval count
+    assert measure(previous, current, 'p95') == pytest.approx(0.39)
+
+# test the simulation
+def test_simulate_follows_the_load():
+
+    # setup policy
+    scaling_policy = policy(1, 5, target = 10, scale_down_delay = 0)
+
+    # run a peak
+    steps = simulate(scaling_policy, [10, 40, 40, 10])
+
+    # it scales up with the load and down after it
+    assert [step['decided'] for step in steps] == [1, 4, 4, 1]
@@ -0,0 +1,43 @@
+# import libs
+from productionize.inventory import inventory
+
+# helper to build an item of a listing
+def item(kind, name, namespace = None, labels = None):
+
+    # return item
+    return {'kind': kind, 'metadata': {'name': name, 'namespace': namespace, 'labels': labels or {}}, 'status': {'phase': 'Running'}}
+
+# test a product scaled to zero
+def test_a_product_scaled_to_zero_still_exists():
+
+    # seed the inventory with a product whose deployment has no pods
+    cluster = inventory()
+    cluster.seed({'items': [item('Namespace', 'shop'),
+                            item('Deployment', 'api', 'shop'),
+                            item('Deployment', 'web', 'shop'),
+                            item('Pod', 'web-1', 'shop', {'run': 'web'})]})
+
+    # both products are listed
+    assert cluster.list_products('shop') == ['api', 'web']
+    assert cluster.has_product('shop', 'api')
+
+    # the pod of web goes away, its deployment stays
+    cluster._inventory__apply('DELETED', item('Pod', 'web-1', 'shop', {'run': 'web'}))
+    assert cluster.has_product('shop', 'web')
+
+    # the deployment goes away
+    cluster._inventory__apply('DELETED', item('Deployment', 'web', 'shop'))
+    assert not cluster.has_product('shop', 'web')
+    assert cluster.list_products('shop') == ['api']
+
+# test the pods of a pre-pull
+def test_prepull_pods_are_not_products():
+
+    # seed the inventory with a product and the pod pre-pulling its image
+    cluster = inventory()
+    cluster.seed({'items': [item('Namespace', 'shop'),
+                            item('Deployment', 'api', 'shop'),
+                            item('Pod', 'api-prepull-x1', 'shop', {'prepull': 'api', 'prepull-run': '0a1b2c3d'})]})
+
+    # only the product is listed
+    assert cluster.list_products('shop') == ['api']
@@ -0,0 +1,37 @@
+# import libs
+import pytest
+from productionize.resources import parse_cpu, parse_memory, thread_count
+
+# test the cpu quantities
+def test_parse_cpu():
+
+    # cores and milli cores
+    assert parse_cpu('2') == 2.0
+    assert parse_cpu('500m') == 0.5
+    assert parse_cpu(None) == 0.0
+
+# test the memory quantities
+@pytest.mark.parametrize('quantity, size', [('512Mi', 512 * 1024 ** 2),
+                                            ('2G', 2 * 1000 ** 3),
+                                            ('1Pi', 1024 ** 5),
+                                            ('1P', 1000 ** 5),
+                                            ('1Ei', 1024 ** 6),
+                                            ('2E', 2 * 1000 ** 6),
+                                            ('1024', 1024),
+                                            ('', 0)])
+def test_parse_memory(quantity, size):
+
+    # check the bytes
+    assert parse_memory(quantity) == size
+
+# test the threads
+def test_thread_count_follows_the_limit_first():
+
+    # the limit wins over the request
+    assert thread_count(cpu_limit = '2500m', cpu_request = '1') == 2
+
+    # at least one thread
+    assert thread_count(cpu_request = '200m') == 1
+
+    # no quota
+    assert thread_count() is None
@@ -0,0 +1,160 @@
+# import libs
+import sys
+import os
+import pytest
+from productionize.workbench import workbench
+
+# define the binaries brew installs per formula
+BINARIES = {'docker': ['docker'],
+            'virtualbox': ['virtualbox', 'vboxmanage'],
+            'kubectl': ['kubectl'],
+            'minikube': ['minikube'],
+            'qemu': ['qemu-system-x86_64']}
+
+# define the stand-in for brew, which logs when every install starts and ends
+FAKE_BREW = """#!{python}
+import sys, os, time
+args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+if 'install' in args:
+    formula = args[-1]
+    with open({log!r}, 'a') as file:
+        file.write('start ' + formula + ' ' + repr(time.time()) + '\\n')
+    time.sleep(0.2)
+    for binary in {binaries!r}.get(formula, []):
+        path = os.path.join({bin!r}, binary)
+        with open(path, 'w') as file:
+            file.write('#!/bin/sh\\necho "' + binary + ' version 1.2.3"\\n')
+        os.chmod(path, 0o755)
+    with open({log!r}, 'a') as file:
+        file.write('end ' + formula + ' ' + repr(time.time()) + '\\n')
+"""
+
+# helper to install a stand-in of a tool
+def add_tool(folder, name):
+
+    # write the tool
+    path = os.path.join(folder, name)
+    with open(path, 'w') as file:
+        file.write(str('#!/bin/sh\necho "' + name + ' version 1.2.3"\n'))
+    os.chmod(path, 0o755)
+
+# setup a PATH holding only the stand-ins
+@pytest.fixture
+def fake_path(tmp_path, monkeypatch):
+
+    # create the folder of the stand-ins
+    folder = tmp_path / 'bin'
+    folder.mkdir()
+
+    # write the stand-in for brew
+    log = str(tmp_path / 'brew.log')
+    with open(folder / 'brew', 'w') as file:
+        file.write(FAKE_BREW.format(python = sys.executable, log = log, binaries = BINARIES, bin = str(folder)))
+    os.chmod(folder / 'brew', 0o755)
+
+    # only find the stand-ins
+    monkeypatch.setenv('PATH', str(folder))
+    monkeypatch.setattr(sys, 'platform', 'darwin')
+
+    # return the folder and the log
+    return str(folder), log
+
+# helper to read the installs from the log
+def read_installs(log):
+
+    # initialize the installs
+    installs = {}
+
+    # read the log
+    with open(log) as file:
+
+        # loop over lines
+        for line in file:
+
+            # split the line
+            event, formula, moment = line.split()
+            installs.setdefault(formula, {})[event] = float(moment)
+
+    # return installs
+    return installs
+
+# test a setup from scratch
+def test_setup_installs_missing_components_one_at_a_time(fake_path, tmp_path):
+
+    # get the stand-ins
+    folder, log = fake_path
+
+    # setup the workbench
+    bench = workbench(state_file = str(tmp_path / 'state.db'), driver = 'virtualbox')
+    bench.setup(report = False)
+
+    # read the installs
+    installs = read_installs(log)
+
+    # check that all components were installed
+    assert set(installs) == {'docker', 'virtualbox', 'kubectl', 'minikube'}
+    assert bench.kc_installed and bench.mk_installed and bench.vb_installed
+
+    # check that brew never ran twice at the same time
+    spans = sorted((install['start'], install['end']) for install in installs.values())
+    assert all(earlier[1] <= later[0] for earlier, later in zip(spans, spans[1:]))
+
+    # check that minikube came after kubectl and the driver
+    assert installs['minikube']['start'] >= installs['kubectl']['end']
+    assert installs['minikube']['start'] >= installs['virtualbox']['end']
+
+# test a setup with some components on the machine
+def test_setup_only_installs_what_is_missing(fake_path, tmp_path):
+
+    # get the stand-ins
+    folder, log = fake_path
+
+    # put some components on the machine
+    for name in ['docker', 'kubectl', 'qemu-system-x86_64']:
+
+        # add tool
+        add_tool(folder, name)
+
+    # setup the workbench
+    bench = workbench(state_file = str(tmp_path / 'state.db'), driver = 'qemu')
+    bench.setup(report = False)
+
+    # only minikube was installed
+    assert set(read_installs(log)) == {'minikube'}
+    assert set(bench.setup_durations) == {'docker', 'qemu', 'kubectl', 'minikube', 'total'}
+
+# test a setup on linux without brew
+def test_setup_without_brew_names_the_missing_component(fake_path, tmp_path, monkeypatch):
+
+    # get the stand-ins
+    folder, log = fake_path
+
+    # remove brew and run on linux
+    os.remove(os.path.join(folder, 'brew'))
+    monkeypatch.setattr(sys, 'platform', 'linux')
+
+    # put all but minikube on the machine
+    for name in ['docker', 'kubectl']:
+
+        # add tool
+        add_tool(folder, name)
+
+    # setup the workbench
+    bench = workbench(state_file = str(tmp_path / 'state.db'), driver = 'docker')
+
+    # check that the missing component is named
+    with pytest.raises(Exception, match = 'Minikube'):
+        bench.setup(report = False)
+
+# test that macOS needs brew
+def test_workbench_needs_brew_on_macos(fake_path, tmp_path):
+
+    # get the stand-ins
+    folder, log = fake_path
+
+    # remove brew
+    os.remove(os.path.join(folder, 'brew'))
+
+    # check that the workbench asks for brew
+    with pytest.raises(Exception, match = 'homebrew'):
+        workbench(state_file = str(tmp_path / 'state.db'))
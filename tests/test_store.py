@@ -0,0 +1,32 @@
+# import libs
+import os
+from productionize.store import store
+
+# test that reading does not create the store
+def test_reading_a_missing_store_leaves_no_file(tmp_path):
+
+    # open a store that does not exist
+    path = str(tmp_path / 'state' / 'state.db')
+    state = store(path = path)
+
+    # nothing is recorded and nothing is created
+    assert state.get_product(project = 'my-project', name = 'my-product') is None
+    assert state.get_setting('nodes', 1) == 1
+    assert state.list_products() == []
+    assert not os.path.exists(path)
+
+# test that writing creates the store
+def test_writing_creates_the_store(tmp_path):
+
+    # open a store that does not exist
+    path = str(tmp_path / 'state' / 'state.db')
+    state = store(path = path)
+
+    # record a product
+    state.save_product(project = 'my-project', name = 'my-product', status = 'deployed and healthy', settings = {'replicas': 2})
+
+    # the store exists and a new session reads the product
+    assert os.path.exists(path)
+    recorded = store(path = path).get_product(project = 'my-project', name = 'my-product')
+    assert recorded['status'] == 'deployed and healthy'
+    assert recorded['settings'] == {'replicas': 2}